@@ -0,0 +1,346 @@
+"""Benchmarks dos kernels de simulação ao longo de eixos de escala.
+
+Cada caso roda um kernel em um tamanho (meses, parcelas, células, caminhos) e
+registra o menor tempo entre algumas repetições e o pico de memória alocada
+(tracemalloc, que também vê os arrays do NumPy). Tempo e memória são medidos
+em execuções separadas, para que o tracemalloc não distorça o tempo.
+
+    python benchmarks/bench.py --save      # grava benchmarks/baseline.json
+    python benchmarks/bench.py             # compara com o baseline
+    python benchmarks/bench.py -k financed --threshold 0.2
+
+A comparação falha (código de saída 1) quando algum caso fica mais lento ou usa
+mais memória que o baseline além do limite. O baseline só vale para a máquina
+em que foi gravado.
+"""
+
+import argparse
+import dataclasses
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finances import (  # noqa: E402
+    BusinessParams,
+    FinancingParams,
+    PropertyParams,
+    RetirementParams,
+    SavingsRateParams,
+    calculate_monthly_savings,
+    calculate_monthly_savings_rate,
+    first_installment_value,
+    simulate_business,
+    simulate_property_purchase,
+    simulate_property_purchase_financed,
+    simulate_retirement_surface,
+    simulate_savings_rate_curve,
+    solve_months_to_retire,
+)
+from finances.montecarlo import (  # noqa: E402
+    BusinessMonteCarloParams,
+    PropertyMonteCarloParams,
+    simulate_business_monte_carlo,
+    simulate_property_monte_carlo,
+)
+from finances.sensitivity import simulate_business_batch  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Differences below these floors are noise, whatever the relative change
+MIN_SECONDS = 1e-3
+MIN_BYTES = 1 << 20
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[], object]
+
+
+@dataclass
+class Measurement:
+    seconds: float
+    peak_bytes: int
+
+
+PROPERTY = PropertyParams(
+    property_value=500_000,
+    available_cash=100_000,
+    initial_monthly_saving=5_000,
+    monthly_inflation_rate=0.41,
+    monthly_investment_return_rate=0.8,
+    monthly_property_value_increase=0.5,
+    monthly_property_value_increase_when_bought=0.5,
+    months_to_simulate=150,
+)
+FINANCING = FinancingParams(270, 0.91, 1_500, 12)
+RETIREMENT = RetirementParams(0, 0.41, 1.0)
+
+
+def _cases() -> list[Case]:
+    cases = []
+
+    # ── Retirement ────────────────────────────────────────────────────────────
+    for calls in (1_000, 10_000, 100_000):
+        cases.append(
+            Case(
+                f"calculate_monthly_savings/calls={calls}",
+                lambda calls=calls: [
+                    calculate_monthly_savings(10_000, k % 40 + 1, 0, 0.41, 1.0)
+                    for k in range(calls)
+                ],
+            )
+        )
+        cases.append(
+            Case(
+                f"calculate_monthly_savings_rate/calls={calls}",
+                lambda calls=calls: [
+                    calculate_monthly_savings_rate(k % 600 + 1, 0.41, 1.0)
+                    for k in range(calls)
+                ],
+            )
+        )
+    for cells in (1_000, 10_000, 100_000, 1_000_000):
+        side = int(round(cells**0.5))
+        cases.append(
+            Case(
+                f"simulate_retirement_surface/cells={cells}",
+                lambda side=side: simulate_retirement_surface(
+                    RETIREMENT,
+                    np.linspace(1_000, 50_000, side),
+                    np.arange(1, side + 1),
+                ),
+            )
+        )
+        cases.append(
+            Case(
+                f"solve_months_to_retire/targets={cells}",
+                lambda cells=cells: solve_months_to_retire(
+                    np.linspace(0.01, 0.99, cells), 0.41, 1.0
+                ),
+            )
+        )
+    for months in (600, 6_000, 60_000):
+        cases.append(
+            Case(
+                f"simulate_savings_rate_curve/months={months}",
+                lambda months=months: simulate_savings_rate_curve(
+                    SavingsRateParams(0.41, 1.0, max_months=months)
+                ),
+            )
+        )
+
+    # ── Property ──────────────────────────────────────────────────────────────
+    for months in (100, 1_000, 10_000):
+        params = dataclasses.replace(PROPERTY, months_to_simulate=months)
+        cases.append(
+            Case(
+                f"simulate_property_purchase/months={months}",
+                lambda params=params: simulate_property_purchase(params),
+            )
+        )
+        cases.append(
+            Case(
+                f"simulate_property_purchase_financed/months={months}",
+                lambda params=params: simulate_property_purchase_financed(
+                    params, FINANCING
+                ),
+            )
+        )
+    # Saving just above the first installment keeps the debt open for most of
+    # the contract, so the cost grows with the number of installments
+    for installments in (60, 150, 300, 600):
+        financing = dataclasses.replace(FINANCING, number_of_installments=installments)
+        first_value = first_installment_value(
+            PROPERTY.property_value - PROPERTY.available_cash,
+            installments,
+            FINANCING.tax,
+        )
+        params = dataclasses.replace(
+            PROPERTY, initial_monthly_saving=first_value * 1.05, months_to_simulate=700
+        )
+        cases.append(
+            Case(
+                f"simulate_property_purchase_financed/installments={installments}",
+                lambda params=params, financing=financing: (
+                    simulate_property_purchase_financed(params, financing)
+                ),
+            )
+        )
+    for paths in (100, 1_000, 10_000):
+        cases.append(
+            Case(
+                f"simulate_property_monte_carlo/paths={paths}",
+                lambda paths=paths: simulate_property_monte_carlo(
+                    PROPERTY, FINANCING, PropertyMonteCarloParams(n_paths=paths)
+                ),
+            )
+        )
+
+    # ── Business ──────────────────────────────────────────────────────────────
+    for years in (4, 15, 30):
+        params = BusinessParams(ano_inicio=0, ano_fim=years)
+        cases.append(
+            Case(
+                f"simulate_business/years={years}",
+                lambda params=params: simulate_business(params),
+            )
+        )
+    for rows in (1_000, 10_000, 100_000):
+        cases.append(
+            Case(
+                f"simulate_business_batch/rows={rows}",
+                lambda rows=rows: simulate_business_batch(
+                    BusinessParams(),
+                    valuation_saida=np.linspace(1e6, 1e8, rows),
+                ),
+            )
+        )
+    for paths in (1_000, 10_000, 100_000):
+        cases.append(
+            Case(
+                f"simulate_business_monte_carlo/paths={paths}",
+                lambda paths=paths: simulate_business_monte_carlo(
+                    BusinessParams(), BusinessMonteCarloParams(n_paths=paths)
+                ),
+            )
+        )
+    return cases
+
+
+def measure(case: Case, min_time: float = 0.2, max_repeats: int = 5) -> Measurement:
+    """Menor tempo entre até `max_repeats` execuções e o pico de memória de uma."""
+    best = float("inf")
+    spent = 0.0
+    for _ in range(max_repeats):
+        gc.collect()
+        start = time.perf_counter()
+        case.run()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        if spent >= min_time:
+            break
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(best, peak)
+
+
+def compare(
+    results: dict[str, Measurement],
+    baseline: dict[str, dict],
+    threshold: float,
+    memory_threshold: float,
+) -> list[str]:
+    """Casos que pioraram além do limite em relação ao baseline."""
+    regressions = []
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        previous = Measurement(**baseline[name])
+        if (
+            current.seconds > previous.seconds * (1 + threshold)
+            and current.seconds - previous.seconds > MIN_SECONDS
+        ):
+            regressions.append(
+                f"{name}: {previous.seconds * 1e3:.2f} ms → {current.seconds * 1e3:.2f} ms"
+            )
+        if (
+            current.peak_bytes > previous.peak_bytes * (1 + memory_threshold)
+            and current.peak_bytes - previous.peak_bytes > MIN_BYTES
+        ):
+            regressions.append(
+                f"{name}: pico de {previous.peak_bytes / 2**20:.1f} MiB → "
+                f"{current.peak_bytes / 2**20:.1f} MiB"
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", default="", help="só casos cujo nome contém o texto")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save", action="store_true", help="grava os resultados como baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.3,
+        help="piora relativa de tempo tolerada (padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "--memory-threshold",
+        type=float,
+        default=0.1,
+        help="piora relativa de memória tolerada (padrão: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    for case in _cases():
+        if args.k not in case.name:
+            continue
+        results[case.name] = measure(case)
+        current = results[case.name]
+        line = (
+            f"{case.name:<60} {current.seconds * 1e3:>10.2f} ms "
+            f"{current.peak_bytes / 2**20:>9.1f} MiB"
+        )
+        if case.name in baseline:
+            line += f"  ({current.seconds / baseline[case.name]['seconds']:.2f}x)"
+        print(line, flush=True)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {
+                    "machine": {
+                        "platform": platform.platform(),
+                        "processor": platform.processor(),
+                        "python": platform.python_version(),
+                        "numpy": np.__version__,
+                    },
+                    "results": {
+                        name: dataclasses.asdict(m) for name, m in results.items()
+                    },
+                },
+                f,
+                indent=2,
+            )
+        print(f"Baseline gravado em {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("Sem baseline para comparar; rode com --save primeiro.")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+    for regression in regressions:
+        print(f"REGRESSÃO {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
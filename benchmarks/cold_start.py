@@ -0,0 +1,147 @@
+"""Orçamento de partida a frio: healthcheck e primeira renderização de cada página.
+
+Mede duas coisas, cada uma em um processo novo:
+
+- o tempo entre iniciar `streamlit run Bem_vindo.py` e /_stcore/health
+  responder 200 (ou, com --url, só o tempo até um servidor já iniciado, como
+  um contêiner recém-criado, responder);
+- a primeira renderização de cada página em um interpretador novo, com
+  streamlit.testing.AppTest. O import do Streamlit fica fora da medida, porque
+  ele já foi pago pelo servidor; os imports das páginas (pandas, plotly, ...)
+  ficam dentro.
+
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --url http://localhost:8501 --json cold.json
+
+Sai com código 1 se alguma medida passar do orçamento.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_RENDER = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+start = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "errors": [e.message for e in app.exception]}))
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_health(url: str, timeout: float) -> float:
+    """Segundos até `url`/_stcore/health responder 200."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            with urllib.request.urlopen(f"{url}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - start
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{url} não respondeu em {timeout} s")
+
+
+def time_to_health(timeout: float) -> float:
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "streamlit",
+            "run",
+            "Bem_vindo.py",
+            f"--server.port={port}",
+            "--server.headless=true",
+            "--server.fileWatcherType=none",
+            "--browser.gatherUsageStats=false",
+        ],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        return wait_for_health(f"http://127.0.0.1:{port}", timeout)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def first_render(page: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", _RENDER, page],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="servidor já iniciado, em vez de iniciar um")
+    parser.add_argument("--health-budget", type=float, default=5.0)
+    parser.add_argument("--render-budget", type=float, default=3.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json", help="grava as medidas neste arquivo")
+    args = parser.parse_args(argv)
+
+    health = (
+        wait_for_health(args.url, args.timeout)
+        if args.url
+        else time_to_health(args.timeout)
+    )
+    print(f"{'healthcheck':<40} {health:>7.2f} s")
+    over_budget = health > args.health_budget
+
+    pages = ["Bem_vindo.py"] + sorted(
+        os.path.join("pages", name)
+        for name in os.listdir(os.path.join(ROOT, "pages"))
+        if name.endswith(".py")
+    )
+    renders = {}
+    for page in pages:
+        renders[page] = first_render(page)
+        seconds = renders[page]["seconds"]
+        status = "ERRO" if renders[page]["errors"] else ""
+        print(f"{page:<40} {seconds:>7.2f} s {status}")
+        over_budget |= seconds > args.render_budget or bool(renders[page]["errors"])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {
+                    "healthcheck_seconds": health,
+                    "first_render": renders,
+                    "budget": {
+                        "healthcheck_seconds": args.health_budget,
+                        "render_seconds": args.render_budget,
+                    },
+                },
+                f,
+                indent=2,
+                ensure_ascii=False,
+            )
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
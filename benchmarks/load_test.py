@@ -0,0 +1,334 @@
+"""Teste de carga: N sessões simultâneas em cada página, com streamlit.testing.AppTest.
+
+Como no servidor, cada sessão roda o script da página em uma thread própria e
+todas compartilham o processo (e os caches de finances.cache). Cada sessão
+abre a página e faz uma sequência de interações sorteadas entre mudanças
+plausíveis de widgets, com valores repetidos entre sessões como acontece com
+usuários reais. Para cada página e número de sessões o relatório mostra:
+
+- p50/p95/p99 do tempo dos reruns de interação e a mediana da primeira
+  renderização;
+- vazão (reruns por segundo, de todas as sessões juntas);
+- crescimento do RSS do processo por sessão, com as sessões ainda abertas.
+
+    python benchmarks/load_test.py --sessions 50 100 200 --pages 3
+    python benchmarks/load_test.py --steps 10 --think 0.5 --json load.json
+    python benchmarks/load_test.py --p95-budget 2000   # sai com 1 se passar
+
+Os caches são limpos antes de cada medida (use --warm para mantê-los). O RSS
+vem de /proc/self/status, então só é medido no Linux.
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit import logger as streamlit_logger  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from finances.cache import clear_caches  # noqa: E402
+
+PAGES = {
+    "0": "Bem_vindo.py",
+    "1": "pages/1_Aposentadoria_(1).py",
+    "2": "pages/2_Aposentadoria_(2).py",
+    "3": "pages/3_Compra_de_imóvel.py",
+    "4": "pages/4_Negócio_ou_emprego.py",
+}
+
+# Widget changes each session draws from: (widget kind, label, values)
+MOVES = {
+    "0": [],
+    "1": [
+        ("number_input", "Capital atual (R$)", [0, 10_000, 50_000, 100_000]),
+        ("number_input", "Poder de compra desejado (R$)", [5_000, 10_000, 20_000]),
+        ("number_input", "Anos para aposentar", [10, 15, 20, 25, 30]),
+        ("number_input", "Poupança mensal (R$)", [1_000, 3_000, 5_000]),
+        ("checkbox", "Repetir as taxas dos últimos 20 anos", [True, False]),
+    ],
+    "2": [
+        ("number_input", "Taxa de poupança mensal (%)", [10, 20, 30, 40]),
+        ("number_input", "Horizonte máximo do gráfico (anos)", [30, 50, 60]),
+        (
+            "checkbox",
+            "Considerar aumento da poupança mensal acompanhando a inflação?",
+            [True, False],
+        ),
+        ("checkbox", "Repetir as taxas dos últimos 20 anos", [True, False]),
+    ],
+    "3": [
+        ("number_input", "Valor da propriedade ($)", [300_000, 500_000, 800_000]),
+        (
+            "number_input",
+            "Quantidade de dinheiro que você pode economizar por mês ($)",
+            [2_000, 3_000, 5_000],
+        ),
+        ("number_input", "Quantidade de meses a simular", [150, 240, 360]),
+        ("number_input", "Taxa de retorno mensal da sua aplicação (%)", [0.8, 1.0]),
+        ("checkbox", "Repetir as taxas dos últimos 20 anos", [True, False]),
+    ],
+    "4": [
+        (
+            "number_input",
+            "Valuation no evento de liquidez (R$)",
+            [10_000_000, 20_000_000, 40_000_000],
+        ),
+        ("slider", "Probabilidade de atingir o evento de liquidez (%)", [10, 30, 50]),
+        ("number_input", "Receita anual no evento de liquidez (R$)", [3e6, 5e6, 1e7]),
+        ("checkbox", "Mostrar análise de sensibilidade", [True, False]),
+    ],
+}
+
+
+@dataclass
+class SessionResult:
+    first_render: float = 0.0
+    reruns: list[float] = field(default_factory=list)
+    errors: int = 0
+
+
+@dataclass
+class LoadResult:
+    page: str
+    sessions: int
+    steps: int
+    reruns: int
+    errors: int
+    first_render_p50: float
+    p50: float
+    p95: float
+    p99: float
+    reruns_per_second: float
+    rss_before_mib: float
+    rss_after_mib: float
+    rss_per_session_mib: float
+
+
+def rss_bytes() -> int:
+    """RSS atual do processo (0 fora do Linux)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def share_app_test_runtime() -> None:
+    """Deixa várias AppTest rodarem ao mesmo tempo no processo.
+
+    A cada run a AppTest instala um Runtime falso global e o remove no fim, e
+    liga a opção global.appTest só durante o run. Com sessões simultâneas, o
+    fim de um run tiraria o Runtime (e a opção) de runs ainda em andamento.
+    Aqui a opção fica ligada e, sem Runtime instalado, vale o último visto; os
+    Runtimes falsos de todas as runs são equivalentes.
+    """
+    from streamlit import config
+    from streamlit.runtime import Runtime
+
+    config.set_option("global.appTest", True)
+    last = []
+
+    def instance(cls):
+        runtime = cls._instance or (last[0] if last else None)
+        if runtime is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        last[:] = [runtime]
+        return runtime
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(last))
+
+
+def _widget(app: AppTest, kind: str, label: str):
+    for widget in getattr(app, kind):
+        if widget.label == label:
+            return widget
+    raise LookupError(f"{kind} {label!r} não encontrado")
+
+
+def _timed_run(app: AppTest, result: SessionResult) -> float:
+    start = time.perf_counter()
+    app.run()
+    elapsed = time.perf_counter() - start
+    result.errors += len(app.exception)
+    return elapsed
+
+
+def run_session(
+    page: str,
+    moves: list,
+    steps: int,
+    think: float,
+    rng: random.Random,
+    start: threading.Barrier,
+    apps: list,
+) -> SessionResult:
+    """Abre a página e faz `steps` interações sorteadas; a AppTest fica em `apps`."""
+    result = SessionResult()
+    app = AppTest.from_file(os.path.join(ROOT, page), default_timeout=600)
+    apps.append(app)
+    start.wait()
+    result.first_render = _timed_run(app, result)
+    for _ in range(steps if moves else 0):
+        if think:
+            time.sleep(rng.expovariate(1 / think))
+        kind, label, values = rng.choice(moves)
+        try:
+            _widget(app, kind, label).set_value(rng.choice(values))
+        except LookupError:
+            # The widget is in a section this session has not opened
+            continue
+        result.reruns.append(_timed_run(app, result))
+    return result
+
+
+def load_test(
+    page_key: str,
+    sessions: int,
+    steps: int,
+    think: float = 0.0,
+    seed: int = 0,
+    warm: bool = False,
+) -> LoadResult:
+    page = PAGES[page_key]
+    if not warm:
+        clear_caches()
+    gc.collect()
+    rss_before = rss_bytes()
+
+    apps = []
+    start = threading.Barrier(sessions + 1)
+    with ThreadPoolExecutor(sessions) as executor:
+        futures = [
+            executor.submit(
+                run_session,
+                page,
+                MOVES[page_key],
+                steps,
+                think,
+                random.Random(seed * 100_003 + k),
+                start,
+                apps,
+            )
+            for k in range(sessions)
+        ]
+        start.wait()
+        began = time.perf_counter()
+        results = [future.result() for future in futures]
+        wall = time.perf_counter() - began
+
+    # Measured with every session still open, as on a server
+    gc.collect()
+    rss_after = rss_bytes()
+    del apps
+
+    reruns = np.array([t for r in results for t in r.reruns])
+    first = np.array([r.first_render for r in results])
+    p50, p95, p99 = (
+        np.percentile(reruns, [50, 95, 99]) if reruns.size else (np.nan,) * 3
+    )
+    return LoadResult(
+        page=page,
+        sessions=sessions,
+        steps=steps,
+        reruns=int(reruns.size + first.size),
+        errors=sum(r.errors for r in results),
+        first_render_p50=float(np.median(first)),
+        p50=float(p50),
+        p95=float(p95),
+        p99=float(p99),
+        reruns_per_second=(reruns.size + first.size) / wall,
+        rss_before_mib=rss_before / 2**20,
+        rss_after_mib=rss_after / 2**20,
+        rss_per_session_mib=(rss_after - rss_before) / 2**20 / sessions,
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--pages",
+        nargs="+",
+        default=list(PAGES),
+        choices=list(PAGES),
+        help="páginas, pelo número (0 é a de boas-vindas)",
+    )
+    parser.add_argument("--sessions", nargs="+", type=int, default=[10, 50])
+    parser.add_argument(
+        "--steps", type=int, default=5, help="interações por sessão depois de abrir"
+    )
+    parser.add_argument(
+        "--think", type=float, default=0.0, help="pausa média entre interações (s)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warm", action="store_true", help="não limpa os caches")
+    parser.add_argument(
+        "--p95-budget", type=float, help="p95 máximo das interações, em ms"
+    )
+    parser.add_argument("--json", help="grava as medidas neste arquivo")
+    args = parser.parse_args(argv)
+
+    share_app_test_runtime()
+    # Streamlit warns once per rerun (deprecations, bare mode); keep the report
+    # readable with hundreds of reruns
+    streamlit_logger.set_log_level("error")
+    # Page 4 has "\$" in a regular string, reported again on every compile
+    warnings.filterwarnings("ignore", category=SyntaxWarning)
+    print(
+        f"{'página':<32} {'sessões':>7} {'reruns':>6} {'erros':>5} "
+        f"{'1ª p50':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'reruns/s':>9} "
+        f"{'MiB/sessão':>10}"
+    )
+    results = []
+    over_budget = False
+    for page_key in args.pages:
+        for sessions in args.sessions:
+            result = load_test(
+                page_key, sessions, args.steps, args.think, args.seed, args.warm
+            )
+            results.append(result)
+            print(
+                f"{result.page:<32} {result.sessions:>7} {result.reruns:>6} "
+                f"{result.errors:>5} {result.first_render_p50 * 1e3:>8.0f} "
+                f"{result.p50 * 1e3:>8.0f} {result.p95 * 1e3:>8.0f} "
+                f"{result.p99 * 1e3:>8.0f} {result.reruns_per_second:>9.1f} "
+                f"{result.rss_per_session_mib:>10.2f}",
+                flush=True,
+            )
+            over_budget |= result.errors > 0
+            if args.p95_budget is not None:
+                over_budget |= result.p95 * 1e3 > args.p95_budget
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {
+                    "steps": args.steps,
+                    "think_seconds": args.think,
+                    "results": [asdict(r) for r in results],
+                },
+                f,
+                indent=2,
+                ensure_ascii=False,
+            )
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""Etapa de dados dos gráficos, entre a construção da figura e o st.plotly_chart.
+
+Linhas com mais pontos que o orçamento são reduzidas com LTTB
+(finances.downsample), mantendo mínimos, máximos e eventos, e traços que
+continuam grandes passam a ser desenhados com WebGL (Scattergl). Grades de
+contorno e mapas de calor com mais células que GRID_CELL_BUDGET são
+amostradas com um passo fixo nos dois eixos, mantendo a última linha e a
+última coluna. Com o painel
+de depuração ou a exportação de métricas ativos, o tamanho do JSON de cada
+gráfico antes e depois da redução vai para o registro do rerun.
+"""
+
+import math
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from debug_panel import note_chart, reporting_enabled
+from finances.downsample import downsample_indices
+
+DEFAULT_POINT_BUDGET = 1000
+# Above this many points in a trace, SVG rendering gets slow in the browser
+WEBGL_THRESHOLD = 2000
+
+# Cells of a contour or heatmap grid sent to the browser
+GRID_CELL_BUDGET = 40_000
+
+_ARRAY_ATTRIBUTES = ("x", "y", "customdata", "text", "hovertext")
+_GRID_TYPES = ("contour", "heatmap")
+
+
+def point_budget() -> int:
+    """Pontos por grupo de linhas, configurável com FINANCES_CHART_POINTS."""
+    return int(os.environ.get("FINANCES_CHART_POINTS", DEFAULT_POINT_BUDGET))
+
+
+def _shared_x_groups(fig: go.Figure) -> list[tuple[np.ndarray, list[int]]]:
+    """Linhas da figura agrupadas pelo eixo x, que costuma ser o mesmo."""
+    groups = []
+    for i, trace in enumerate(fig.data):
+        if trace.type != "scatter" or trace.x is None or trace.y is None:
+            continue
+        x = np.asarray(trace.x)
+        for group_x, members in groups:
+            if np.array_equal(group_x, x):
+                members.append(i)
+                break
+        else:
+            groups.append((x, [i]))
+    return groups
+
+
+def _grid_indices(n: int, step: int) -> np.ndarray:
+    return np.unique(np.append(np.arange(0, n, step), n - 1))
+
+
+def _grid_selection(trace, budget: int) -> tuple[np.ndarray, np.ndarray] | None:
+    """Linhas e colunas a manter da grade `trace.z`, ou None se ela cabe."""
+    if trace.type not in _GRID_TYPES or trace.z is None:
+        return None
+    rows, cols = np.shape(trace.z)
+    if rows * cols <= budget:
+        return None
+    step = math.ceil(math.sqrt(rows * cols / budget))
+    return _grid_indices(rows, step), _grid_indices(cols, step)
+
+
+def _decimated_grid(spec: dict, rows: np.ndarray, cols: np.ndarray) -> dict:
+    z = np.asarray(spec["z"])
+    spec["z"] = z[np.ix_(rows, cols)]
+    # Axes given as one coordinate per row/column; ranges (x0/dx) stay valid
+    # only without decimation, so they are expanded first
+    for axis, indices, n in (("x", cols, z.shape[1]), ("y", rows, z.shape[0])):
+        values = spec.get(axis)
+        if values is None:
+            values = spec.get(f"{axis}0", 0) + spec.get(f"d{axis}", 1) * np.arange(n)
+            spec.pop(f"{axis}0", None)
+            spec.pop(f"d{axis}", None)
+        spec[axis] = np.asarray(values)[indices]
+    return spec
+
+
+def _as_webgl(spec: dict) -> dict:
+    candidate = {**spec, "type": "scattergl"}
+    try:
+        go.Scattergl({k: v for k, v in candidate.items() if k != "type"})
+    except ValueError:
+        # Some SVG-only options (e.g. spline lines) have no WebGL equivalent
+        return spec
+    return candidate
+
+
+def _prepared_traces(
+    fig: go.Figure, selections: dict[int, np.ndarray], grids: dict[int, tuple]
+) -> list:
+    data = []
+    for i, trace in enumerate(fig.data):
+        spec = trace.to_plotly_json()
+        if i in grids:
+            spec = _decimated_grid(spec, *grids[i])
+        if i in selections:
+            n_points = len(spec["x"])
+            for attribute in _ARRAY_ATTRIBUTES:
+                value = spec.get(attribute)
+                if (
+                    value is not None
+                    and not isinstance(value, str)
+                    and len(value) == n_points
+                ):
+                    spec[attribute] = np.asarray(value)[selections[i]]
+        if spec["type"] == "scatter" and len(spec.get("x", ())) > WEBGL_THRESHOLD:
+            spec = _as_webgl(spec)
+        data.append(spec)
+    return data
+
+
+def prepare_figure(
+    fig: go.Figure, name: str, events=(), budget: int | None = None
+) -> go.Figure:
+    """Reduz as linhas de `fig` ao orçamento de pontos.
+
+    Linhas com o mesmo x são reduzidas juntas e continuam alinhadas, o que
+    mantém as faixas preenchidas ("tonexty") coerentes. `events` são valores
+    de x que devem continuar no gráfico, como o mês da compra ou da quitação.
+    """
+    budget = budget or point_budget()
+    selections = {}
+    for x, members in _shared_x_groups(fig):
+        if len(x) <= budget:
+            continue
+        indices = downsample_indices(
+            x,
+            [fig.data[i].y for i in members],
+            budget,
+            keep=np.flatnonzero(np.isin(x, events)),
+        )
+        for i in members:
+            selections[i] = indices
+
+    grids = {}
+    for i, trace in enumerate(fig.data):
+        selection = _grid_selection(trace, GRID_CELL_BUDGET)
+        if selection is not None:
+            grids[i] = selection
+
+    if (
+        selections
+        or grids
+        or any(
+            t.type == "scatter" and t.x is not None and len(t.x) > WEBGL_THRESHOLD
+            for t in fig.data
+        )
+    ):
+        prepared = go.Figure(
+            data=_prepared_traces(fig, selections, grids), layout=fig.layout
+        )
+    else:
+        prepared = fig
+
+    if reporting_enabled():
+        bytes_before = len(pio.to_json(fig, validate=False))
+        note_chart(
+            name,
+            sum(len(t.x) for t in fig.data if t.x is not None),
+            sum(len(t.x) for t in prepared.data if t.x is not None),
+            bytes_before,
+            (
+                bytes_before
+                if prepared is fig
+                else len(pio.to_json(prepared, validate=False))
+            ),
+        )
+    return prepared
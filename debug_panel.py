@@ -0,0 +1,134 @@
+import dataclasses
+import os
+import threading
+
+import streamlit as st
+
+from finances.cache import cache_stats
+from finances.timing import MetricsExporter, RerunTiming, params_hash
+
+# Each session runs its script in its own thread, so the rerun being timed is
+# kept per thread
+_current = threading.local()
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def debug_enabled() -> bool:
+    return os.environ.get("FINANCES_DEBUG") == "1"
+
+
+def reporting_enabled() -> bool:
+    """Se há quem leia medidas extras do rerun (painel ou exportação)."""
+    return debug_enabled() or bool(os.environ.get("FINANCES_METRICS_DIR"))
+
+
+def _metrics_exporter() -> MetricsExporter | None:
+    """Exportador em FINANCES_METRICS_DIR, criado uma vez por processo."""
+    global _exporter
+    directory = os.environ.get("FINANCES_METRICS_DIR")
+    if not directory:
+        return None
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = MetricsExporter(directory)
+        return _exporter
+
+
+def start_rerun(page: str) -> None:
+    """Começa a cronometrar o rerun da página `page`."""
+    _current.timing = RerunTiming(page)
+
+
+def lap(stage: str) -> None:
+    """Soma à etapa `stage` o tempo desde a marca anterior do rerun."""
+    timing = getattr(_current, "timing", None)
+    if timing is not None:
+        timing.lap(stage)
+
+
+def tag_params(*params) -> None:
+    """Associa ao rerun o hash dos parâmetros da simulação."""
+    timing = getattr(_current, "timing", None)
+    if timing is not None:
+        timing.params_hash = params_hash(*params)
+
+
+def note_chart(
+    name: str,
+    points_before: int,
+    points_after: int,
+    bytes_before: int,
+    bytes_after: int,
+) -> None:
+    """Registra no rerun quanto um gráfico encolheu antes de ir ao navegador."""
+    timing = getattr(_current, "timing", None)
+    if timing is not None:
+        timing.charts.append(
+            {
+                "chart": name,
+                "points_before": points_before,
+                "points_after": points_after,
+                "bytes_before": bytes_before,
+                "bytes_after": bytes_after,
+                "bytes_saved": bytes_before - bytes_after,
+            }
+        )
+
+
+def _finish_rerun() -> RerunTiming | None:
+    timing = getattr(_current, "timing", None)
+    _current.timing = None
+    if timing is None:
+        return None
+    timing.lap("other")
+    exporter = _metrics_exporter()
+    if exporter is not None:
+        exporter.record(timing)
+    return timing
+
+
+def render_debug_panel():
+    """Painel de depuração na barra lateral, ativado com FINANCES_DEBUG=1.
+
+    Também encerra a cronometragem do rerun, então deve ser a última chamada da
+    página.
+    """
+    timing = _finish_rerun()
+    if not debug_enabled():
+        return
+
+    # pandas is only needed for the panel itself, keep it off the cold path
+    import pandas as pd
+
+    with st.sidebar.expander("Depuração"):
+        if timing is not None:
+            st.caption(
+                f"Último rerun: {timing.total * 1e3:.1f} ms "
+                f"(parâmetros {timing.params_hash or '—'})"
+            )
+            st.dataframe(
+                pd.DataFrame(
+                    {
+                        "etapa": list(timing.stages),
+                        "ms": [round(s * 1e3, 2) for s in timing.stages.values()],
+                    }
+                ).set_index("etapa"),
+                use_container_width=True,
+            )
+            if timing.charts:
+                st.caption("Gráficos (JSON enviado ao navegador)")
+                st.dataframe(
+                    pd.DataFrame(timing.charts).set_index("chart"),
+                    use_container_width=True,
+                )
+        st.caption("Cache de simulações (compartilhado entre sessões)")
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {"cache": name, **dataclasses.asdict(stats)}
+                    for name, stats in cache_stats().items()
+                ]
+            ).set_index("cache"),
+            use_container_width=True,
+        )
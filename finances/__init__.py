@@ -0,0 +1,56 @@
+"""Núcleo de simulação das páginas, sem dependência do Streamlit."""
+
+from finances.amortization import InstallmentSchedule, first_installment_value
+from finances.business import BusinessParams, BusinessResult, simulate_business
+from finances.property import (
+    CashPurchaseResult,
+    FinancedPurchaseResult,
+    FinancingParams,
+    PropertyParams,
+    simulate_monthly_savings,
+    simulate_property_purchase,
+    simulate_property_purchase_financed,
+)
+from finances.rates import RateSchedule
+from finances.retirement import (
+    RetirementGrid,
+    RetirementParams,
+    RetirementPlan,
+    RetirementSurface,
+    SavingsRateCurve,
+    SavingsRateParams,
+    calculate_monthly_savings,
+    calculate_monthly_savings_rate,
+    simulate_retirement_grid,
+    simulate_retirement_surface,
+    simulate_savings_rate_curve,
+    solve_months_to_retire,
+)
+
+__all__ = [
+    "BusinessParams",
+    "BusinessResult",
+    "CashPurchaseResult",
+    "FinancedPurchaseResult",
+    "FinancingParams",
+    "InstallmentSchedule",
+    "PropertyParams",
+    "RateSchedule",
+    "RetirementGrid",
+    "RetirementParams",
+    "RetirementPlan",
+    "RetirementSurface",
+    "SavingsRateCurve",
+    "SavingsRateParams",
+    "calculate_monthly_savings",
+    "calculate_monthly_savings_rate",
+    "first_installment_value",
+    "simulate_business",
+    "simulate_monthly_savings",
+    "simulate_property_purchase",
+    "simulate_property_purchase_financed",
+    "simulate_retirement_grid",
+    "simulate_retirement_surface",
+    "simulate_savings_rate_curve",
+    "solve_months_to_retire",
+]
@@ -0,0 +1,65 @@
+from bisect import bisect_left
+from itertools import accumulate
+
+
+class InstallmentSchedule:
+    """Parcelas em aberto de um financiamento, corrigidas por um fator global.
+
+    As parcelas quitadas formam sempre um prefixo (parcela do mês) e um sufixo
+    (amortização a partir da última parcela), então as parcelas em aberto são um
+    intervalo contíguo. Guardamos as somas acumuladas dos valores-base e um fator
+    de correção comum a todas, o que deixa cada mês em O(log n).
+    """
+
+    def __init__(
+        self, first_installment_value: float, number_of_installments: int, tax: float
+    ):
+        self._growth = 1 + tax / 100
+        self._base = [
+            first_installment_value / (self._growth**i)
+            for i in range(1, number_of_installments + 1)
+        ]
+        self._prefix = list(accumulate(self._base, initial=0.0))
+        self._factor = 1.0
+        self._first = 0
+        self._end = number_of_installments
+
+    def correct(self) -> None:
+        """Corrige todas as parcelas em aberto pelos juros de um mês."""
+        self._factor *= self._growth
+
+    def outstanding(self) -> float:
+        """Valor total que ainda falta pagar."""
+        if self._first >= self._end:
+            return 0
+        return (self._prefix[self._end] - self._prefix[self._first]) * self._factor
+
+    def pay_due(self) -> float:
+        """Quita a parcela do mês e retorna o seu valor."""
+        if self._first >= self._end:
+            return 0
+        value = self._base[self._first] * self._factor
+        self._first += 1
+        return value
+
+    def prepay(self, amount: float) -> float:
+        """Quita parcelas a partir da última enquanto houver dinheiro e retorna a sobra."""
+        if amount <= 0 or self._first >= self._end:
+            return amount
+        target = self._prefix[self._end] - amount / self._factor
+        start = bisect_left(self._prefix, target, self._first, self._end + 1)
+        amount -= (self._prefix[self._end] - self._prefix[start]) * self._factor
+        self._end = start
+        return amount
+
+
+def first_installment_value(
+    financed_value: float, number_of_installments: int, tax: float
+) -> float:
+    """Valor da primeira parcela de um financiamento Price."""
+    return (
+        financed_value
+        * (tax / 100)
+        * (1 + tax / 100) ** number_of_installments
+        / ((1 + tax / 100) ** number_of_installments - 1)
+    )
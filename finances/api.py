@@ -0,0 +1,493 @@
+"""API HTTP com JSON para as simulações, opcional, ao lado do app Streamlit.
+
+    python -m finances.api --port 8502
+
+    curl -s localhost:8502/business -d '{"valuation_saida": 30000000}'
+    curl -s 'localhost:8502/business?valuation=30000000&prob=25'
+
+Endpoints (POST com um objeto JSON com campos dos parâmetros; campos ausentes
+usam os padrões, quando existem, e valores fora dos limites das páginas
+recebem 400):
+
+- /retirement: RetirementParams, wanted_buy_power e time_to_retire (anos);
+- /property: PropertyParams e, opcionalmente, "financing" com FinancingParams;
+- /business: BusinessParams; também aceita GET com os parâmetros do link de
+  compartilhamento da página 4 (QUERY_PARAMS);
+- /health (GET): contadores do servidor.
+
+"historical_rates": true troca as taxas constantes pelas dos últimos 20 anos
+(anuais, aproximadas e repartidas entre os meses),
+como a opção das páginas. As contas usam as mesmas funções de finances.cache
+que as páginas, então os números são os mesmos.
+
+O servidor roda em asyncio e manda as simulações para um pool de processos.
+Pedidos idênticos ao mesmo tempo esperam uma única simulação. Com
+`max_pending` simulações diferentes em andamento, os próximos pedidos recebem
+503 com Retry-After em vez de entrar em uma fila sem limite.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import json
+import math
+import multiprocessing
+import signal
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from finances import cache
+from finances.business import (
+    MAX_ANO_FIM,
+    MAX_ANO_INICIO,
+    QUERY_PARAMS,
+    BusinessParams,
+)
+from finances.keys import normalize
+from finances.parallel import default_workers
+from finances.property import (
+    MAX_INSTALLMENTS,
+    MAX_MONTHS_TO_SIMULATE,
+    MIN_TAX,
+    FinancingParams,
+    PropertyParams,
+)
+from finances.rates import historical_schedule
+from finances.retirement import (
+    MAX_YEARS_TO_RETIRE,
+    RetirementParams,
+    SavingsRateParams,
+    calculate_monthly_savings,
+)
+
+DEFAULT_PORT = 8502
+MAX_BODY_BYTES = 64 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+READ_TIMEOUT = 10.0
+
+# (minimum, maximum) of the fields, the same as the page widgets; None is no
+# limit. Outside them the kernels divide by zero or allocate without bound
+LIMITS = {
+    PropertyParams: {"months_to_simulate": (1, MAX_MONTHS_TO_SIMULATE)},
+    SavingsRateParams: {"max_months": (1, MAX_YEARS_TO_RETIRE * 12)},
+    FinancingParams: {
+        "number_of_installments": (1, MAX_INSTALLMENTS),
+        "tax": (MIN_TAX, None),
+        "current_rent": (0, None),
+        "months_to_stop_paying_rent": (0, None),
+        "down_payment_fraction": (0, 1),
+    },
+    BusinessParams: {
+        "ano_inicio": (0, MAX_ANO_INICIO),
+        "ano_fim": (1, MAX_ANO_FIM),
+        "equity_inicio_pct": (0, 100),
+        "equity_fim_pct": (0, 100),
+        "probabilidade_sucesso": (1, 100),
+        "margem_lucro_pct": (0, 100),
+    },
+}
+
+
+class RequestError(ValueError):
+    """Pedido inválido, respondido com `status` e a mensagem em JSON."""
+
+    def __init__(self, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+def _number(name: str, value) -> float:
+    # Strings come from the query string of GET /business
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise RequestError(f"{name} deve ser um número")
+    try:
+        number = float(value)
+    except ValueError:
+        raise RequestError(f"{name} deve ser um número") from None
+    if not math.isfinite(number):
+        raise RequestError(f"{name} deve ser finito")
+    return number
+
+
+def _check_range(name: str, value: float, low=None, high=None) -> None:
+    if low is not None and value < low:
+        raise RequestError(f"{name} deve ser pelo menos {low}")
+    if high is not None and value > high:
+        raise RequestError(f"{name} deve ser no máximo {high}")
+
+
+def _coerce(field: dataclasses.Field, value):
+    if field.type is bool:
+        if not isinstance(value, bool):
+            raise RequestError(f"{field.name} deve ser true ou false")
+        return value
+    number = _number(field.name, value)
+    if field.type is int:
+        if not number.is_integer():
+            raise RequestError(f"{field.name} deve ser inteiro")
+        return int(number)
+    return number
+
+
+def params_from(cls, payload: dict, extra=()):
+    """Instância de `cls` com os campos de `payload`; `extra` são outras chaves aceitas.
+
+    Campos fora dos limites de LIMITS (os dos widgets das páginas) são
+    recusados com RequestError. Devolve (parâmetros, dict com as chaves de
+    `extra` presentes).
+    """
+    fields = {f.name: f for f in dataclasses.fields(cls) if f.name != "rates"}
+    unknown = set(payload) - set(fields) - set(extra) - {"historical_rates"}
+    if unknown:
+        raise RequestError(f"Campos desconhecidos: {', '.join(sorted(unknown))}")
+    values = {
+        name: _coerce(fields[name], value)
+        for name, value in payload.items()
+        if name in fields
+    }
+    for name, (low, high) in LIMITS.get(cls, {}).items():
+        # Defaults are within the limits
+        if name in values:
+            _check_range(name, values[name], low, high)
+    if "rates" in {f.name for f in dataclasses.fields(cls)}:
+        historical = payload.get("historical_rates", False)
+        if not isinstance(historical, bool):
+            raise RequestError("historical_rates deve ser true ou false")
+        values["rates"] = historical_schedule() if historical else None
+    try:
+        params = cls(**values)
+    except TypeError:
+        missing = [
+            name
+            for name, f in fields.items()
+            if name not in values
+            and f.default is dataclasses.MISSING
+            and f.default_factory is dataclasses.MISSING
+        ]
+        raise RequestError(
+            f"Campos obrigatórios ausentes: {', '.join(missing)}"
+        ) from None
+    return params, {name: payload[name] for name in extra if name in payload}
+
+
+def jsonable(value):
+    """Resultado em tipos do JSON; NaN e infinitos viram null."""
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "f" and not np.isfinite(value).all():
+            return [None if not math.isfinite(v) else v for v in value.tolist()]
+        return value.tolist()
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(item) for item in value]
+    return value
+
+
+# ── Simulations (run in the worker processes) ────────────────────────────────
+
+
+def run_retirement(params: RetirementParams, wanted_buy_power, time_to_retire):
+    monthly_savings, salary_at_retire = calculate_monthly_savings(
+        wanted_buy_power,
+        time_to_retire,
+        params.current_capital,
+        params.monthly_inflation_rate,
+        params.monthly_investment_return_rate,
+        rates=params.rates,
+    )
+    return jsonable(
+        {"monthly_savings": monthly_savings, "salary_at_retire": salary_at_retire}
+    )
+
+
+def run_property(params: PropertyParams, financing: FinancingParams | None):
+    cash = cache.simulate_property_purchase(params)
+    response = {
+        "cash": {"purchase_month": cash.purchase_month, "series": cash.columns()}
+    }
+    if financing is not None:
+        financed = cache.simulate_property_purchase_financed(params, financing)
+        response["financed"] = {
+            "first_installment_value": financed.first_installment_value,
+            "affordable": financed.affordable,
+            "end_month": financed.end_month,
+            "series": financed.columns(),
+        }
+    return jsonable(response)
+
+
+def run_business(params: BusinessParams):
+    result = cache.simulate_business(params)
+    return jsonable(
+        {
+            "multiplicador_real": result.multiplicador_real,
+            "multiplicador_requerido": result.multiplicador_requerido,
+            "multiple_valuation": result.multiple_valuation,
+            "employee_total": result.employee_total,
+            "biz_success_total": result.biz_success_total,
+            "biz_failure_total": result.biz_failure_total,
+            "breakeven_year": result.breakeven_year,
+            "detail": result.detail_columns(),
+        }
+    )
+
+
+# ── Request parsing (in the event loop, cheap) ───────────────────────────────
+
+
+def _retirement_task(payload: dict):
+    params, extra = params_from(
+        RetirementParams, payload, extra=("wanted_buy_power", "time_to_retire")
+    )
+    if len(extra) < 2:
+        raise RequestError("wanted_buy_power e time_to_retire são obrigatórios")
+    time_to_retire = _number("time_to_retire", extra["time_to_retire"])
+    _check_range("time_to_retire", time_to_retire, 1, MAX_YEARS_TO_RETIRE)
+    return run_retirement, (
+        params,
+        _number("wanted_buy_power", extra["wanted_buy_power"]),
+        time_to_retire,
+    )
+
+
+def _property_task(payload: dict):
+    params, extra = params_from(PropertyParams, payload, extra=("financing",))
+    financing = None
+    if "financing" in extra:
+        if not isinstance(extra["financing"], dict):
+            raise RequestError("financing deve ser um objeto")
+        financing, _ = params_from(FinancingParams, extra["financing"])
+    return run_property, (params, financing)
+
+
+def _business_task(payload: dict):
+    params, _ = params_from(BusinessParams, payload)
+    if params.ano_fim <= params.ano_inicio:
+        raise RequestError("ano_fim deve ser maior que ano_inicio")
+    return run_business, (params,)
+
+
+# Path -> function turning the JSON payload into (simulation, arguments)
+ENDPOINTS = {
+    "/retirement": _retirement_task,
+    "/property": _property_task,
+    "/business": _business_task,
+}
+
+
+@dataclass
+class ServerStats:
+    requests: int = 0
+    # Requests that waited for a simulation already running
+    coalesced: int = 0
+    # Simulations actually sent to the pool
+    computed: int = 0
+    rejected: int = 0
+    errors: int = 0
+
+
+class SimulationServer:
+    """Servidor HTTP/1.1 mínimo (uma requisição por conexão) sobre asyncio."""
+
+    def __init__(self, executor: Executor, max_pending: int | None = None):
+        self.executor = executor
+        self.max_pending = max_pending or 4 * default_workers()
+        self.stats = ServerStats()
+        self._in_flight: dict[tuple, asyncio.Future] = {}
+
+    async def simulate(self, function, args) -> dict:
+        """Resultado de function(*args), compartilhado por pedidos idênticos."""
+        key = (function.__name__, normalize(args))
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats.coalesced += 1
+            # Shielded so that a client hanging up does not cancel the others
+            return await asyncio.shield(future)
+        if len(self._in_flight) >= self.max_pending:
+            self.stats.rejected += 1
+            raise RequestError(
+                "Servidor ocupado, tente de novo", HTTPStatus.SERVICE_UNAVAILABLE
+            )
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, function, *args)
+        self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        self.stats.computed += 1
+        return await asyncio.shield(future)
+
+    async def respond(self, method: str, target: str, body: bytes) -> dict:
+        url = urlsplit(target)
+        if url.path == "/health":
+            return {
+                "status": "ok",
+                "pending": len(self._in_flight),
+                **dataclasses.asdict(self.stats),
+            }
+        task = ENDPOINTS.get(url.path)
+        if task is None:
+            raise RequestError("Endpoint desconhecido", HTTPStatus.NOT_FOUND)
+        if method == "GET" and url.path == "/business":
+            # Same query params as the page's share link
+            query = dict(parse_qsl(url.query))
+            unknown = set(query) - set(QUERY_PARAMS)
+            if unknown:
+                raise RequestError(
+                    f"Parâmetros desconhecidos: {', '.join(sorted(unknown))}"
+                )
+            payload = {QUERY_PARAMS[key]: value for key, value in query.items()}
+        elif method == "POST":
+            try:
+                payload = json.loads(body or b"{}")
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                raise RequestError("Corpo não é um JSON válido") from None
+            if not isinstance(payload, dict):
+                raise RequestError("O corpo deve ser um objeto JSON")
+        else:
+            raise RequestError("Método não permitido", HTTPStatus.METHOD_NOT_ALLOWED)
+        function, args = task(payload)
+        try:
+            return await self.simulate(function, args)
+        except RequestError:
+            raise
+        except ValueError as error:
+            # Validation inside the kernels
+            raise RequestError(str(error)) from None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats.requests += 1
+        status, response, headers = HTTPStatus.OK, None, {}
+        try:
+            method, target, body = await asyncio.wait_for(
+                self._read_request(reader), READ_TIMEOUT
+            )
+            response = await self.respond(method, target, body)
+        except RequestError as error:
+            status, response = error.status, {"error": str(error)}
+            if status == HTTPStatus.SERVICE_UNAVAILABLE:
+                headers["Retry-After"] = "1"
+        except TimeoutError:
+            status, response = HTTPStatus.REQUEST_TIMEOUT, {"error": "Tempo esgotado"}
+        except asyncio.LimitOverrunError:
+            status = HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE
+            response = {"error": "Cabeçalhos grandes demais"}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as error:
+            self.stats.errors += 1
+            status, response = HTTPStatus.INTERNAL_SERVER_ERROR, {
+                "error": f"{type(error).__name__}: {error}"
+            }
+
+        payload = json.dumps(response, ensure_ascii=False).encode()
+        head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(payload)}",
+            "Connection: close",
+            *(f"{name}: {value}" for name, value in headers.items()),
+        ]
+        try:
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + payload)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        head = await reader.readuntil(b"\r\n\r\n")
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            raise RequestError("Requisição malformada") from None
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise RequestError("Content-Length inválido") from None
+        if length > MAX_BODY_BYTES:
+            raise RequestError(
+                "Corpo grande demais", HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+            )
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, body
+
+
+def simulation_executor(workers: int | None = None) -> ProcessPoolExecutor:
+    """Pool de processos do servidor, com "spawn" como finances.parallel."""
+    return ProcessPoolExecutor(
+        workers or default_workers(), mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+async def serve(
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    workers: int | None = None,
+    max_pending: int | None = None,
+    ready: asyncio.Event | None = None,
+):
+    """Atende até ser cancelado; `ready` é sinalizado quando a porta está aberta."""
+    with simulation_executor(workers) as executor:
+        app = SimulationServer(executor, max_pending)
+        server = await asyncio.start_server(
+            app.handle, host, port, limit=MAX_HEADER_BYTES
+        )
+        async with server:
+            addresses = ", ".join(
+                f"{s.getsockname()[0]}:{s.getsockname()[1]}" for s in server.sockets
+            )
+            print(f"finances.api em {addresses}", file=sys.stderr)
+            if ready is not None:
+                ready.set()
+            # SIGTERM (docker stop, kill) stops like Ctrl+C, shutting the pool
+            # down instead of leaving its processes behind
+            task = asyncio.current_task()
+            loop = asyncio.get_running_loop()
+            with contextlib.suppress(NotImplementedError):
+                loop.add_signal_handler(signal.SIGTERM, task.cancel)
+            await server.serve_forever()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m finances.api",
+        description="API HTTP com JSON para as simulações.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processos de simulação"
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=None,
+        help="simulações diferentes em andamento antes de responder 503",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_pending))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
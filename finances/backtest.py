@@ -0,0 +1,152 @@
+"""Teste das contas de aposentadoria contra cada mês de início da série histórica.
+
+Cada janela começa em um mês da série e acumula as taxas dos meses seguintes.
+Todas as janelas saem de uma vez das somas acumuladas dos logaritmos das
+taxas: o crescimento entre os meses s e s + m é exp(L[s + m] - L[s]), e as
+somas de depósitos viram diferenças de outras somas acumuladas, sem laço por
+janela.
+
+Com `wrap=True` a série continua do início quando uma janela passa do fim,
+como na RateSchedule, e todo mês é um início possível. Sem ele só entram as
+janelas que cabem na série.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from finances.rates import RateSchedule
+from finances.retirement import MAX_YEARS_TO_RETIRE, perpetuity_rate
+
+# Entries of each (starts × horizons) matrix of backtest_months_to_retire
+_BLOCK_CELLS = 1 << 18
+
+
+@dataclass(frozen=True)
+class BacktestParams:
+    rates: RateSchedule
+    wrap: bool = True
+
+
+@dataclass(slots=True)
+class SavingsBacktest:
+    # Index in the schedule of the first month of each window
+    starts: np.ndarray
+    monthly_savings: np.ndarray
+    future_salary: np.ndarray
+
+
+@dataclass(slots=True)
+class HorizonBacktest:
+    starts: np.ndarray
+    # NaN when the target is not reached within max_months (or before the end
+    # of the series, without wrap)
+    months_to_retire: np.ndarray
+
+
+def _log_growth(rates: RateSchedule, name: str, months: int) -> np.ndarray:
+    """L[k]: log do crescimento acumulado nos primeiros k meses (0 a `months`)."""
+    log_growth = np.empty(months + 1)
+    log_growth[0] = 0.0
+    np.cumsum(np.log1p(rates.rates(name, months) / 100), out=log_growth[1:])
+    return log_growth
+
+
+def _starts(params: BacktestParams, months: int) -> np.ndarray:
+    n = len(params.rates)
+    return np.arange(n if params.wrap else max(n - months + 1, 0))
+
+
+def backtest_required_savings(
+    params: BacktestParams,
+    wanted_buy_power: float,
+    current_capital: float,
+    months_to_retire: int,
+) -> SavingsBacktest:
+    """Poupança mensal necessária em cada janela de `months_to_retire` meses.
+
+    Mesma conta de simulate_retirement_surface com taxas mês a mês, para todos
+    os meses de início de uma vez.
+    """
+    m = int(months_to_retire)
+    starts = _starts(params, m)
+    ends = starts + m
+    length = len(starts) - 1 + m if len(starts) else 0
+    inflation = _log_growth(params.rates, "inflation", length)
+    investment_return = _log_growth(params.rates, "investment_return", length)
+
+    # Saving 1 at the end of months s + 1 ... s + m is worth
+    # sum exp(L[s + m] - L[s + k]) = exp(L[s + m]) * (D[s + m] - D[s])
+    discount = np.empty(length + 1)
+    discount[0] = 0.0
+    np.cumsum(np.exp(-investment_return[1:]), out=discount[1:])
+    savings_value = np.exp(investment_return[ends]) * (
+        discount[ends] - discount[starts]
+    )
+
+    future_salary = wanted_buy_power * np.exp(inflation[ends] - inflation[starts])
+    return_growth = np.exp(investment_return[ends] - investment_return[starts])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        monthly_savings = (
+            future_salary / perpetuity_rate(params.rates)
+            - current_capital * return_growth
+        ) / savings_value
+    return SavingsBacktest(starts, monthly_savings, future_salary)
+
+
+def backtest_months_to_retire(
+    params: BacktestParams,
+    savings_rate: float,
+    increasing_savings: bool = False,
+    max_months: int = 50 * 12,
+) -> HorizonBacktest:
+    """Meses até poder se aposentar poupando `savings_rate` da renda, por início.
+
+    A taxa necessária (a de calculate_monthly_savings_rate, com taxas mês a mês)
+    é calculada para todos os pares (início, horizonte) em matrizes de até
+    _BLOCK_CELLS entradas, um bloco de inícios por vez, e o resultado de cada
+    início é o primeiro horizonte em que ela cabe no alvo.
+    """
+    if not 1 <= max_months <= MAX_YEARS_TO_RETIRE * 12:
+        raise ValueError(f"max_months deve estar entre 1 e {MAX_YEARS_TO_RETIRE * 12}")
+    starts = _starts(params, 1)
+    horizons = np.arange(1, max_months + 1)
+    length = len(starts) - 1 + max_months
+    inflation = _log_growth(params.rates, "inflation", length)
+    investment_return = _log_growth(params.rates, "investment_return", length)
+
+    # The matrices only gather from 1-D prefix arrays; every exp is taken on those
+    relative_growth = np.exp(inflation - investment_return)
+    deposits = np.empty(length + 2)
+    deposits[0] = 0.0
+    if increasing_savings:
+        # Deposits of Q_0 ... Q_m, with Q_k = relative_growth[s + k] / relative_growth[s]
+        np.cumsum(relative_growth, out=deposits[1:])
+    else:
+        # Deposits of 1 at the end of each month, discounted to the start
+        return_growth = np.exp(investment_return)
+        np.cumsum(1 / return_growth, out=deposits[1:])
+    real_rate = perpetuity_rate(params.rates)
+
+    months = np.full(len(starts), np.nan)
+    block = max(_BLOCK_CELLS // max_months, 1)
+    for first_start in range(0, len(starts), block):
+        s = starts[first_start : first_start + block, None]
+        ends = s + horizons
+        if increasing_savings:
+            required = relative_growth[ends] / (deposits[ends + 1] - deposits[s])
+        else:
+            required = (relative_growth[ends] / relative_growth[s]) / (
+                return_growth[s] * (deposits[ends + 1] - deposits[s + 1])
+            )
+        required /= real_rate
+
+        reached = required <= savings_rate
+        if not params.wrap:
+            reached &= ends <= len(params.rates)
+        months[first_start : first_start + block] = np.where(
+            reached.any(axis=1) & (real_rate > 0),
+            np.argmax(reached, axis=1) + 1.0,
+            np.nan,
+        )
+    return HorizonBacktest(starts, months)
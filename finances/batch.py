@@ -0,0 +1,194 @@
+"""Avaliação em lote de cenários de "Negócio ou emprego" pela linha de comando.
+
+Lê um CSV ou Parquet com uma linha por cenário, usando os mesmos nomes dos
+parâmetros do link compartilhável (`ano_inicio`, `eq_ini`, `remun`,
+`valuation`, ...), e grava as colunas de entrada seguidas dos resultados. Colunas
+ausentes usam os valores padrão da página.
+
+O arquivo é lido e escrito em blocos, e cada bloco é avaliado de uma vez com
+simulate_business_batch em um pool de processos. Os processos também montam e
+codificam as linhas de saída (CSV, ou Arrow IPC para o Parquet), então o
+processo principal só lê a entrada e grava bytes, e a vazão cresce com o
+número de processos. Só alguns blocos ficam em memória ao mesmo tempo, então o
+uso de memória não cresce com o arquivo.
+
+    python -m finances.batch cenarios.csv resultados.parquet --workers 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+
+import numpy as np
+import pandas as pd
+
+from finances.business import QUERY_PARAMS, BusinessParams
+from finances.sensitivity import BusinessBatchResult, simulate_business_batch
+
+DEFAULT_CHUNK_SIZE = 50_000
+RESULT_COLUMNS = [f.name for f in fields(BusinessBatchResult)]
+
+
+def evaluate_chunk(columns: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Resultados de um bloco de cenários, indexado pelos nomes do link.
+
+    Linhas com ano_fim <= ano_inicio ficam com NaN em vez de interromper o lote.
+    """
+    defaults = BusinessParams()
+    n_rows = len(next(iter(columns.values()))) if columns else 0
+    values = {
+        field: np.asarray(
+            columns.get(key, np.full(n_rows, getattr(defaults, field))), dtype=float
+        )
+        for key, field in QUERY_PARAMS.items()
+    }
+    valid = values["ano_fim"] > values["ano_inicio"]
+
+    output = {name: np.full(n_rows, np.nan) for name in RESULT_COLUMNS}
+    if valid.any():
+        batch = simulate_business_batch(
+            defaults, **{field: array[valid] for field, array in values.items()}
+        )
+        for name in RESULT_COLUMNS:
+            output[name][valid] = getattr(batch, name)
+    return output
+
+
+def _payload(frame: pd.DataFrame) -> dict[str, np.ndarray]:
+    return {key: frame[key].to_numpy() for key in QUERY_PARAMS if key in frame.columns}
+
+
+def encode_chunk(frame: pd.DataFrame, parquet: bool, header: bool) -> bytes:
+    """Linhas de saída de um bloco (entrada e resultados), já codificadas.
+
+    CSV em UTF-8, com o cabeçalho se `header`, ou um stream Arrow IPC que o
+    processo principal passa ao arquivo Parquet sem converter de novo.
+    """
+    output = frame.assign(**evaluate_chunk(_payload(frame)))
+    if not parquet:
+        return output.to_csv(index=False, header=header).encode()
+
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(output, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as stream:
+        stream.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _read_chunks(path: str, chunk_size: int):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class _ChunkWriter:
+    """Grava os blocos de encode_chunk em CSV ou Parquet, conforme a extensão."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._writer = None
+        self._file = None
+
+    def write(self, data: bytes) -> None:
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.ipc.open_stream(data).read_all()
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            # CSV chunks may infer int for a column that was float in the first one
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            if self._file is None:
+                self._file = open(self.path, "wb")
+            self._file.write(data)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int | None = None,
+) -> int:
+    """Avalia todos os cenários de `input_path` e grava em `output_path`.
+
+    Com `workers=1` tudo roda no processo atual. Retorna o número de linhas.
+    """
+    workers = workers or os.cpu_count() or 1
+    writer = _ChunkWriter(output_path)
+    rows = 0
+
+    try:
+        if workers == 1:
+            for frame in _read_chunks(input_path, chunk_size):
+                writer.write(encode_chunk(frame, writer.parquet, header=rows == 0))
+                rows += len(frame)
+            return rows
+
+        # Results are written in input order; at most two chunks per worker are
+        # in flight, which is what keeps memory flat on large inputs
+        pending = deque()
+        # The parent runs pyarrow's threads, which make fork unsafe
+        with ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            for frame in _read_chunks(input_path, chunk_size):
+                pending.append(
+                    executor.submit(encode_chunk, frame, writer.parquet, rows == 0)
+                )
+                rows += len(frame)
+                if len(pending) >= 2 * workers:
+                    writer.write(pending.popleft().result())
+            while pending:
+                writer.write(pending.popleft().result())
+        return rows
+    finally:
+        writer.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m finances.batch",
+        description="Avalia cenários de negócio ou emprego em lote.",
+    )
+    parser.add_argument("input", help="CSV ou Parquet com um cenário por linha")
+    parser.add_argument("output", help="arquivo de saída (.csv ou .parquet)")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="linhas por bloco (padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="processos (padrão: número de núcleos)",
+    )
+    args = parser.parse_args(argv)
+
+    rows = run_batch(args.input, args.output, args.chunk_size, args.workers)
+    print(f"{rows} cenários avaliados em {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+# Limits of the page 4 widgets, also enforced by finances.api
+MAX_ANO_INICIO = 20
+MAX_ANO_FIM = 30
+
+
+@dataclass(frozen=True)
+class BusinessParams:
+    ano_inicio: int = 2
+    ano_fim: int = 6
+    equity_inicio_pct: float = 10.0
+    equity_fim_pct: float = 7.0
+    remuneracao_mensal: float = 20_000
+    probabilidade_sucesso: float = 30
+    receita_inicio: float = 1_000_000
+    receita_alvo: float = 5_000_000
+    margem_lucro_pct: float = 15.0
+    valuation_saida: float = 20_000_000
+    prolabore_inicio: float = 8_000
+    prolabore_fim: float = 15_000
+    inflacao_anual_pct: float = 4.5
+
+
+# Share-link query param → BusinessParams field
+QUERY_PARAMS = {
+    "ano_inicio": "ano_inicio",
+    "ano_fim": "ano_fim",
+    "eq_ini": "equity_inicio_pct",
+    "eq_fim": "equity_fim_pct",
+    "remun": "remuneracao_mensal",
+    "prob": "probabilidade_sucesso",
+    "rec_ini": "receita_inicio",
+    "rec_alvo": "receita_alvo",
+    "margem": "margem_lucro_pct",
+    "valuation": "valuation_saida",
+    "pl_ini": "prolabore_inicio",
+    "pl_fim": "prolabore_fim",
+    "inflacao": "inflacao_anual_pct",
+}
+
+
+@dataclass(slots=True)
+class BusinessResult:
+    # One entry per simulated year
+    sim_years: np.ndarray
+    multiplicador_requerido: float
+    multiple_valuation: float
+
+    # Yearly cash flows and equity (in today's R$)
+    emp_cash_yr: np.ndarray
+    biz_cash_yr: np.ndarray
+    biz_equity_yr: np.ndarray
+
+    # Nominal values for contextual charts and the yearly table (no inflation discount)
+    revenue_yr_nom: np.ndarray
+    valuation_yr_nom: np.ndarray
+    equity_value_yr_nom: np.ndarray
+    prolabore_anual_yr_nom: np.ndarray
+    prolabore_mensal_yr_nom: np.ndarray
+    dividendos_yr_nom: np.ndarray
+    equity_pct_yr: np.ndarray
+    biz_cash_yr_nom: np.ndarray
+    emp_cash_yr_nom: np.ndarray
+
+    # Accumulated capital (in today's R$)
+    emp_acc: np.ndarray
+    biz_cash_acc: np.ndarray
+    biz_total_acc: np.ndarray
+
+    employee_total: float = 0.0
+    biz_success_total: float = 0.0
+    biz_failure_total: float = 0.0
+    multiplicador_real: float = 0.0
+    breakeven_year: int | None = None
+
+    def detail_columns(self) -> dict[str, np.ndarray]:
+        """Colunas do detalhamento anual (valores nominais), sem cópia.
+
+        Vira uma tabela com pd.DataFrame(result.detail_columns(), copy=False).
+        """
+        return {
+            "Ano": self.sim_years,
+            "Receita anual": self.revenue_yr_nom,
+            "Pró-labore mensal": self.prolabore_mensal_yr_nom,
+            "Dividendos anuais": self.dividendos_yr_nom,
+            "Equity (%)": self.equity_pct_yr,
+            "Valuation": self.valuation_yr_nom,
+            "Valor do equity": self.equity_value_yr_nom,
+            "Fluxo negócio (anual)": self.biz_cash_yr_nom,
+            "Fluxo empregado (anual)": self.emp_cash_yr_nom,
+        }
+
+
+# Order of the yearly series in BusinessResult, which is also the row order of
+# the block simulate_business fills
+_SERIES = (
+    "emp_cash_yr",
+    "biz_cash_yr",
+    "biz_equity_yr",
+    "revenue_yr_nom",
+    "valuation_yr_nom",
+    "equity_value_yr_nom",
+    "prolabore_anual_yr_nom",
+    "prolabore_mensal_yr_nom",
+    "dividendos_yr_nom",
+    "equity_pct_yr",
+    "biz_cash_yr_nom",
+    "emp_cash_yr_nom",
+    "emp_acc",
+    "biz_cash_acc",
+    "biz_total_acc",
+)
+
+
+def lerp(a, b, t):
+    return a + t * (b - a)
+
+
+def hoje(value, ano, r):
+    """Converte valor nominal do ano `ano` para R$ de hoje."""
+    return value / (1 + r) ** ano
+
+
+def simulate_business(params: BusinessParams) -> BusinessResult:
+    if params.ano_fim <= params.ano_inicio:
+        raise ValueError("ano_fim deve ser maior que ano_inicio")
+
+    # ── Derived constants ─────────────────────────────────────────────────────
+    window_length = params.ano_fim - params.ano_inicio
+    r = params.inflacao_anual_pct / 100.0
+    multiple_valuation = (
+        params.valuation_saida / params.receita_alvo if params.receita_alvo > 0 else 0.0
+    )
+
+    # All yearly series live in one preallocated block, one row per series
+    sim_years = np.arange(params.ano_inicio, params.ano_fim + 1)
+    block = np.empty((len(_SERIES), len(sim_years)))
+    (
+        emp_cash_yr,
+        biz_cash_yr,
+        biz_equity_yr,
+        revenue_yr_nom,
+        valuation_yr_nom,
+        equity_value_yr_nom,
+        prolabore_anual_yr_nom,
+        prolabore_mensal_yr_nom,
+        dividendos_yr_nom,
+        equity_pct_yr,
+        biz_cash_yr_nom,
+        emp_cash_yr_nom,
+        emp_acc,
+        biz_cash_acc,
+        biz_total_acc,
+    ) = (memoryview(row) for row in block)
+
+    running_emp = 0.0
+    running_biz = 0.0
+    breakeven_year = None
+
+    # ── Year-by-year simulation ───────────────────────────────────────────────
+    for i, ano in enumerate(range(params.ano_inicio, params.ano_fim + 1)):
+        t = i / window_length
+
+        revenue_t = lerp(params.receita_inicio, params.receita_alvo, t)
+        equity_t = lerp(params.equity_inicio_pct, params.equity_fim_pct, t) / 100.0
+        prolabore_t = lerp(params.prolabore_inicio, params.prolabore_fim, t)
+
+        # Derived valuation: revenue × constant multiple (fixed at exit ratio)
+        valuation_t = (
+            revenue_t * multiple_valuation
+            if ano < params.ano_fim
+            else params.valuation_saida
+        )
+
+        prolabore_anual = prolabore_t * 12.0
+        dividendos_t = revenue_t * (params.margem_lucro_pct / 100.0) * equity_t
+        biz_cash_anual = prolabore_anual + dividendos_t
+
+        # Employee: nominal salary grows with inflation so that real value = remuneracao_mensal
+        emp_anual_nominal = params.remuneracao_mensal * 12.0 * (1 + r) ** ano
+        emp_cash = hoje(emp_anual_nominal, ano, r)
+        biz_cash = hoje(biz_cash_anual, ano, r)
+        biz_equity = hoje(equity_t * valuation_t, ano, r)
+
+        # Accumulated capital (in today's R$)
+        running_emp += emp_cash
+        running_biz += biz_cash
+        if breakeven_year is None and running_biz + biz_equity >= running_emp:
+            breakeven_year = ano
+
+        emp_cash_yr[i] = emp_cash
+        biz_cash_yr[i] = biz_cash
+        biz_equity_yr[i] = biz_equity
+        revenue_yr_nom[i] = revenue_t
+        valuation_yr_nom[i] = valuation_t
+        equity_value_yr_nom[i] = equity_t * valuation_t
+        prolabore_anual_yr_nom[i] = prolabore_anual
+        prolabore_mensal_yr_nom[i] = prolabore_t
+        dividendos_yr_nom[i] = dividendos_t
+        equity_pct_yr[i] = equity_t * 100.0
+        biz_cash_yr_nom[i] = biz_cash_anual
+        emp_cash_yr_nom[i] = emp_anual_nominal
+        emp_acc[i] = running_emp
+        biz_cash_acc[i] = running_biz
+        biz_total_acc[i] = running_biz + biz_equity
+
+    # ── Summary metrics ───────────────────────────────────────────────────────
+    biz_success_total = running_biz + biz_equity
+    return BusinessResult(
+        sim_years,
+        100.0 / params.probabilidade_sucesso,
+        multiple_valuation,
+        *block,
+        employee_total=running_emp,
+        biz_success_total=biz_success_total,
+        biz_failure_total=running_biz,  # no equity in failure scenario
+        multiplicador_real=(
+            biz_success_total / running_emp if running_emp > 0 else 0.0
+        ),
+        breakeven_year=breakeven_year,
+    )
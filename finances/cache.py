@@ -0,0 +1,291 @@
+"""Cache de resultados compartilhado entre sessões.
+
+O Streamlit reexecuta a página inteira a cada interação, mas a maior parte das
+sessões usa os mesmos parâmetros. As funções deste módulo embrulham os kernels
+de simulação com um cache LRU com TTL, compartilhado pelo processo inteiro e
+chaveado pelos parâmetros normalizados.
+
+Os resultados devolvidos são compartilhados entre sessões e não devem ser
+modificados por quem chama: os arrays deles são marcados como somente leitura,
+então escrever neles levanta ValueError em vez de mudar o resultado das outras
+sessões.
+
+Com FINANCES_STORE definida, o que falta na memória é procurado antes no
+arquivo de resultados de finances.store, compartilhado pelos processos da
+máquina, e o que é calculado é gravado nele em segundo plano, exceto pelos
+caches com persist=False.
+"""
+
+import copy
+import dataclasses
+import functools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from finances.backtest import (
+    backtest_months_to_retire as _backtest_months_to_retire,
+    backtest_required_savings as _backtest_required_savings,
+)
+from finances.business import simulate_business as _simulate_business
+from finances.goalseek import (
+    affordable_buy_power as _affordable_buy_power,
+    exit_valuation_for_multiple as _exit_valuation_for_multiple,
+    minimum_monthly_saving as _minimum_monthly_saving,
+)
+from finances.keys import normalize
+from finances.montecarlo import (
+    simulate_business_monte_carlo as _simulate_business_monte_carlo,
+    simulate_property_monte_carlo as _simulate_property_monte_carlo,
+)
+from finances.offers import compare_offers as _compare_offers
+from finances.optimize import (
+    optimize_financing as _optimize_financing,
+    simulate_payoff_heatmap as _simulate_payoff_heatmap,
+)
+from finances.property import (
+    extend_property_purchase,
+    extend_property_purchase_financed,
+    simulate_property_purchase as _simulate_property_purchase,
+    simulate_property_purchase_financed as _simulate_property_purchase_financed,
+)
+from finances.retirement import (
+    simulate_retirement_grid as _simulate_retirement_grid,
+    simulate_retirement_surface as _simulate_retirement_surface,
+    simulate_savings_rate_curve as _simulate_savings_rate_curve,
+)
+from finances.sensitivity import (
+    simulate_business_sensitivity_grid as _simulate_business_sensitivity_grid,
+    simulate_business_tornado as _simulate_business_tornado,
+)
+from finances.store import default_store
+
+DEFAULT_MAXSIZE = 256
+DEFAULT_TTL = 60 * 60
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+    maxsize: int = DEFAULT_MAXSIZE
+
+
+class ResultCache:
+    """Cache LRU com expiração, seguro para uso por várias threads."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key):
+        """Retorna (True, valor) se a chave estiver no cache e não tiver expirado."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return True, value
+                del self._entries[key]
+                self._evictions += 1
+            self._misses += 1
+            return False, None
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._entries),
+                self.maxsize,
+            )
+
+
+_caches: dict[str, ResultCache] = {}
+
+
+def _read_only(value):
+    """Marca como somente leitura os arrays de `value` (e dos seus campos)."""
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        for f in dataclasses.fields(value):
+            if f.compare:
+                _read_only(getattr(value, f.name))
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _read_only(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _read_only(item)
+    return value
+
+
+def memoize(
+    name: str,
+    maxsize: int = DEFAULT_MAXSIZE,
+    ttl: float = DEFAULT_TTL,
+    persist: bool = True,
+):
+    """Decorador que guarda os resultados de `func` em um ResultCache chamado `name`.
+
+    Com persist=False os resultados ficam só na memória, fora do arquivo de
+    resultados: para os grandes e baratos de recalcular.
+    """
+    cache = _caches.setdefault(name, ResultCache(maxsize, ttl))
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (normalize(args), normalize(kwargs))
+            found, value = cache.get(key)
+            if found:
+                return value
+            store = default_store() if persist else None
+            if store is not None:
+                store_key = store.key(name, key)
+                found, value = store.get(store_key)
+            if not found:
+                value = func(*args, **kwargs)
+                if store is not None:
+                    store.put(store_key, name, value)
+            cache.put(key, _read_only(value))
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+class _Checkpoint:
+    def __init__(self, result):
+        self.result = result
+        self.lock = threading.Lock()
+
+
+def memoize_horizon(
+    name: str, extend, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL
+):
+    """Como memoize, mas para simulações mês a mês que podem ser continuadas.
+
+    A chave ignora o horizonte (params.months_to_simulate, do primeiro argumento).
+    O cache guarda a simulação mais longa já feita, com o estado para continuá-la:
+    um horizonte menor é um recorte dela e um maior só simula os meses que faltam,
+    com `extend(params, *args, result)`. Quem chama recebe result.head(months):
+    um resultado do tamanho pedido cujas séries são views somente leitura da
+    simulação guardada, sem cópia, e que não devem ser modificadas. Ao crescer,
+    a simulação guardada passa para arrays novos, então as views já entregues
+    continuam válidas. No arquivo de resultados fica a primeira simulação feita
+    para a chave.
+    """
+    cache = _caches.setdefault(name, ResultCache(maxsize, ttl))
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(params, *args):
+            months = params.months_to_simulate
+            key = normalize((dataclasses.replace(params, months_to_simulate=0), *args))
+            found, checkpoint = cache.get(key)
+            if not found:
+                store = default_store()
+                if store is not None:
+                    store_key = store.key(name, key)
+                    found, result = store.get(store_key)
+                if not found:
+                    result = func(params, *args)
+                    # The store pickles it later, and by then the checkpoint
+                    # may be growing in place
+                    if store is not None:
+                        store.put(store_key, name, copy.deepcopy(result))
+                checkpoint = _Checkpoint(result)
+                cache.put(key, checkpoint)
+            with checkpoint.lock:
+                if checkpoint.result.months < months:
+                    extend(params, *args, checkpoint.result)
+                # The checkpoint itself stays writable, to be extended in place
+                return _read_only(checkpoint.result.head(months))
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def cache_stats() -> dict[str, CacheStats]:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def clear_caches() -> None:
+    for cache in _caches.values():
+        cache.clear()
+
+
+simulate_retirement_grid = memoize("retirement_grid")(_simulate_retirement_grid)
+# A few MiB per rate change on page 1, and only milliseconds to recompute
+simulate_retirement_surface = memoize("retirement_surface", maxsize=8, persist=False)(
+    _simulate_retirement_surface
+)
+simulate_savings_rate_curve = memoize("savings_rate_curve")(
+    _simulate_savings_rate_curve
+)
+backtest_required_savings = memoize("backtest_required_savings")(
+    _backtest_required_savings
+)
+backtest_months_to_retire = memoize("backtest_months_to_retire", maxsize=32)(
+    _backtest_months_to_retire
+)
+simulate_property_purchase = memoize_horizon(
+    "property_purchase", extend_property_purchase
+)(_simulate_property_purchase)
+simulate_property_purchase_financed = memoize_horizon(
+    "property_purchase_financed", extend_property_purchase_financed
+)(_simulate_property_purchase_financed)
+simulate_business = memoize("business")(_simulate_business)
+simulate_business_monte_carlo = memoize("business_monte_carlo", maxsize=32)(
+    _simulate_business_monte_carlo
+)
+simulate_property_monte_carlo = memoize("property_monte_carlo", maxsize=32)(
+    _simulate_property_monte_carlo
+)
+simulate_business_tornado = memoize("business_tornado")(_simulate_business_tornado)
+simulate_business_sensitivity_grid = memoize("business_sensitivity_grid", maxsize=32)(
+    _simulate_business_sensitivity_grid
+)
+compare_offers = memoize("offer_comparison", maxsize=32)(_compare_offers)
+optimize_financing = memoize("financing_optimization", maxsize=32)(_optimize_financing)
+simulate_payoff_heatmap = memoize("payoff_heatmap", maxsize=32)(
+    _simulate_payoff_heatmap
+)
+affordable_buy_power = memoize("affordable_buy_power")(_affordable_buy_power)
+minimum_monthly_saving = memoize("minimum_monthly_saving", maxsize=32)(
+    _minimum_monthly_saving
+)
+exit_valuation_for_multiple = memoize("exit_valuation_for_multiple")(
+    _exit_valuation_for_multiple
+)
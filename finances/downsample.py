@@ -0,0 +1,69 @@
+"""Redução de séries longas para gráficos (Largest-Triangle-Three-Buckets).
+
+O LTTB divide a série em baldes e escolhe, em cada um, o ponto que forma o
+maior triângulo com o ponto escolhido no balde anterior e a média do balde
+seguinte, o que preserva a forma visual da curva com poucos pontos.
+"""
+
+import numpy as np
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """Índices, em ordem, dos `n_out` pontos de (x, y) escolhidos pelo LTTB.
+
+    O primeiro e o último ponto são sempre mantidos. Se a série já tem até
+    `n_out` pontos, todos são devolvidos.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    n_out = max(n_out, 3)
+
+    # Buckets for the n - 2 inner points; the first and last points are fixed
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # NaN (e.g. an empty band) must not win every comparison
+    y = np.where(np.isnan(y), 0.0, y)
+    next_x = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1) / np.diff(edges)
+    next_y = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1) / np.diff(edges)
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 1 < n_out - 2:
+            avg_x, avg_y = next_x[bucket + 1], next_y[bucket + 1]
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[bucket + 1] = a
+    return selected
+
+
+def downsample_indices(x, ys, budget: int, keep=()) -> np.ndarray:
+    """Índices a manter de séries que compartilham o eixo `x`.
+
+    Cada série de `ys` recebe uma fatia igual de `budget` no LTTB e os índices
+    são unidos, para que todas continuem com o mesmo `x`. Mínimos e máximos de
+    cada série e os índices de `keep` (eventos como a compra ou a quitação)
+    entram sempre, então o resultado pode passar um pouco de `budget`.
+    """
+    n = len(x)
+    if n <= budget:
+        return np.arange(n)
+    per_series = max(budget // max(len(ys), 1), 3)
+    indices = [np.asarray(keep, dtype=np.int64)]
+    for y in ys:
+        y = np.asarray(y, dtype=float)
+        indices.append(lttb_indices(x, y, per_series))
+        if not np.isnan(y).all():
+            indices.append(np.array([np.nanargmin(y), np.nanargmax(y)]))
+    merged = np.unique(np.concatenate(indices))
+    return merged[(merged >= 0) & (merged < n)]
@@ -0,0 +1,200 @@
+"""Exportação das séries das simulações para CSV ou Parquet, em blocos.
+
+As linhas saem de geradores sobre as colunas numpy do resultado (views, sem
+cópia) e são gravadas um bloco de CHUNK_ROWS por vez, então exportar um
+horizonte longo não monta antes uma lista de linhas nem um DataFrame. Os
+valores são gravados crus, sem a formatação em reais das páginas: ponto
+decimal, todas as casas e células vazias (CSV) ou nulos (Parquet) para NaN.
+
+    python -m finances.export property params.json -o imovel.parquet
+    echo '{"valuation_saida": 30000000}' | python -m finances.export business -o anos.csv
+
+O JSON de parâmetros é o mesmo dos endpoints /property e /business de
+finances.api.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+
+import numpy as np
+
+from finances import cache
+from finances.business import BusinessParams
+from finances.property import (
+    CashPurchaseResult,
+    FinancedPurchaseResult,
+    FinancingParams,
+    PropertyParams,
+)
+
+CHUNK_ROWS = 8192
+
+# Format -> MIME type of the exported file
+FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+
+def property_columns(
+    cash: CashPurchaseResult, financed: FinancedPurchaseResult | None = None
+) -> dict[str, np.ndarray]:
+    """Séries mensais das compras à vista e financiada, lado a lado, sem cópia.
+
+    As do financiamento ficam de fora quando a primeira parcela não cabe no
+    orçamento (o resultado não tem séries).
+    """
+    columns = {"month": np.arange(1, cash.months + 1)}
+    columns.update({f"cash_{name}": series for name, series in cash.columns().items()})
+    if financed is not None and financed.affordable:
+        columns.update(
+            {f"financed_{name}": series for name, series in financed.columns().items()}
+        )
+    return columns
+
+
+def iter_chunks(columns: dict[str, np.ndarray], chunk_rows: int = CHUNK_ROWS):
+    """Blocos de até `chunk_rows` linhas, como dicts de views das colunas."""
+    rows = len(next(iter(columns.values()), ()))
+    for start in range(0, rows, chunk_rows):
+        yield {
+            name: series[start : start + chunk_rows] for name, series in columns.items()
+        }
+
+
+def iter_rows(columns: dict[str, np.ndarray], chunk_rows: int = CHUNK_ROWS):
+    """Linhas como tuplas de escalares Python; NaN vira None."""
+    for chunk in iter_chunks(columns, chunk_rows):
+        values = []
+        for series in chunk.values():
+            if series.dtype.kind == "f" and np.isnan(series).any():
+                missing = np.isnan(series)
+                series = series.astype(object)
+                series[missing] = None
+            values.append(series.tolist())
+        yield from zip(*values)
+
+
+def write_csv(
+    columns: dict[str, np.ndarray], file: io.IOBase, chunk_rows: int = CHUNK_ROWS
+) -> None:
+    """Grava em `file` (binário) um CSV UTF-8, com floats no formato do repr."""
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    writer.writerows(iter_rows(columns, chunk_rows))
+    # Leaves `file` open for the caller
+    text.flush()
+    text.detach()
+
+
+def write_parquet(
+    columns: dict[str, np.ndarray], file: io.IOBase, chunk_rows: int = CHUNK_ROWS
+) -> None:
+    """Grava em `file` (binário) um Parquet, um row group por bloco."""
+    # pyarrow comes with streamlit, but the kernels and the API do not need it
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [(name, pa.from_numpy_dtype(series.dtype)) for name, series in columns.items()]
+    )
+    with pq.ParquetWriter(file, schema) as writer:
+        for chunk in iter_chunks(columns, chunk_rows):
+            writer.write_batch(
+                pa.record_batch(
+                    [pa.array(series, from_pandas=True) for series in chunk.values()],
+                    schema=schema,
+                )
+            )
+
+
+def write(
+    columns: dict[str, np.ndarray],
+    file: io.IOBase,
+    fmt: str,
+    chunk_rows: int = CHUNK_ROWS,
+) -> None:
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato desconhecido: {fmt}")
+    writer = write_csv if fmt == "csv" else write_parquet
+    writer(columns, file, chunk_rows)
+
+
+def export_bytes(columns: dict[str, np.ndarray], fmt: str) -> bytes:
+    """O arquivo inteiro em memória, para o botão de download das páginas."""
+    buffer = io.BytesIO()
+    write(columns, buffer, fmt)
+    return buffer.getvalue()
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+
+def _property_columns(payload: dict) -> dict[str, np.ndarray]:
+    from finances.api import RequestError, params_from
+
+    params, extra = params_from(PropertyParams, payload, extra=("financing",))
+    financed = None
+    if "financing" in extra:
+        if not isinstance(extra["financing"], dict):
+            raise RequestError("financing deve ser um objeto")
+        financing, _ = params_from(FinancingParams, extra["financing"])
+        financed = cache.simulate_property_purchase_financed(params, financing)
+    return property_columns(cache.simulate_property_purchase(params), financed)
+
+
+def _business_columns(payload: dict) -> dict[str, np.ndarray]:
+    from finances.api import RequestError, params_from
+
+    params, _ = params_from(BusinessParams, payload)
+    if params.ano_fim <= params.ano_inicio:
+        raise RequestError("ano_fim deve ser maior que ano_inicio")
+    return cache.simulate_business(params).detail_columns()
+
+
+SIMULATIONS = {"property": _property_columns, "business": _business_columns}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m finances.export",
+        description="Exporta as séries de uma simulação para CSV ou Parquet.",
+    )
+    parser.add_argument("simulation", choices=list(SIMULATIONS))
+    parser.add_argument(
+        "params", nargs="?", help="JSON com os parâmetros (padrão: entrada padrão)"
+    )
+    parser.add_argument("-o", "--output", required=True, help="arquivo de saída")
+    parser.add_argument(
+        "--format",
+        choices=list(FORMATS),
+        help="formato (padrão: pela extensão de --output)",
+    )
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        parser.error("informe --format ou use a extensão .csv ou .parquet")
+    if args.params:
+        with open(args.params, encoding="utf-8") as f:
+            payload = json.load(f)
+    else:
+        payload = json.load(sys.stdin)
+    if not isinstance(payload, dict):
+        parser.error("os parâmetros devem ser um objeto JSON")
+
+    try:
+        columns = SIMULATIONS[args.simulation](payload)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    with open(args.output, "wb") as f:
+        write(columns, f, fmt, args.chunk_rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Formatação de valores em reais, sem depender do locale do processo.
+
+locale.setlocale altera um estado global do processo, compartilhado pelas
+threads em que o Streamlit roda cada sessão, e falha em máquinas sem o locale
+pt_BR gerado. Aqui a formatação é feita só com NumPy, no mesmo formato que o
+locale pt_BR produz para moeda: "R$ 1.234,56" e "-R$ 1.234,56".
+"""
+
+from decimal import Decimal
+
+import numpy as np
+
+# int64 holds at most 7 groups of three digits
+_MAX_GROUPS = 7
+# Below this value * 100 is under 2 ** 52, where every half integer is a float,
+# so rounding it only goes wrong when it lands exactly on one. Larger values and
+# those ties are formatted one by one with Python integers
+_MAX_VECTOR_VALUE = 2.0**52 / 100
+
+# Converting integers to text is the slow part, so digit groups are looked up
+# in precomputed tables instead
+_GROUPS = np.array([f"{i:03d}" for i in range(1000)])
+_CENTAVOS = np.array([f"{i:02d}" for i in range(100)])
+
+
+def _brl_scalar(value: float) -> str:
+    """Um valor finito qualquer, com os inteiros sem limite do Python."""
+    # value * 100 in floating point would already be off by thousands
+    cents = round(Decimal(value).scaleb(2))
+    reais, centavos = divmod(abs(cents), 100)
+    integer = f"{reais:,}".replace(",", ".")
+    return f"{'-' if cents < 0 else ''}R$ {integer},{centavos:02d}"
+
+
+def brl_array(values) -> np.ndarray:
+    """Formata um array (ou coluna) inteiro de valores em reais de uma vez.
+
+    Valores não finitos viram "—".
+    """
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return np.empty(values.shape, dtype=str)
+    finite = np.isfinite(values)
+    scaled = np.where(finite, values, 0.0) * 100
+    # A tie in value * 100 may come from a value just above or below it
+    exact = finite & (
+        (np.abs(values) >= _MAX_VECTOR_VALUE) | (scaled - np.floor(scaled) == 0.5)
+    )
+    finite &= ~exact
+    cents = np.rint(np.where(finite, scaled, 0.0))
+    negative = cents < 0
+    cents = np.abs(cents).astype(np.int64)
+    reais, centavos = np.divmod(cents, 100)
+
+    # Every value gets the same number of zero-padded groups; the padding of
+    # the leading group is then stripped along with its separators
+    n_groups = 1
+    largest = int(reais.max(initial=0))
+    while largest >= 1000 and n_groups < _MAX_GROUPS:
+        largest //= 1000
+        n_groups += 1
+    integer = _GROUPS[reais % 1000]
+    for k in range(1, n_groups):
+        group = _GROUPS[reais // 1000**k % 1000]
+        integer = np.strings.add(np.strings.add(group, "."), integer)
+    integer = np.strings.lstrip(integer, "0.")
+    integer = np.where(integer == "", "0", integer)
+
+    formatted = np.strings.add(
+        np.strings.add(np.where(negative, "-R$ ", "R$ "), integer),
+        np.strings.add(",", _CENTAVOS[centavos]),
+    )
+    formatted = np.where(finite, formatted, "—")
+    if exact.any():
+        formatted = formatted.astype(object)
+        formatted[exact] = [_brl_scalar(value) for value in values[exact]]
+        formatted = formatted.astype(str)
+    return formatted
+
+
+def brl(value: float, markdown: bool = False) -> str:
+    """Formata um valor em reais, como "R$ 1.234,56".
+
+    Com `markdown=True` o cifrão é escapado, para textos passados a st.write e
+    st.markdown, que interpretam "$...$" como LaTeX.
+    """
+    text = str(brl_array(value).item())
+    return text.replace("$", "\\$") if markdown else text
@@ -0,0 +1,242 @@
+"""Perguntas inversas: qual valor de um parâmetro leva um resultado até um alvo.
+
+find_roots procura, para muitos alvos de uma vez, o ponto em que uma função
+monótona chega a cada alvo. Ela mantém um intervalo com o alvo entre as duas
+pontas e o estreita com regula falsi (variante Illinois) ou bisseção; cada
+passo é uma única chamada da função para todos os alvos ainda em aberto, então
+uma resposta custa algumas dezenas de avaliações dos kernels.
+"""
+
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from finances.business import BusinessParams
+from finances.property import PropertyParams, simulate_property_purchase
+from finances.retirement import (
+    RetirementParams,
+    calculate_monthly_savings,
+    simulate_retirement_surface,
+)
+from finances.sensitivity import simulate_business_batch
+
+METHODS = ("illinois", "bisect")
+
+
+@dataclass(slots=True)
+class GoalSeekResult:
+    # Same shape as the targets
+    targets: np.ndarray
+    # Smallest value (within the tolerance) at which each target is reached;
+    # NaN when it is not reached between low and the expanded high
+    solutions: np.ndarray
+    converged: np.ndarray
+    # Calls to the function, each for every target still open
+    evaluations: int
+
+
+def find_roots(
+    function,
+    targets,
+    low,
+    high,
+    increasing: bool = True,
+    method: str = "illinois",
+    xtol: float = 1e-6,
+    rtol: float = 1e-10,
+    max_iterations: int = 100,
+    max_expansions: int = 40,
+) -> GoalSeekResult:
+    """Resolve function(x) = alvo para cada alvo, com x a partir de `low`.
+
+    `function(x, rows)` recebe um array de x e os índices (em targets.ravel())
+    dos alvos a que eles correspondem, e devolve os valores nesses pontos. Ela
+    deve ser monótona em x: crescente, ou decrescente com `increasing=False`.
+    `low` é o menor x possível; se o alvo já é atingido nele, a resposta é
+    `low`. Enquanto o alvo não é atingido em `high`, o intervalo é estendido
+    para a frente.
+
+    "illinois" converge em poucos passos para funções contínuas; "bisect" é
+    para funções em degraus, como um mês de compra.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método desconhecido: {method}")
+    targets = np.asarray(targets, dtype=float)
+    flat_targets = targets.ravel()
+    size = flat_targets.size
+    a = np.broadcast_to(np.asarray(low, dtype=float), targets.shape).ravel().copy()
+    b = np.broadcast_to(np.asarray(high, dtype=float), targets.shape).ravel().copy()
+    evaluations = 0
+
+    def residual(x, rows):
+        # Negative until the target is reached, whatever the direction
+        nonlocal evaluations
+        evaluations += 1
+        values = np.asarray(function(x, rows), dtype=float) - flat_targets[rows]
+        return values if increasing else -values
+
+    solutions = np.full(size, np.nan)
+    converged = np.zeros(size, dtype=bool)
+    rows = np.arange(size)
+    ra = residual(a, rows) if size else np.empty(0)
+    at_low = ra >= 0
+    solutions[at_low] = a[at_low]
+    converged[at_low] = True
+
+    # Expand the bracket forward until the target is reached at its high end
+    open_rows = np.flatnonzero(ra < 0)
+    rb = np.full(size, np.nan)
+    if open_rows.size:
+        rb[open_rows] = residual(b[open_rows], open_rows)
+    for _ in range(max_expansions):
+        rows = open_rows[rb[open_rows] < 0]
+        if rows.size == 0:
+            break
+        width = b[rows] - a[rows]
+        a[rows], ra[rows] = b[rows], rb[rows]
+        b[rows] = b[rows] + 2 * width
+        rb[rows] = residual(b[rows], rows)
+    # NaN residuals (outside the function's domain) never count as bracketed
+    open_rows = open_rows[rb[open_rows] >= 0]
+
+    # Side of the bracket moved last: -1 low, 1 high, 0 none yet
+    side = np.zeros(size, dtype=np.int8)
+    for _ in range(max_iterations):
+        tolerance = xtol + rtol * np.abs(b[open_rows])
+        done = b[open_rows] - a[open_rows] <= tolerance
+        converged[open_rows[done]] = True
+        solutions[open_rows[done]] = b[open_rows[done]]
+        open_rows, tolerance = open_rows[~done], tolerance[~done]
+        if open_rows.size == 0:
+            break
+
+        lo, hi = a[open_rows], b[open_rows]
+        midpoint = (lo + hi) / 2
+        if method == "bisect":
+            x = midpoint
+        else:
+            r_lo, r_hi = ra[open_rows], rb[open_rows]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x = hi - r_hi * (hi - lo) / (r_hi - r_lo)
+            # Step at least half a tolerance inside, so a point that lands on
+            # an end of the bracket still shrinks it
+            x = np.clip(x, lo + tolerance / 2, hi - tolerance / 2)
+            x = np.where(np.isfinite(r_lo) & np.isfinite(r_hi), x, midpoint)
+            x = np.where(np.isfinite(x), x, midpoint)
+
+        rx = residual(x, open_rows)
+        reached = rx >= 0
+        rows, kept = open_rows[reached], open_rows[~reached]
+        if method == "illinois":
+            # Halve the residual of an end that stays put twice in a row
+            ra[rows[side[rows] == 1]] /= 2
+            rb[kept[side[kept] == -1]] /= 2
+        b[rows], rb[rows], side[rows] = x[reached], rx[reached], 1
+        a[kept], ra[kept], side[kept] = x[~reached], rx[~reached], -1
+    else:
+        solutions[open_rows] = b[open_rows]
+
+    return GoalSeekResult(
+        targets,
+        solutions.reshape(targets.shape),
+        converged.reshape(targets.shape),
+        evaluations,
+    )
+
+
+def affordable_buy_power(
+    params: RetirementParams, monthly_savings, time_to_retire
+) -> GoalSeekResult:
+    """Poder de compra que cada poupança mensal sustenta ao aposentar.
+
+    É o inverso de calculate_monthly_savings; `monthly_savings` e
+    `time_to_retire` (em anos) são combinados por broadcasting. NaN quando o
+    retorno não supera a inflação.
+    """
+    targets, years = np.broadcast_arrays(
+        np.asarray(monthly_savings, dtype=float),
+        np.asarray(time_to_retire, dtype=float),
+    )
+    years = years.ravel()
+
+    def required_savings(buy_power, rows):
+        if params.rates is None:
+            return calculate_monthly_savings(
+                buy_power,
+                years[rows],
+                params.current_capital,
+                params.monthly_inflation_rate,
+                params.monthly_investment_return_rate,
+            ).monthly_savings
+        # The surface takes a grid, so each horizon is one call
+        months = np.round(years[rows] * 12).astype(np.int64)
+        savings = np.empty(len(rows))
+        for horizon in np.unique(months):
+            selected = months == horizon
+            savings[selected] = simulate_retirement_surface(
+                params, buy_power[selected], [horizon]
+            ).monthly_savings[:, 0]
+        return savings
+
+    return find_roots(
+        required_savings, targets, 0.0, np.maximum(targets, 1.0), xtol=0.005
+    )
+
+
+def minimum_monthly_saving(params: PropertyParams, months) -> GoalSeekResult:
+    """Menor poupança mensal inicial que compra o imóvel à vista em até `months` meses.
+
+    Cada avaliação é uma simulate_property_purchase de `months` meses com a
+    poupança candidata; o mês da compra só muda em degraus, então a busca é
+    por bisseção.
+    """
+    months = np.asarray(months, dtype=np.int64)
+    horizons = months.ravel()
+
+    def purchase_month(savings, rows):
+        purchase_months = np.empty(len(rows))
+        for k, (saving, row) in enumerate(zip(savings.tolist(), rows.tolist())):
+            result = simulate_property_purchase(
+                replace(
+                    params,
+                    initial_monthly_saving=saving,
+                    months_to_simulate=int(horizons[row]) + 1,
+                )
+            )
+            month = result.purchase_month
+            purchase_months[k] = np.inf if month is None else month
+        return purchase_months
+
+    return find_roots(
+        purchase_month,
+        months + 0.5,
+        0.0,
+        params.property_value / np.maximum(months, 1),
+        increasing=False,
+        method="bisect",
+        xtol=0.005,
+    )
+
+
+def exit_valuation_for_multiple(
+    params: BusinessParams, multiples=None
+) -> GoalSeekResult:
+    """Valuation de saída com que o multiplicador real chega a cada multiplicador.
+
+    Sem `multiples`, o multiplicador requerido pela probabilidade de sucesso.
+    """
+    if multiples is None:
+        multiples = 100.0 / params.probabilidade_sucesso
+
+    def multiplicador_real(valuation, rows):
+        return simulate_business_batch(
+            params, valuation_saida=valuation
+        ).multiplicador_real
+
+    return find_roots(
+        multiplicador_real,
+        multiples,
+        0.0,
+        max(params.valuation_saida, 1.0),
+        xtol=0.5,
+    )
@@ -0,0 +1,38 @@
+"""Chaves estáveis para parâmetros de simulação.
+
+Módulo folha, sem os kernels: usado pelo cache, pelo servidor da API e pelo
+hash de parâmetros das métricas de timing.
+"""
+
+import dataclasses
+
+import numpy as np
+
+
+def normalize(value):
+    """Transforma parâmetros em uma chave hashable e estável.
+
+    Inteiros e floats com o mesmo valor viram a mesma chave (um `number_input`
+    pode devolver 1 ou 1.0), e sequências viram tuplas. Campos de dataclass com
+    compare=False (como as séries de uma RateSchedule) ficam fora da chave.
+    """
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return (
+            type(value).__name__,
+            tuple(
+                (f.name, normalize(getattr(value, f.name)))
+                for f in dataclasses.fields(value)
+                if f.compare
+            ),
+        )
+    if isinstance(value, np.ndarray):
+        return tuple(normalize(v) for v in value.tolist())
+    if isinstance(value, (list, tuple, range)):
+        return tuple(normalize(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, normalize(v)) for k, v in value.items()))
+    return value
@@ -0,0 +1,435 @@
+"""Simulações de Monte Carlo vetorizadas.
+
+Os caminhos são processados em blocos de tamanho fixo, então a memória não
+cresce com o número de caminhos. Cada bloco tem seu próprio gerador derivado de
+(seed, índice do bloco), de forma que o resultado é o mesmo em qualquer rerun ou
+worker, independente de quem processou cada bloco.
+"""
+
+from dataclasses import dataclass
+from itertools import repeat
+
+import numpy as np
+
+from finances.amortization import first_installment_value
+from finances.business import BusinessParams
+from finances.property import FinancingParams, PropertyParams, down_payment_split
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+@dataclass(frozen=True)
+class BusinessMonteCarloParams:
+    n_paths: int = 100_000
+    chunk_size: int = 20_000
+    seed: int = 0
+    # Standard deviations of the log of mean-one multiplicative shocks
+    revenue_volatility: float = 0.5
+    dilution_volatility: float = 0.3
+    multiple_volatility: float = 0.5
+    # Years the liquidity event slips past ano_fim: min(Poisson(mean), max)
+    mean_liquidity_delay: float = 1.0
+    max_liquidity_delay: int = 4
+
+
+@dataclass
+class BusinessMonteCarloResult:
+    years: np.ndarray
+    percentiles: tuple
+    # Shape (len(percentiles), len(years)), in today's R$
+    biz_total_bands: np.ndarray
+    emp_bands: np.ndarray
+    # Percentiles of biz_total / emp at each path's liquidity event
+    multiplier_percentiles: np.ndarray
+    prob_business_wins: float
+    n_paths: int
+
+
+class LogHistogram:
+    """Histograma com bins logarítmicos por coluna, para percentis em streaming.
+
+    Com os valores padrão cada bin tem largura relativa de 10 ** (13 / 2600) - 1,
+    cerca de 1,2%, o que basta para desenhar faixas de percentis sem guardar
+    todos os caminhos.
+    """
+
+    def __init__(
+        self, n_columns: int, low: float = 1.0, high: float = 1e13, bins: int = 2600
+    ):
+        self.n_columns = n_columns
+        self.bins = bins
+        self.edges = np.geomspace(low, high, bins + 1)
+        self._log_low = np.log10(low)
+        self._log_width = (np.log10(high) - self._log_low) / bins
+        self.counts = np.zeros((n_columns, bins), dtype=np.int64)
+
+    def add(self, values: np.ndarray) -> None:
+        values = values.reshape(len(values), self.n_columns)
+        with np.errstate(divide="ignore"):
+            index = np.floor((np.log10(values) - self._log_low) / self._log_width)
+        index = np.clip(np.nan_to_num(index, neginf=0), 0, self.bins - 1).astype(
+            np.int64
+        )
+        flat = index + np.arange(self.n_columns) * self.bins
+        self.counts += np.bincount(
+            flat.ravel(), minlength=self.n_columns * self.bins
+        ).reshape(self.n_columns, self.bins)
+
+    def merge(self, other: "LogHistogram") -> None:
+        self.counts += other.counts
+
+    def quantiles(self, percentiles) -> np.ndarray:
+        """Percentis por coluna, no formato (len(percentiles), n_columns)."""
+        cumulative = np.cumsum(self.counts, axis=1)
+        total = cumulative[:, -1:]
+        centers = np.sqrt(self.edges[:-1] * self.edges[1:])
+        result = np.empty((len(percentiles), self.n_columns))
+        for k, p in enumerate(percentiles):
+            position = np.argmax(cumulative >= np.ceil(total * p / 100), axis=1)
+            result[k] = centers[position]
+        return result
+
+
+def chunk_generator(seed: int, chunk_index: int) -> np.random.Generator:
+    """Gerador do bloco `chunk_index`, igual em qualquer processo."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+
+
+def _mean_one_lognormal(rng, sigma, size):
+    return np.exp(rng.normal(-(sigma**2) / 2, sigma, size))
+
+
+def simulate_business_paths(
+    params: BusinessParams,
+    mc: BusinessMonteCarloParams,
+    rng: np.random.Generator,
+    size: int,
+):
+    """Simula `size` caminhos do negócio de uma vez.
+
+    Retorna (years, biz_total_acc, emp_acc), com os acumulados no formato
+    (size, len(years)). Depois do evento de liquidez de cada caminho os
+    acumulados ficam congelados, então a última coluna é o resultado final.
+    """
+    r = params.inflacao_anual_pct / 100.0
+    multiple_valuation = (
+        params.valuation_saida / params.receita_alvo if params.receita_alvo > 0 else 0.0
+    )
+    years = np.arange(params.ano_inicio, params.ano_fim + mc.max_liquidity_delay + 1)
+
+    growth = _mean_one_lognormal(rng, mc.revenue_volatility, size)
+    equity_end = np.clip(
+        params.equity_fim_pct * _mean_one_lognormal(rng, mc.dilution_volatility, size),
+        0.0,
+        100.0,
+    )
+    multiple = _mean_one_lognormal(rng, mc.multiple_volatility, size)
+    liquidity_year = params.ano_fim + np.minimum(
+        rng.poisson(mc.mean_liquidity_delay, size), mc.max_liquidity_delay
+    )
+    success = rng.random(size) < params.probabilidade_sucesso / 100.0
+
+    liquidity_year = liquidity_year[:, None]
+    effective_year = np.minimum(years, liquidity_year)
+    in_window = years <= liquidity_year
+    t = (effective_year - params.ano_inicio) / (liquidity_year - params.ano_inicio)
+
+    revenue = params.receita_inicio + t * (
+        (params.receita_alvo * growth)[:, None] - params.receita_inicio
+    )
+    equity = (
+        params.equity_inicio_pct + t * (equity_end[:, None] - params.equity_inicio_pct)
+    ) / 100.0
+    prolabore = params.prolabore_inicio + t * (
+        params.prolabore_fim - params.prolabore_inicio
+    )
+    valuation = np.where(
+        effective_year == liquidity_year,
+        (params.valuation_saida * growth * multiple)[:, None],
+        revenue * multiple_valuation * multiple[:, None],
+    )
+    discount = (1 + r) ** effective_year
+
+    biz_cash = (
+        prolabore * 12.0 + revenue * (params.margem_lucro_pct / 100.0) * equity
+    ) / discount
+    biz_cash_acc = np.cumsum(np.where(in_window, biz_cash, 0.0), axis=1)
+    biz_total_acc = biz_cash_acc + np.where(
+        success[:, None], equity * valuation / discount, 0.0
+    )
+    emp_acc = np.cumsum(
+        np.where(in_window, params.remuneracao_mensal * 12.0, 0.0), axis=1
+    )
+    return years, biz_total_acc, emp_acc
+
+
+def simulate_business_monte_carlo(
+    params: BusinessParams,
+    mc: BusinessMonteCarloParams = BusinessMonteCarloParams(),
+    percentiles=DEFAULT_PERCENTILES,
+) -> BusinessMonteCarloResult:
+    if params.ano_fim <= params.ano_inicio:
+        raise ValueError("ano_fim deve ser maior que ano_inicio")
+
+    n_years = params.ano_fim + mc.max_liquidity_delay - params.ano_inicio + 1
+    biz_hist = LogHistogram(n_years)
+    emp_hist = LogHistogram(n_years)
+    multiplier_hist = LogHistogram(1, low=1e-4, high=1e4)
+    wins = 0
+
+    for chunk_index, start in enumerate(range(0, mc.n_paths, mc.chunk_size)):
+        size = min(mc.chunk_size, mc.n_paths - start)
+        years, biz_total_acc, emp_acc = simulate_business_paths(
+            params, mc, chunk_generator(mc.seed, chunk_index), size
+        )
+        biz_hist.add(biz_total_acc)
+        emp_hist.add(emp_acc)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            multiplier_hist.add(biz_total_acc[:, -1] / emp_acc[:, -1])
+        wins += int(np.count_nonzero(biz_total_acc[:, -1] >= emp_acc[:, -1]))
+
+    return BusinessMonteCarloResult(
+        years=np.arange(params.ano_inicio, params.ano_inicio + n_years),
+        percentiles=tuple(percentiles),
+        biz_total_bands=biz_hist.quantiles(percentiles),
+        emp_bands=emp_hist.quantiles(percentiles),
+        multiplier_percentiles=multiplier_hist.quantiles(percentiles)[:, 0],
+        prob_business_wins=wins / mc.n_paths,
+        n_paths=mc.n_paths,
+    )
+
+
+@dataclass(frozen=True)
+class PropertyMonteCarloParams:
+    n_paths: int = 10_000
+    seed: int = 0
+    # Stationary standard deviation of each monthly rate, in percentage points
+    inflation_volatility: float = 0.2
+    investment_return_volatility: float = 0.3
+    property_value_volatility: float = 0.3
+    # AR(1) coefficient of the monthly rates: 0 draws independent months
+    persistence: float = 0.9
+
+
+@dataclass
+class PropertyMonteCarloResult:
+    months: np.ndarray
+    percentiles: tuple
+    first_installment_value: float
+    affordable: bool
+    # Shape (len(percentiles), len(months))
+    cash_total_capital_bands: np.ndarray
+    financed_total_capital_bands: np.ndarray | None
+    # One entry per path, NaN when the event does not happen within the horizon
+    purchase_months: np.ndarray
+    payoff_months: np.ndarray | None
+
+
+class _RatePaths:
+    """Taxas mensais de cada caminho, seguindo um AR(1) em torno da média."""
+
+    def __init__(self, rng, mean, volatility, persistence, size):
+        self._rng = rng
+        self._mean = mean
+        self._persistence = persistence
+        self._shock = volatility * np.sqrt(1 - persistence**2)
+        self._deviation = volatility * rng.standard_normal(size)
+
+    def next(self) -> np.ndarray:
+        """Desvio em relação à média para o mês atual, avançando para o próximo."""
+        deviation = self._deviation
+        self._deviation = self._persistence * deviation + self._shock * (
+            self._rng.standard_normal(deviation.shape)
+        )
+        return deviation
+
+
+def _installment_bisect_left(prefix, target, first_value, growth):
+    """O mesmo que np.searchsorted(prefix, target) para as somas das parcelas.
+
+    Os valores-base das parcelas formam uma PG, então a posição sai da forma
+    fechada da soma. Um ajuste de uma posição contra `prefix` corrige o
+    arredondamento e devolve exatamente o índice da busca binária.
+    """
+    n = len(prefix) - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        estimate = np.ceil(
+            -np.log(1 - target * (growth - 1) / first_value) / np.log(growth)
+        )
+    index = np.clip(np.nan_to_num(estimate, nan=n + 1), 0, n + 1).astype(np.int64)
+    index = np.where(
+        (index <= n) & (prefix[np.minimum(index, n)] < target), index + 1, index
+    )
+    return np.where((index > 0) & (prefix[index - 1] >= target), index - 1, index)
+
+
+def simulate_property_monte_carlo(
+    params: PropertyParams,
+    financing: FinancingParams,
+    mc: PropertyMonteCarloParams = PropertyMonteCarloParams(),
+    percentiles=DEFAULT_PERCENTILES,
+) -> PropertyMonteCarloResult:
+    """Compra à vista e financiada com taxas aleatórias, todos os caminhos de uma vez.
+
+    As duas simulações avançam juntas mês a mês sobre vetores de caminhos e veem
+    as mesmas taxas sorteadas. A compra à vista e a quitação são tratadas com
+    máscaras, sem laço por caminho. Com volatilidade zero o resultado coincide
+    com simulate_property_purchase e simulate_property_purchase_financed.
+    """
+    size = mc.n_paths
+    n_months = params.months_to_simulate
+    rng = np.random.default_rng(mc.seed)
+    inflation = _RatePaths(
+        rng,
+        params.monthly_inflation_rate,
+        mc.inflation_volatility,
+        mc.persistence,
+        size,
+    )
+    investment_return = _RatePaths(
+        rng,
+        params.monthly_investment_return_rate,
+        mc.investment_return_volatility,
+        mc.persistence,
+        size,
+    )
+    appreciation = _RatePaths(
+        rng, 0.0, mc.property_value_volatility, mc.persistence, size
+    )
+
+    financed_value, remaining_cash = down_payment_split(params, financing)
+    first_value = first_installment_value(
+        financed_value, financing.number_of_installments, financing.tax
+    )
+    affordable = first_value <= params.initial_monthly_saving
+
+    # Cash purchase state
+    savings = np.full(size, float(params.available_cash))
+    cash_property_value = np.full(size, float(params.property_value))
+    bought = np.zeros(size, dtype=bool)
+    purchase_months = np.full(size, np.nan)
+    cash_bands = np.empty((n_months, len(percentiles)))
+    cash_bands[0] = float(params.available_cash)
+
+    # Financed purchase state. The contract rate is fixed, so the installment
+    # schedule and its correction factor are shared by every path and only the
+    # index of the last open installment differs.
+    if affordable:
+        growth = 1 + financing.tax / 100
+        base = first_value / growth ** np.arange(
+            1, financing.number_of_installments + 1
+        )
+        prefix = np.concatenate(([0.0], np.cumsum(base)))
+        factor = 1.0
+        end = np.full(size, financing.number_of_installments)
+        leftover = np.full(size, float(remaining_cash))
+        rent = np.full(size, float(financing.current_rent))
+        financed_property_value = np.full(size, float(params.property_value))
+        paid_off = np.zeros(size, dtype=bool)
+        payoff_months = np.full(size, np.nan)
+        financed_bands = np.empty((n_months, len(percentiles)))
+        financed_bands[0] = float(params.property_value) - prefix[-1] + remaining_cash
+
+    monthly_saving = np.full(size, float(params.initial_monthly_saving))
+
+    # The shocks are drawn around the constant rates or, with params.rates,
+    # around the rate of each month
+    if params.rates is None:
+        mean_rates = repeat(
+            (
+                params.monthly_inflation_rate,
+                params.monthly_investment_return_rate,
+                params.monthly_property_value_increase,
+                params.monthly_property_value_increase_when_bought,
+            )
+        )
+    else:
+        appreciation_rates = params.rates.rates("appreciation", n_months).tolist()
+        mean_rates = zip(
+            params.rates.rates("inflation", n_months).tolist(),
+            params.rates.rates("investment_return", n_months).tolist(),
+            appreciation_rates,
+            appreciation_rates,
+        )
+
+    for month, (
+        mean_inflation_rate,
+        mean_return_rate,
+        property_value_increase,
+        property_value_increase_when_bought,
+    ) in zip(range(1, n_months), mean_rates):
+        inflation_rate = mean_inflation_rate + inflation.next()
+        return_rate = mean_return_rate + investment_return.next()
+        appreciation_shock = appreciation.next()
+        bought_growth = (
+            1 + (property_value_increase_when_bought + appreciation_shock) / 100
+        )
+
+        # ── Cash ──────────────────────────────────────────────────────────────
+        savings = savings * (1 + return_rate / 100) + monthly_saving
+        cash_property_value = cash_property_value * np.where(
+            bought,
+            bought_growth,
+            1 + (property_value_increase + appreciation_shock) / 100,
+        )
+        buys = ~bought & (savings > cash_property_value)
+        savings = np.where(buys, savings - cash_property_value, savings)
+        purchase_months[buys] = month
+        bought |= buys
+        cash_bands[month] = np.percentile(
+            savings + np.where(bought, cash_property_value, 0.0), percentiles
+        )
+
+        # ── Financed ──────────────────────────────────────────────────────────
+        if affordable:
+            factor *= growth
+            # Every path is paid off once the due installment runs past the contract
+            first = min(month, financing.number_of_installments)
+            due = base[month - 1] * factor if month <= len(base) else 0.0
+            paying = ~paid_off
+
+            available = monthly_saving + leftover
+            if month >= financing.months_to_stop_paying_rent:
+                available = available + rent
+            available -= due
+            target = prefix[end] - np.maximum(available, 0.0) / factor
+            start = np.clip(
+                _installment_bisect_left(prefix, target, first_value, growth),
+                first,
+                end,
+            )
+            prepaying = paying & (available > 0)
+            available = np.where(
+                prepaying, available - (prefix[end] - prefix[start]) * factor, available
+            )
+            end = np.where(prepaying, start, end)
+
+            # Paths that were already paid off invest what they save plus the rent
+            invested = (monthly_saving + rent + leftover) * (1 + return_rate / 100)
+            leftover = np.where(paying, available, invested)
+
+            need_to_pay = np.where(
+                paying & (first < end), (prefix[end] - prefix[first]) * factor, 0.0
+            )
+            financed_property_value = financed_property_value * bought_growth
+            pays_off = paying & (first >= end)
+            payoff_months[pays_off] = month
+            paid_off |= pays_off
+
+            financed_bands[month] = np.percentile(
+                leftover + financed_property_value - need_to_pay, percentiles
+            )
+            rent = rent * (1 + inflation_rate / 100)
+
+        monthly_saving = monthly_saving * (1 + inflation_rate / 100)
+
+    return PropertyMonteCarloResult(
+        months=np.arange(1, n_months + 1),
+        percentiles=tuple(percentiles),
+        first_installment_value=first_value,
+        affordable=affordable,
+        cash_total_capital_bands=cash_bands.T,
+        financed_total_capital_bands=financed_bands.T if affordable else None,
+        purchase_months=purchase_months,
+        payoff_months=payoff_months if affordable else None,
+    )
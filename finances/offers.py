@@ -0,0 +1,336 @@
+"""Comparação de muitas ofertas de financiamento de uma vez.
+
+Cada oferta tem a sua taxa, o seu prazo, o seu sistema de amortização (Price ou
+SAC), seguro e tarifas. As parcelas de todas as ofertas formam um único array
+(oferta × mês), e a simulação com amortizações extraordinárias avança mês a mês
+sobre todas as ofertas juntas, com as mesmas regras de
+simulate_property_purchase_financed: a poupança do mês paga a parcela, o seguro
+e a tarifa, e a sobra quita parcelas a partir da última.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from finances.property import (
+    MAX_INSTALLMENTS,
+    FinancingParams,
+    PropertyParams,
+    down_payment_split,
+    monthly_growth,
+)
+
+SYSTEMS = ("price", "sac")
+RANKINGS = ("total_cost", "payoff", "capital")
+
+# Column of an offers table (CSV or data editor) -> FinancingOffer field
+OFFER_COLUMNS = {
+    "banco": "name",
+    "taxa_mensal": "tax",
+    "parcelas": "number_of_installments",
+    "sistema": "system",
+    "seguro_mensal_pct": "insurance_rate",
+    "tarifa_mensal": "monthly_fee",
+    "custos_iniciais": "upfront_fees",
+}
+REQUIRED_COLUMNS = ("banco", "taxa_mensal", "parcelas")
+
+
+@dataclass(frozen=True)
+class FinancingOffer:
+    name: str
+    tax: float
+    number_of_installments: int
+    system: str = "price"
+    # Charged every month as % of the outstanding balance (MIP, DFI)
+    insurance_rate: float = 0.0
+    monthly_fee: float = 0.0
+    # Paid at signing, out of the cash not used as down payment
+    upfront_fees: float = 0.0
+
+
+@dataclass(slots=True)
+class AmortizationSchedules:
+    # Shape (offers, longest term); zero after the last installment of an offer
+    installments: np.ndarray
+    # Balance at the start of each month, before its interest
+    balances: np.ndarray
+
+
+@dataclass(slots=True)
+class OfferComparison:
+    offers: tuple[FinancingOffer, ...]
+    # Installment, insurance and fee of the first month
+    first_payment: np.ndarray
+    affordable: np.ndarray
+    # Over the whole term, without prepayments, including the upfront fees
+    total_cost: np.ndarray
+    total_interest: np.ndarray
+    # NaN when the offer is not affordable or the debt is not paid within the
+    # horizon
+    end_month: np.ndarray
+    # NaN when the offer is not affordable
+    final_total_capital: np.ndarray
+
+    def ranking(self, by: str = "total_cost") -> np.ndarray:
+        """Índices das ofertas da melhor para a pior; as que não cabem vão no fim.
+
+        `by` é "total_cost" (menor custo total), "payoff" (quitação mais cedo,
+        desempatada pelo capital) ou "capital" (maior capital no fim).
+        """
+        if by not in RANKINGS:
+            raise ValueError(f"Critério desconhecido: {by}")
+        payoff = np.nan_to_num(self.end_month, nan=np.inf)
+        capital = np.nan_to_num(self.final_total_capital, nan=-np.inf)
+        keys = {
+            "total_cost": (-capital, self.total_cost),
+            "payoff": (-capital, payoff),
+            "capital": (payoff, -capital),
+        }[by]
+        # np.lexsort sorts by the last key first
+        return np.lexsort((*keys, ~self.affordable))
+
+
+def offers_from_columns(columns) -> tuple[FinancingOffer, ...]:
+    """Ofertas a partir de colunas com os nomes de OFFER_COLUMNS.
+
+    Aceita um dict de sequências ou um DataFrame. Colunas opcionais ausentes
+    ou vazias usam os valores padrão de FinancingOffer.
+    """
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+    n_rows = len(columns["banco"])
+    fields = {}
+    for column, field_name in OFFER_COLUMNS.items():
+        if column in columns:
+            fields[field_name] = list(columns[column])
+    offers = []
+    for row in range(n_rows):
+        values = {}
+        for field_name, values_of_field in fields.items():
+            value = values_of_field[row]
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                if field_name in ("name", "tax", "number_of_installments"):
+                    raise ValueError(f"Linha {row + 1}: {field_name} em branco")
+                continue
+            values[field_name] = value
+        installments = float(values.pop("number_of_installments"))
+        if not installments.is_integer():
+            raise ValueError(f"Linha {row + 1}: parcelas deve ser um número inteiro")
+        offers.append(
+            FinancingOffer(
+                name=str(values.pop("name")),
+                tax=float(values.pop("tax")),
+                number_of_installments=int(installments),
+                system=str(values.pop("system", "price")).strip().lower(),
+                **{name: float(value) for name, value in values.items()},
+            )
+        )
+    return tuple(offers)
+
+
+def amortization_schedules(
+    financed_value: float, tax, number_of_installments, sac
+) -> AmortizationSchedules:
+    """Parcelas e saldos de todos os contratos, sem amortizações extraordinárias.
+
+    `tax` (% ao mês), `number_of_installments` e `sac` (bool) têm um valor por
+    contrato.
+    """
+    rate = np.asarray(tax, dtype=float)[:, None] / 100
+    n = np.asarray(number_of_installments, dtype=np.int64)[:, None]
+    sac = np.asarray(sac, dtype=bool)[:, None]
+    paid = np.arange(np.max(n, initial=0))
+    active = paid < n
+
+    growth = (1 + rate) ** paid
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price_installment = np.where(
+            rate > 0, financed_value * rate / (1 - (1 + rate) ** -n), financed_value / n
+        )
+        price_balance = np.where(
+            rate > 0,
+            financed_value * growth - price_installment * (growth - 1) / rate,
+            financed_value - paid * price_installment,
+        )
+    sac_balance = financed_value - paid * (financed_value / n)
+
+    balances = np.where(
+        active, np.maximum(np.where(sac, sac_balance, price_balance), 0), 0
+    )
+    installments = np.where(
+        active,
+        np.where(sac, financed_value / n + rate * balances, price_installment),
+        0.0,
+    )
+    return AmortizationSchedules(installments, balances)
+
+
+def _bisect_left(prefix, rows, target, lo, hi):
+    """bisect.bisect_left em cada linha de `prefix`, para todas as linhas juntas."""
+    last = prefix.shape[1] - 1
+    lo = lo.copy()
+    hi = hi.copy()
+    while True:
+        searching = lo < hi
+        if not searching.any():
+            return lo
+        mid = np.minimum((lo + hi) // 2, last)
+        below = prefix[rows, mid] < target
+        lo = np.where(searching & below, mid + 1, lo)
+        hi = np.where(searching & ~below, mid, hi)
+
+
+def compare_offers(
+    params: PropertyParams,
+    financing: FinancingParams,
+    offers: tuple[FinancingOffer, ...],
+) -> OfferComparison:
+    """Compara as ofertas com a poupança, o aluguel e a entrada de `financing`.
+
+    A taxa e as parcelas de `financing` são trocadas pelas de cada oferta.
+    """
+    for offer in offers:
+        if offer.system not in SYSTEMS:
+            raise ValueError(f"{offer.name}: sistema desconhecido: {offer.system}")
+        # The schedules have one column per installment of the longest offer
+        installments = offer.number_of_installments
+        if (
+            installments != int(installments)
+            or not 1 <= installments <= MAX_INSTALLMENTS
+        ):
+            raise ValueError(
+                f"{offer.name}: parcelas deve ser um inteiro entre 1 e {MAX_INSTALLMENTS}"
+            )
+        if offer.tax < 0:
+            raise ValueError(f"{offer.name}: a taxa não pode ser negativa")
+
+    tax = np.array([o.tax for o in offers], dtype=float)
+    installments = np.array([o.number_of_installments for o in offers], dtype=np.int64)
+    insurance = np.array([o.insurance_rate for o in offers], dtype=float) / 100
+    fee = np.array([o.monthly_fee for o in offers], dtype=float)
+    upfront = np.array([o.upfront_fees for o in offers], dtype=float)
+
+    financed_value, remaining_cash = down_payment_split(params, financing)
+    schedules = amortization_schedules(
+        financed_value, tax, installments, [o.system == "sac" for o in offers]
+    )
+    first_payment = (
+        schedules.installments[:, 0] + insurance * financed_value + fee
+        if len(offers)
+        else np.empty(0)
+    )
+    affordable = first_payment <= params.initial_monthly_saving
+    total_interest = schedules.installments.sum(axis=1) - financed_value
+    total_cost = (
+        schedules.installments.sum(axis=1)
+        + (insurance[:, None] * schedules.balances).sum(axis=1)
+        + fee * installments
+        + upfront
+    )
+
+    end_month = np.full(len(offers), np.nan)
+    final_total_capital = np.full(len(offers), np.nan)
+    rows = np.flatnonzero(affordable)
+    if rows.size:
+        end_month[rows], final_total_capital[rows] = _simulate_offers(
+            params,
+            financing,
+            schedules.installments[rows],
+            tax[rows],
+            installments[rows],
+            insurance[rows],
+            fee[rows],
+            remaining_cash - upfront[rows],
+        )
+    return OfferComparison(
+        tuple(offers),
+        first_payment,
+        affordable,
+        total_cost,
+        total_interest,
+        end_month,
+        final_total_capital,
+    )
+
+
+def _simulate_offers(
+    params, financing, installments, tax, n, insurance, fee, liquid_capital
+):
+    """(mês da quitação, capital no fim) das ofertas, todas juntas mês a mês.
+
+    Como em InstallmentSchedule, cada parcela é guardada pelo seu valor na data
+    do contrato e corrigida por um fator comum da oferta, então as parcelas em
+    aberto são um intervalo [first, end) de somas acumuladas.
+    """
+    size, longest = installments.shape
+    rows = np.arange(size)
+    growth = 1 + tax / 100
+    base = installments / growth[:, None] ** np.arange(1, longest + 1)
+    prefix = np.zeros((size, longest + 1))
+    np.cumsum(base, axis=1, out=prefix[:, 1:])
+    factor = np.ones(size)
+    first = np.zeros(size, dtype=np.int64)
+    end = n.copy()
+
+    leftover = liquid_capital.astype(float)
+    paid_off = np.zeros(size, dtype=bool)
+    end_month = np.full(size, np.nan)
+    need_to_pay = prefix[rows, end]
+    monthly_saving = float(params.initial_monthly_saving)
+    rent = float(financing.current_rent)
+    property_value = float(params.property_value)
+
+    investment, inflation, _, appreciation = monthly_growth(
+        params, 0, params.months_to_simulate - 1
+    )
+    for month, investment_growth, inflation_growth, property_growth in zip(
+        range(1, params.months_to_simulate), investment, inflation, appreciation
+    ):
+        property_value = property_value * property_growth
+        paying = ~paid_off
+        # Insurance is charged on the balance before this month's interest
+        charges = np.where(paying, insurance * need_to_pay + fee, 0.0)
+        factor *= growth
+
+        available = monthly_saving + leftover
+        if month >= financing.months_to_stop_paying_rent:
+            available = available + rent
+        due = first < end
+        available -= (
+            np.where(due, base[rows, np.minimum(first, longest - 1)] * factor, 0.0)
+            + charges
+        )
+        first = first + due
+
+        # Whatever is left prepays installments from the last one
+        prepaying = paying & (available > 0) & (first < end)
+        start = _bisect_left(
+            prefix,
+            rows,
+            prefix[rows, end] - np.maximum(available, 0.0) / factor,
+            first,
+            np.where(prepaying, end + 1, first),
+        )
+        available = np.where(
+            prepaying,
+            available - (prefix[rows, end] - prefix[rows, start]) * factor,
+            available,
+        )
+        end = np.where(prepaying, start, end)
+
+        # Offers already paid off invest the saving and the rent instead
+        invested = (monthly_saving + rent + leftover) * investment_growth
+        leftover = np.where(paying, available, invested)
+        need_to_pay = np.where(
+            first < end, (prefix[rows, end] - prefix[rows, first]) * factor, 0.0
+        )
+        pays_off = paying & (first >= end)
+        end_month[pays_off] = month
+        paid_off |= pays_off
+
+        rent = rent * inflation_growth
+        monthly_saving = monthly_saving * inflation_growth
+
+    return end_month, leftover + property_value - need_to_pay
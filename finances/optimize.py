@@ -0,0 +1,262 @@
+"""Busca dos parâmetros de financiamento que melhor atendem a um objetivo.
+
+O espaço (parcelas × entrada × meses até parar de pagar aluguel) é grande demais
+para simular inteiro a cada rerun. A busca começa em uma grade grossa, mantém só
+os melhores candidatos e refina em volta deles com passos cada vez menores.
+Contratos cuja primeira parcela não cabe na poupança são descartados sem
+simular e, quando o objetivo é quitar cedo, cada simulação para no mês em que
+já não poderia entrar no ranking.
+"""
+
+import dataclasses
+import itertools
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from finances.amortization import first_installment_value
+from finances.parallel import executor_for, parallel_map
+from finances.property import (
+    FinancingParams,
+    PropertyParams,
+    down_payment_split,
+    simulate_property_purchase_financed,
+)
+
+OBJECTIVES = ("payoff", "capital")
+
+# Down payment fractions are searched in multiples of 1 / DOWN_PAYMENT_UNITS
+DOWN_PAYMENT_UNITS = 32
+
+
+@dataclass(frozen=True)
+class FinancingSearchSpace:
+    min_installments: int = 12
+    max_installments: int = 420
+    installments_step: int = 48
+    # In units of 1 / DOWN_PAYMENT_UNITS
+    down_payment_step: int = 8
+    min_down_payment_fraction: float = 0.0
+
+
+@dataclass
+class FinancingCandidate:
+    financing: FinancingParams
+    first_installment_value: float
+    end_month: int | None
+    final_total_capital: float
+
+
+@dataclass
+class FinancingOptimization:
+    objective: str
+    # Best first; empty when no contract in the space is affordable
+    ranking: list[FinancingCandidate]
+    evaluated: int
+    pruned: int
+
+    @property
+    def best(self) -> FinancingCandidate | None:
+        return self.ranking[0] if self.ranking else None
+
+
+@dataclass
+class PayoffHeatmap:
+    number_of_installments: np.ndarray
+    tax: np.ndarray
+    # Shape (len(tax), len(number_of_installments)); NaN when the first
+    # installment is not affordable or the debt is not paid within the horizon
+    end_month: np.ndarray
+
+
+def _simulate(task):
+    """(mês de quitação, capital no fim, capital na quitação) de um contrato."""
+    params, financing = task
+    result = simulate_property_purchase_financed(params, financing)
+    if result.end_month is None:
+        return None, float(result.total_capital[-1]), math.nan
+    return (
+        result.end_month,
+        float(result.total_capital[-1]),
+        float(result.total_capital[result.end_month]),
+    )
+
+
+def _score(objective: str, end_month, final_total_capital, capital_at_payoff):
+    if end_month is None:
+        return (
+            (math.inf, 0.0)
+            if objective == "payoff"
+            else (-final_total_capital, math.inf)
+        )
+    # Ties on the payoff month are broken by the capital at that month, which
+    # does not depend on how far the run went
+    if objective == "payoff":
+        return end_month, -capital_at_payoff
+    return -final_total_capital, end_month
+
+
+def _axis(low: int, high: int, step: int) -> list[int]:
+    return sorted({*range(low, high + 1, step), high})
+
+
+def optimize_financing(
+    params: PropertyParams,
+    financing: FinancingParams,
+    objective: str = "payoff",
+    space: FinancingSearchSpace = FinancingSearchSpace(),
+    top_k: int = 5,
+    parallel: bool = True,
+) -> FinancingOptimization:
+    """Melhores contratos para o objetivo, mantendo a taxa e o aluguel de `financing`.
+
+    `objective` é "payoff" (quitar no menor mês) ou "capital" (maior capital
+    total no fim do horizonte). Os meses até parar de pagar aluguel variam de 0
+    até o valor de `financing`, e só quando há aluguel.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Objetivo desconhecido: {objective}")
+
+    max_rent_months = (
+        int(financing.months_to_stop_paying_rent) if financing.current_rent > 0 else 0
+    )
+    low = (
+        space.min_installments,
+        math.ceil(space.min_down_payment_fraction * DOWN_PAYMENT_UNITS),
+        0,
+    )
+    high = (space.max_installments, DOWN_PAYMENT_UNITS, max_rent_months)
+    steps = [
+        space.installments_step,
+        space.down_payment_step,
+        max(1, math.ceil(max_rent_months / 4)),
+    ]
+
+    def to_financing(point) -> FinancingParams:
+        installments, down_payment, rent_months = point
+        return dataclasses.replace(
+            financing,
+            number_of_installments=installments,
+            down_payment_fraction=down_payment / DOWN_PAYMENT_UNITS,
+            months_to_stop_paying_rent=rent_months,
+        )
+
+    def affordable(point) -> bool:
+        candidate = to_financing(point)
+        financed_value, _ = down_payment_split(params, candidate)
+        value = first_installment_value(
+            financed_value, candidate.number_of_installments, candidate.tax
+        )
+        return value <= params.initial_monthly_saving
+
+    scores = {}
+    pruned = set()
+    frontier = set(itertools.product(*(_axis(*axis) for axis in zip(low, high, steps))))
+    survivors = []
+    while True:
+        new = [p for p in frontier if p not in scores and p not in pruned]
+        pruned.update(p for p in new if not affordable(p))
+        new = [p for p in new if p not in pruned]
+
+        # Branch and bound: nothing that pays off after the current k-th best
+        # payoff month can enter the ranking, so those runs stop there
+        horizon = params.months_to_simulate
+        if objective == "payoff" and len(survivors) == top_k:
+            kth_payoff = _score(objective, *scores[survivors[-1]])[0]
+            if kth_payoff < math.inf:
+                horizon = min(horizon, int(kth_payoff) + 1)
+        truncated = dataclasses.replace(params, months_to_simulate=horizon)
+        results = parallel_map(
+            _simulate,
+            [(truncated, to_financing(p)) for p in new],
+            executor_for(len(new) * horizon, parallel),
+        )
+        scores.update(zip(new, results))
+
+        previous, survivors = (
+            survivors,
+            sorted(scores, key=lambda p: _score(objective, *scores[p]))[:top_k],
+        )
+        at_finest = steps == [1, 1, 1]
+        if at_finest and survivors == previous:
+            break
+        steps = [max(1, step // 2) for step in steps]
+        frontier = {
+            tuple(
+                min(max(value + delta * step, lo), hi)
+                for value, delta, step, lo, hi in zip(point, deltas, steps, low, high)
+            )
+            for point in survivors
+            for deltas in itertools.product((-1, 0, 1), repeat=3)
+        }
+
+    # Truncated runs only know the capital up to the bound, so the winners are
+    # simulated again over the whole horizon
+    finalists = sorted(
+        zip(
+            survivors,
+            parallel_map(
+                _simulate,
+                [(params, to_financing(p)) for p in survivors],
+                executor_for(len(survivors) * params.months_to_simulate, parallel),
+            ),
+        ),
+        key=lambda item: _score(objective, *item[1]),
+    )
+    ranking = []
+    for point, (end_month, final_total_capital, _) in finalists:
+        candidate = to_financing(point)
+        financed_value, _ = down_payment_split(params, candidate)
+        ranking.append(
+            FinancingCandidate(
+                candidate,
+                first_installment_value(
+                    financed_value, candidate.number_of_installments, candidate.tax
+                ),
+                end_month,
+                final_total_capital,
+            )
+        )
+    return FinancingOptimization(objective, ranking, len(scores), len(pruned))
+
+
+def simulate_payoff_heatmap(
+    params: PropertyParams,
+    financing: FinancingParams,
+    number_of_installments,
+    tax,
+    parallel: bool = True,
+) -> PayoffHeatmap:
+    """Mês de quitação em toda a grade (taxa × parcelas), com o resto de `financing`."""
+    installments = np.asarray(number_of_installments, dtype=int)
+    taxes = np.asarray(tax, dtype=float)
+    financed_value, _ = down_payment_split(params, financing)
+
+    cells = []
+    for row, rate in enumerate(taxes):
+        for column, n in enumerate(installments):
+            value = first_installment_value(financed_value, int(n), float(rate))
+            if value <= params.initial_monthly_saving:
+                cells.append((row, column))
+    results = parallel_map(
+        _simulate,
+        [
+            (
+                params,
+                dataclasses.replace(
+                    financing,
+                    number_of_installments=int(installments[column]),
+                    tax=float(taxes[row]),
+                ),
+            )
+            for row, column in cells
+        ],
+        executor_for(len(cells) * params.months_to_simulate, parallel),
+    )
+
+    end_month = np.full((len(taxes), len(installments)), np.nan)
+    for (row, column), (payoff, *_) in zip(cells, results):
+        if payoff is not None:
+            end_month[row, column] = payoff
+    return PayoffHeatmap(installments, taxes, end_month)
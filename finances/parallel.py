@@ -0,0 +1,57 @@
+"""Pool de processos compartilhado pelas buscas em lote.
+
+Os kernels de simulação são funções puras de parâmetros congelados, então podem
+rodar em outros processos sem estado compartilhado. O pool usa "spawn" para não
+fazer fork de um servidor com várias threads.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+# Below this many simulated months a batch finishes in the current process
+# faster than it can be shipped to the workers
+MIN_PARALLEL_MONTHS = 500_000
+
+_executor: ProcessPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def shared_executor() -> ProcessPoolExecutor:
+    """Pool criado na primeira chamada e reutilizado pelo processo inteiro."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                default_workers(), mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(_executor.shutdown, cancel_futures=True)
+        return _executor
+
+
+def executor_for(simulated_months: int, parallel: bool = True) -> Executor | None:
+    """Pool compartilhado se o lote for grande o bastante, senão None (serial)."""
+    if not parallel or default_workers() == 1:
+        return None
+    if simulated_months < MIN_PARALLEL_MONTHS:
+        return None
+    return shared_executor()
+
+
+def parallel_map(func, items, executor: Executor | None = None) -> list:
+    """[func(item) for item in items], no executor se houver um.
+
+    Os itens são mandados em blocos, para que o custo de serialização não domine
+    kernels rápidos.
+    """
+    items = list(items)
+    if executor is None or len(items) <= 1:
+        return [func(item) for item in items]
+    chunksize = max(1, len(items) // (4 * default_workers()))
+    return list(executor.map(func, items, chunksize=chunksize))
@@ -0,0 +1,431 @@
+from dataclasses import dataclass, field
+from itertools import repeat
+
+import numpy as np
+
+from finances.amortization import InstallmentSchedule, first_installment_value
+from finances.rates import RateSchedule
+
+# Limits of the page 3 widgets, also enforced by finances.api
+MAX_MONTHS_TO_SIMULATE = 1200
+MAX_INSTALLMENTS = 600
+# Percent per month; zero would divide by zero in first_installment_value
+MIN_TAX = 0.01
+
+
+@dataclass(frozen=True)
+class PropertyParams:
+    property_value: float
+    available_cash: float
+    initial_monthly_saving: float
+    monthly_inflation_rate: float
+    monthly_investment_return_rate: float
+    monthly_property_value_increase: float
+    monthly_property_value_increase_when_bought: float
+    months_to_simulate: int
+    # Replaces the rates above month by month: inflation, investment_return and,
+    # for the property before and after it is bought, appreciation
+    rates: RateSchedule | None = None
+
+
+@dataclass(frozen=True)
+class FinancingParams:
+    number_of_installments: int
+    tax: float
+    current_rent: float = 0
+    months_to_stop_paying_rent: int = 0
+    # Share of available_cash used as down payment; the rest stays invested
+    down_payment_fraction: float = 1.0
+
+
+def down_payment_split(
+    params: PropertyParams, financing: FinancingParams
+) -> tuple[float, float]:
+    """(valor financiado, dinheiro que sobra) para a entrada escolhida."""
+    down_payment = params.available_cash * financing.down_payment_fraction
+    return params.property_value - down_payment, params.available_cash - down_payment
+
+
+@dataclass(slots=True)
+class CashPurchaseState:
+    """O que é preciso, além das séries, para continuar uma simulação à vista."""
+
+    # Saving of the last simulated month, invested in the next one
+    monthly_saving: float
+
+
+@dataclass(slots=True)
+class FinancedPurchaseState:
+    """O que é preciso, além das séries, para continuar uma simulação financiada."""
+
+    # Saving and rent of the last simulated month; the next month adds them
+    monthly_saving: float
+    rent: float
+    liquid_capital: float
+    schedule: InstallmentSchedule
+
+
+def monthly_growth(params: PropertyParams, start: int, stop: int):
+    """Fatores de crescimento dos meses `start` a `stop` - 1.
+
+    Devolve iteráveis para (aplicação, inflação, imóvel, imóvel já comprado).
+    Sem params.rates são as taxas constantes dos parâmetros, repetidas.
+    """
+    if params.rates is None:
+        return tuple(
+            repeat(1 + rate / 100)
+            for rate in (
+                params.monthly_investment_return_rate,
+                params.monthly_inflation_rate,
+                params.monthly_property_value_increase,
+                params.monthly_property_value_increase_when_bought,
+            )
+        )
+    appreciation = params.rates.growth("appreciation", stop)[start:].tolist()
+    return (
+        params.rates.growth("investment_return", stop)[start:].tolist(),
+        params.rates.growth("inflation", stop)[start:].tolist(),
+        appreciation,
+        appreciation,
+    )
+
+
+def _empty_series() -> np.ndarray:
+    return np.empty(0)
+
+
+def _grown(series: np.ndarray, months: int) -> np.ndarray:
+    """Cópia de `series` com espaço para `months` meses."""
+    grown = np.empty(months)
+    grown[: len(series)] = series
+    return grown
+
+
+@dataclass(slots=True)
+class CashPurchaseResult:
+    # One value per month, preallocated for the whole horizon
+    savings: np.ndarray
+    property_values: np.ndarray
+    total_capital: np.ndarray
+    months_to_buy: int | None
+    # None when the result cannot be extended (a prefix, or custom savings)
+    state: CashPurchaseState | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def purchase_month(self) -> int | None:
+        """Mês (a partir de 1) em que a propriedade é comprada à vista."""
+        return None if self.months_to_buy is None else self.months_to_buy + 1
+
+    @property
+    def months(self) -> int:
+        return len(self.total_capital)
+
+    def head(self, months: int) -> "CashPurchaseResult":
+        """Só os primeiros `months` meses, como se o horizonte fosse esse.
+
+        As séries são views, sem cópia.
+        """
+        months_to_buy = self.months_to_buy
+        if months_to_buy is not None and months_to_buy + 1 >= months:
+            months_to_buy = None
+        return CashPurchaseResult(
+            self.savings[:months],
+            self.property_values[:months],
+            self.total_capital[:months],
+            months_to_buy,
+        )
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """Séries mensais por nome, sem cópia (pd.DataFrame(..., copy=False))."""
+        return {
+            "savings": self.savings,
+            "property_values": self.property_values,
+            "total_capital": self.total_capital,
+        }
+
+
+@dataclass(slots=True)
+class FinancedPurchaseResult:
+    first_installment_value: float
+    affordable: bool
+    # One value per month, preallocated for the whole horizon; empty when the
+    # first installment is not affordable
+    need_to_pay: np.ndarray = field(default_factory=_empty_series)
+    property_values: np.ndarray = field(default_factory=_empty_series)
+    total_capital: np.ndarray = field(default_factory=_empty_series)
+    end_month: int | None = None
+    # None when the result cannot be extended (a prefix, or custom savings)
+    state: FinancedPurchaseState | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def months(self) -> int:
+        return len(self.total_capital)
+
+    def head(self, months: int) -> "FinancedPurchaseResult":
+        """Só os primeiros `months` meses, como se o horizonte fosse esse.
+
+        As séries são views, sem cópia.
+        """
+        end_month = self.end_month
+        if end_month is not None and end_month >= months:
+            end_month = None
+        return FinancedPurchaseResult(
+            self.first_installment_value,
+            self.affordable,
+            need_to_pay=self.need_to_pay[:months],
+            property_values=self.property_values[:months],
+            total_capital=self.total_capital[:months],
+            end_month=end_month,
+        )
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """Séries mensais por nome, sem cópia (pd.DataFrame(..., copy=False))."""
+        return {
+            "need_to_pay": self.need_to_pay,
+            "property_values": self.property_values,
+            "total_capital": self.total_capital,
+        }
+
+
+def simulate_monthly_savings(params: PropertyParams) -> np.ndarray:
+    """Quanto se guarda por mês, corrigido pela inflação."""
+    months = params.months_to_simulate
+    monthly_savings = np.empty(months)
+    if months == 0:
+        return monthly_savings
+    monthly_savings[0] = params.initial_monthly_saving
+    if params.rates is None:
+        monthly_savings[1:] = 1 + params.monthly_inflation_rate / 100
+    else:
+        monthly_savings[1:] = params.rates.growth("inflation", months - 1)
+    # Multiplies in month order, exactly like correcting the saving month by month
+    return np.cumprod(monthly_savings, out=monthly_savings)
+
+
+def simulate_property_purchase(
+    params: PropertyParams, monthly_savings: np.ndarray | None = None
+) -> CashPurchaseResult:
+    months = params.months_to_simulate
+    result = CashPurchaseResult(
+        np.empty(months),
+        np.empty(months),
+        np.empty(months),
+        None,
+        state=CashPurchaseState(float(params.initial_monthly_saving)),
+    )
+    result.savings[0] = params.available_cash
+    result.property_values[0] = params.property_value
+    result.total_capital[0] = params.available_cash
+    _advance_property_purchase(params, result, 1, monthly_savings)
+    if monthly_savings is not None:
+        result.state = None
+    return result
+
+
+def extend_property_purchase(params: PropertyParams, result: CashPurchaseResult):
+    """Continua `result`, no lugar, até params.months_to_simulate meses.
+
+    `params` deve ser o mesmo da simulação original, exceto pelo horizonte; só os
+    meses novos são simulados. As séries são trocadas por arrays maiores, então
+    views tiradas antes (como as de `head`) continuam válidas.
+    """
+    if result.state is None:
+        raise ValueError("result cannot be extended")
+    start = result.months
+    if params.months_to_simulate <= start:
+        return
+    result.savings = _grown(result.savings, params.months_to_simulate)
+    result.property_values = _grown(result.property_values, params.months_to_simulate)
+    result.total_capital = _grown(result.total_capital, params.months_to_simulate)
+    _advance_property_purchase(params, result, start)
+
+
+def _advance_property_purchase(
+    params: PropertyParams,
+    result: CashPurchaseResult,
+    start: int,
+    monthly_savings: np.ndarray | None = None,
+) -> None:
+    """Simula os meses de `start` até o fim das séries, já alocadas."""
+    # Item assignment through a memoryview is the cheapest way to fill an
+    # ndarray from a Python loop
+    savings = memoryview(result.savings)
+    property_values = memoryview(result.property_values)
+    total_capital = memoryview(result.total_capital)
+    months_to_buy = result.months_to_buy
+    bought_property = months_to_buy is not None
+    monthly_saving = result.state.monthly_saving
+    last_saving = savings[start - 1]
+    last_property_value = property_values[start - 1]
+
+    for (
+        i,
+        investment_growth,
+        inflation_growth,
+        property_growth,
+        property_growth_when_bought,
+    ) in zip(
+        range(start - 1, len(savings) - 1),
+        *monthly_growth(params, start - 1, len(savings) - 1),
+    ):
+        new_saving = last_saving * investment_growth + (
+            monthly_saving if monthly_savings is None else monthly_savings[i]
+        )
+        monthly_saving = monthly_saving * inflation_growth
+        if bought_property:
+            new_property_value = last_property_value * property_growth_when_bought
+        else:
+            new_property_value = last_property_value * property_growth
+        if new_saving > new_property_value and not bought_property:
+            new_saving -= new_property_value
+            bought_property = True
+            months_to_buy = i
+        savings[i + 1] = new_saving
+        property_values[i + 1] = new_property_value
+        total_capital[i + 1] = new_saving + (
+            new_property_value if bought_property else 0
+        )
+        last_saving = new_saving
+        last_property_value = new_property_value
+
+    result.months_to_buy = months_to_buy
+    result.state.monthly_saving = monthly_saving
+
+
+def simulate_property_purchase_financed(
+    params: PropertyParams,
+    financing: FinancingParams,
+    monthly_savings: np.ndarray | None = None,
+) -> FinancedPurchaseResult:
+    financed_value, remaining_cash = down_payment_split(params, financing)
+    first_value = first_installment_value(
+        financed_value, financing.number_of_installments, financing.tax
+    )
+    first_saving = (
+        params.initial_monthly_saving if monthly_savings is None else monthly_savings[0]
+    )
+    if first_value > first_saving:
+        return FinancedPurchaseResult(first_value, affordable=False)
+
+    schedule = InstallmentSchedule(
+        first_value, financing.number_of_installments, financing.tax
+    )
+    months = params.months_to_simulate
+    result = FinancedPurchaseResult(
+        first_value,
+        affordable=True,
+        need_to_pay=np.empty(months),
+        property_values=np.empty(months),
+        total_capital=np.empty(months),
+        state=FinancedPurchaseState(
+            monthly_saving=float(params.initial_monthly_saving),
+            rent=financing.current_rent,
+            liquid_capital=float(remaining_cash),
+            schedule=schedule,
+        ),
+    )
+    result.need_to_pay[0] = schedule.outstanding()
+    result.property_values[0] = params.property_value
+    result.total_capital[0] = (
+        float(params.property_value) - schedule.outstanding() + remaining_cash
+    )
+    _advance_property_purchase_financed(params, financing, result, 1, monthly_savings)
+    if monthly_savings is not None:
+        result.state = None
+    return result
+
+
+def extend_property_purchase_financed(
+    params: PropertyParams, financing: FinancingParams, result: FinancedPurchaseResult
+):
+    """Continua `result`, no lugar, até params.months_to_simulate meses.
+
+    `params` e `financing` devem ser os mesmos da simulação original, exceto pelo
+    horizonte; só os meses novos são simulados. Resultados sem condições de
+    pagar a primeira parcela não têm meses e ficam como estão.
+    """
+    if not result.affordable:
+        return
+    if result.state is None:
+        raise ValueError("result cannot be extended")
+    start = result.months
+    if params.months_to_simulate <= start:
+        return
+    result.need_to_pay = _grown(result.need_to_pay, params.months_to_simulate)
+    result.property_values = _grown(result.property_values, params.months_to_simulate)
+    result.total_capital = _grown(result.total_capital, params.months_to_simulate)
+    _advance_property_purchase_financed(params, financing, result, start)
+
+
+def _advance_property_purchase_financed(
+    params: PropertyParams,
+    financing: FinancingParams,
+    result: FinancedPurchaseResult,
+    start: int,
+    monthly_savings: np.ndarray | None = None,
+) -> None:
+    """Simula os meses de `start` até o fim das séries, já alocadas."""
+    state = result.state
+    schedule = state.schedule
+    monthly_saving = state.monthly_saving
+    rent = state.rent
+    what_left_from_last_installment = state.liquid_capital
+    need_to_pay = memoryview(result.need_to_pay)
+    property_values = memoryview(result.property_values)
+    total_capital = memoryview(result.total_capital)
+    investment, inflation, _, appreciation = monthly_growth(
+        params, start - 1, len(total_capital) - 1
+    )
+    end_month = result.end_month
+    property_value = property_values[start - 1]
+
+    for month, investment_growth, inflation_growth, property_growth in zip(
+        range(start, len(total_capital)), investment, inflation, appreciation
+    ):
+        if monthly_savings is not None:
+            monthly_saving = monthly_savings[month - 1]
+        property_value = property_value * property_growth
+        property_values[month] = property_value
+
+        if end_month is None:
+            # Update future installment values
+            schedule.correct()
+
+            if month < financing.months_to_stop_paying_rent:
+                corrected_monthly_savings = (
+                    monthly_saving + what_left_from_last_installment
+                )
+            else:
+                corrected_monthly_savings = (
+                    monthly_saving + rent + what_left_from_last_installment
+                )
+
+            corrected_monthly_savings -= schedule.pay_due()
+            corrected_monthly_savings = schedule.prepay(corrected_monthly_savings)
+
+            what_left_from_last_installment = corrected_monthly_savings
+
+            new_need_to_pay = schedule.outstanding()
+            need_to_pay[month] = new_need_to_pay
+            if new_need_to_pay == 0:
+                end_month = month
+                total_capital[month] = what_left_from_last_installment + property_value
+            else:
+                total_capital[month] = (
+                    what_left_from_last_installment + property_value - new_need_to_pay
+                )
+        else:
+            # Debt paid off: the saving and the rent are invested instead
+            what_left_from_last_installment = (
+                monthly_saving + rent + what_left_from_last_installment
+            ) * investment_growth
+            need_to_pay[month] = 0
+            total_capital[month] = what_left_from_last_installment + property_value
+
+        rent = rent * inflation_growth
+        monthly_saving = monthly_saving * inflation_growth
+
+    result.end_month = end_month
+    state.monthly_saving = monthly_saving
+    state.rent = rent
+    state.liquid_capital = what_left_from_last_installment
@@ -0,0 +1,205 @@
+"""Taxas mensais que variam mês a mês, como as séries históricas de IPCA e CDI.
+
+Os kernels recebem uma RateSchedule no lugar das taxas constantes dos
+parâmetros. As séries históricas vêm de data/historical_rates.csv ou, se
+existir e estiver atualizada, da sua cópia binária data/historical_rates.npy,
+aberta com memory map. Elas são lidas uma vez por processo e compartilhadas,
+sem cópia e somente leitura, por todas as sessões.
+
+O arquivo distribuído tem valores anuais aproximados e ilustrativos, com a
+variação de cada ano repartida igualmente entre os seus 12 meses; o formato já
+aceita uma série mensal de verdade.
+
+    python -m finances.rates    # regenera o .npy a partir do .csv
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+HISTORY_CSV = os.path.join(DATA_DIR, "historical_rates.csv")
+HISTORY_BINARY = os.path.join(DATA_DIR, "historical_rates.npy")
+
+# Window used by the pages' "repeat the last years" option
+HISTORICAL_YEARS = 20
+
+# Rows of the binary file; the first holds the month as year * 12 + month - 1
+_ROWS = ("month", "inflation", "investment_return", "appreciation")
+
+
+@dataclass(frozen=True)
+class RateSchedule:
+    """Taxas mensais (%), uma por mês, repetidas em ciclo além do fim das séries.
+
+    As séries devem ter o mesmo tamanho e não ser modificadas. Só `digest`
+    identifica a schedule em comparações e chaves de cache.
+    """
+
+    digest: str
+    inflation: np.ndarray = field(compare=False, repr=False)
+    investment_return: np.ndarray = field(compare=False, repr=False)
+    appreciation: np.ndarray = field(compare=False, repr=False)
+
+    @classmethod
+    def from_rates(cls, inflation, investment_return, appreciation) -> "RateSchedule":
+        series = [
+            np.asarray(s, dtype=float)
+            for s in (inflation, investment_return, appreciation)
+        ]
+        if len({s.shape for s in series}) != 1 or series[0].ndim != 1:
+            raise ValueError("rate series must be 1-D and of the same length")
+        if series[0].size == 0:
+            raise ValueError("rate series must not be empty")
+        digest = hashlib.sha1()
+        for s in series:
+            digest.update(np.ascontiguousarray(s).tobytes())
+        return cls(digest.hexdigest()[:16], *series)
+
+    def __len__(self) -> int:
+        return len(self.inflation)
+
+    def rates(self, name: str, months: int) -> np.ndarray:
+        """Taxas de `name` nos primeiros `months` meses, em %."""
+        series = getattr(self, name)
+        return series[:months] if months <= len(series) else np.resize(series, months)
+
+    def growth(self, name: str, months: int) -> np.ndarray:
+        """Fator de crescimento de cada um dos primeiros `months` meses."""
+        return 1 + self.rates(name, months) / 100
+
+    def cumulative(self, name: str, months: int) -> np.ndarray:
+        """Crescimento acumulado depois de 0, 1, ..., `months` meses.
+
+        É o equivalente de (1 + taxa) ** arange(months + 1) para taxas que
+        variam, com um produto acumulado em vez de uma potência por mês.
+        """
+        cumulative = np.empty(months + 1)
+        cumulative[0] = 1.0
+        np.cumprod(self.growth(name, months), out=cumulative[1:])
+        return cumulative
+
+    def mean_rate(self, name: str) -> float:
+        """Taxa mensal constante (%) com o mesmo crescimento total da série."""
+        series = getattr(self, name)
+        return float(np.expm1(np.mean(np.log1p(series / 100))) * 100)
+
+
+@dataclass(frozen=True)
+class RateHistory:
+    # Month of each entry as year * 12 + month - 1
+    months: np.ndarray
+    inflation: np.ndarray
+    investment_return: np.ndarray
+    appreciation: np.ndarray
+
+    def schedule(self, years: int | None = None) -> RateSchedule:
+        """Schedule com os últimos `years` anos da série (ou ela inteira), sem cópia."""
+        start = 0 if years is None else max(len(self.months) - years * 12, 0)
+        return RateSchedule.from_rates(
+            self.inflation[start:],
+            self.investment_return[start:],
+            self.appreciation[start:],
+        )
+
+    def dates(self) -> np.ndarray:
+        """Mês de cada entrada como datetime64[M], para o eixo dos gráficos."""
+        return (self.months - 1970 * 12).astype("datetime64[M]")
+
+    def period(self, years: int | None = None) -> str:
+        """Primeiro e último mês dos últimos `years` anos, como "01/2005 a 12/2024"."""
+        start = 0 if years is None else max(len(self.months) - years * 12, 0)
+        first, last = (int(m) for m in self.months[[start, -1]])
+        return f"{first % 12 + 1:02d}/{first // 12} a {last % 12 + 1:02d}/{last // 12}"
+
+
+def read_rate_csv(path: str = HISTORY_CSV) -> np.ndarray:
+    """Série do CSV no formato do arquivo binário: uma linha por item de _ROWS."""
+    table = np.loadtxt(path, delimiter=",", comments="#", dtype=str, ndmin=2)
+    header, rows = table[0], table[1:]
+    if list(header) != ["mes", "ipca", "cdi", "valorizacao_imovel"]:
+        raise ValueError(f"unexpected columns in {path}: {', '.join(header)}")
+    year_month = np.char.partition(rows[:, 0], "-")
+    months = year_month[:, 0].astype(int) * 12 + year_month[:, 2].astype(int) - 1
+    if np.any(np.diff(months) != 1):
+        raise ValueError(f"{path} must have consecutive months")
+    return np.vstack([months.astype(float), rows[:, 1:].astype(float).T])
+
+
+def write_rate_binary(source: str = HISTORY_CSV, target: str = HISTORY_BINARY):
+    np.save(target, read_rate_csv(source))
+
+
+def _history_from(table: np.ndarray) -> RateHistory:
+    if table.shape[0] != len(_ROWS):
+        raise ValueError(f"rate table must have {len(_ROWS)} rows")
+    # Every row is a view of the same table, which is never written to
+    table.flags.writeable = False
+    return RateHistory(table[0].astype(np.int64), *table[1:])
+
+
+_histories: dict[str, RateHistory] = {}
+_histories_lock = threading.Lock()
+
+
+def load_rate_history(path: str | None = None) -> RateHistory:
+    """Série histórica de `path` (.csv ou .npy), lida uma vez por processo.
+
+    Sem `path`, usa o .npy padrão se ele for pelo menos tão novo quanto o .csv.
+    O .npy é aberto com memory map, então processos na mesma máquina também
+    compartilham as páginas do arquivo.
+    """
+    if path is None:
+        fresh = os.path.exists(HISTORY_BINARY) and (
+            os.path.getmtime(HISTORY_BINARY) >= os.path.getmtime(HISTORY_CSV)
+        )
+        path = HISTORY_BINARY if fresh else HISTORY_CSV
+    with _histories_lock:
+        history = _histories.get(path)
+        if history is None:
+            table = (
+                np.load(path, mmap_mode="r")
+                if path.endswith(".npy")
+                else read_rate_csv(path)
+            )
+            history = _histories[path] = _history_from(table)
+        return history
+
+
+_schedules: dict[int | None, RateSchedule] = {}
+_schedules_lock = threading.Lock()
+
+
+def historical_schedule(years: int | None = HISTORICAL_YEARS) -> RateSchedule:
+    """Schedule dos últimos `years` anos da série histórica padrão, compartilhada.
+
+    Com `years=None` a série inteira, que começa em load_rate_history().months[0].
+    """
+    with _schedules_lock:
+        schedule = _schedules.get(years)
+        if schedule is None:
+            schedule = _schedules[years] = load_rate_history().schedule(years)
+        return schedule
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m finances.rates",
+        description="Converte a série histórica de taxas para o formato binário.",
+    )
+    parser.add_argument("source", nargs="?", default=HISTORY_CSV)
+    parser.add_argument("target", nargs="?", default=HISTORY_BINARY)
+    args = parser.parse_args(argv)
+
+    write_rate_binary(args.source, args.target)
+    print(f"{args.target} gravado", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np
+
+from finances.rates import RateSchedule
+
+# Limit of the page 1 and 2 horizon widgets, also enforced by finances.api
+MAX_YEARS_TO_RETIRE = 100
+
+
+class RetirementPlan(NamedTuple):
+    monthly_savings: float
+    salary_at_retire: float
+
+
+@dataclass(frozen=True)
+class RetirementParams:
+    current_capital: float
+    monthly_inflation_rate: float
+    monthly_investment_return_rate: float
+    # Replaces the two rates above month by month (inflation, investment_return)
+    rates: RateSchedule | None = None
+
+
+@dataclass(slots=True)
+class RetirementGrid:
+    # One entry per (buy power, years to retire) pair
+    wanted_buy_power: np.ndarray
+    time_to_retire: np.ndarray
+    monthly_savings: np.ndarray
+    future_salary: np.ndarray
+
+
+@dataclass(slots=True)
+class RetirementSurface:
+    wanted_buy_power: np.ndarray
+    months_to_retire: np.ndarray
+    # Shape (len(wanted_buy_power), len(months_to_retire))
+    monthly_savings: np.ndarray
+    future_salary: np.ndarray
+
+
+@dataclass(frozen=True)
+class SavingsRateParams:
+    monthly_inflation_rate: float
+    monthly_investment_return_rate: float
+    increasing_savings: bool = False
+    max_months: int = 50 * 12
+    # Replaces the two rates above month by month (inflation, investment_return)
+    rates: RateSchedule | None = None
+
+
+@dataclass(slots=True)
+class SavingsRateCurve:
+    months_to_retire: np.ndarray
+    monthly_savings_rate: np.ndarray
+
+
+def calculate_monthly_savings(
+    wanted_buy_power: float,
+    time_to_retire: float,
+    current_capital: float,
+    monthly_inflation_rate: float,
+    monthly_investment_return_rate: float,
+    rates: RateSchedule | None = None,
+) -> RetirementPlan:
+    if rates is not None:
+        surface = simulate_retirement_surface(
+            RetirementParams(
+                current_capital,
+                monthly_inflation_rate,
+                monthly_investment_return_rate,
+                rates,
+            ),
+            [wanted_buy_power],
+            [round(time_to_retire * 12)],
+        )
+        return RetirementPlan(
+            float(surface.monthly_savings[0, 0]), float(surface.future_salary[0, 0])
+        )
+
+    months_to_retire = time_to_retire * 12
+    salary_at_retire = (
+        wanted_buy_power * (1 + monthly_inflation_rate / 100) ** months_to_retire
+    )
+
+    total_amount = salary_at_retire / (
+        monthly_investment_return_rate / 100 - monthly_inflation_rate / 100
+    )
+
+    monthly_savings = (
+        monthly_investment_return_rate
+        / 100
+        * (
+            total_amount
+            - current_capital
+            * (1 + monthly_investment_return_rate / 100) ** months_to_retire
+        )
+        / ((1 + monthly_investment_return_rate / 100) ** months_to_retire - 1)
+    )
+    return RetirementPlan(monthly_savings, salary_at_retire)
+
+
+def perpetuity_rate(rates: RateSchedule) -> float:
+    """Retorno real (por mês) que sustenta a renda depois de aposentar.
+
+    Depois da aposentadoria as taxas continuam repetindo a série, então usamos
+    as taxas médias dela, como as taxas constantes no caso sem série.
+    """
+    return (rates.mean_rate("investment_return") - rates.mean_rate("inflation")) / 100
+
+
+def _accumulated_growth(rates: RateSchedule, months: int):
+    """Inflação, retorno e valor de uma poupança de 1 por mês, acumulados.
+
+    Cada array tem `months` + 1 entradas, uma por horizonte (0 a `months`
+    meses). A poupança é depositada no fim de cada mês, então o seu valor é
+    R_m * (1/R_1 + ... + 1/R_m), onde R_k é o retorno acumulado até o mês k.
+    """
+    inflation_growth = rates.cumulative("inflation", months)
+    return_growth = rates.cumulative("investment_return", months)
+    deposits = np.empty(months + 1)
+    deposits[0] = 0.0
+    np.cumsum(1 / return_growth[1:], out=deposits[1:])
+    return inflation_growth, return_growth, return_growth * deposits
+
+
+def simulate_retirement_surface(
+    params: RetirementParams, wanted_buy_power, months_to_retire
+) -> RetirementSurface:
+    """Poupança mensal necessária em toda a grade (poder de compra × meses) de uma vez."""
+    buy_power = np.asarray(wanted_buy_power, dtype=float)
+    months = np.asarray(months_to_retire, dtype=float)
+    i = params.monthly_inflation_rate / 100
+    r = params.monthly_investment_return_rate / 100
+
+    # Growth factors depend only on the horizon, so they are shared by every row
+    if params.rates is None:
+        inflation_growth = (1 + i) ** months
+        return_growth = (1 + r) ** months
+    else:
+        # Whole months only: the schedule has one rate per month
+        horizon = months.astype(np.int64)
+        inflation_growth, return_growth, savings_value = (
+            growth[horizon]
+            for growth in _accumulated_growth(params.rates, int(horizon.max(initial=0)))
+        )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        future_salary = buy_power[:, None] * inflation_growth
+        if params.rates is None:
+            total_amount = future_salary / (r - i)
+            monthly_savings = (
+                r
+                * (total_amount - params.current_capital * return_growth)
+                / (return_growth - 1)
+            )
+        else:
+            total_amount = future_salary / perpetuity_rate(params.rates)
+            monthly_savings = (
+                total_amount - params.current_capital * return_growth
+            ) / savings_value
+    return RetirementSurface(buy_power, months, monthly_savings, future_salary)
+
+
+def simulate_retirement_grid(
+    params: RetirementParams,
+    buy_powers=range(1000, 50000, 1000),
+    years_to_retire=range(5, 30, 5),
+) -> RetirementGrid:
+    """Poupança mensal necessária para cada par (poder de compra, anos para aposentar)."""
+    buy_powers = np.asarray(buy_powers)
+    years = np.asarray(years_to_retire)
+    surface = simulate_retirement_surface(params, buy_powers, years * 12)
+    return RetirementGrid(
+        np.repeat(buy_powers, len(years)),
+        np.tile(years, len(buy_powers)),
+        surface.monthly_savings.ravel(),
+        surface.future_salary.ravel(),
+    )
+
+
+def calculate_monthly_savings_rate(
+    months_to_retire: int,
+    monthly_inflation_rate: float,
+    monthly_investment_return_rate: float,
+    increasing_savings: bool = False,
+) -> float:
+    m = months_to_retire
+    r = monthly_investment_return_rate / 100
+    i = monthly_inflation_rate / 100
+
+    factor = (
+        ((1 + r) ** (m + 1) - (1 + i) ** (m + 1)) / (r - i)
+        if increasing_savings
+        else ((1 + r) ** m - 1) / r
+    )
+    return (1 + i) ** m / (r - i) / factor
+
+
+def _savings_rate(
+    months_to_retire,
+    monthly_inflation_rate: float,
+    monthly_investment_return_rate: float,
+    increasing_savings: bool,
+    rates: RateSchedule | None = None,
+):
+    """Mesma fórmula de calculate_monthly_savings_rate, vetorizada sobre os meses.
+
+    Dividimos tudo por (1 + r) ** m, então só aparecem potências menores que 1 e
+    horizontes longos não estouram.
+    """
+    if rates is not None:
+        return _scheduled_savings_rate(months_to_retire, rates, increasing_savings)
+    months = np.asarray(months_to_retire, dtype=float)
+    r = monthly_investment_return_rate / 100
+    i = monthly_inflation_rate / 100
+
+    relative_growth = ((1 + i) / (1 + r)) ** months
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if increasing_savings:
+            return relative_growth / ((1 + r) - (1 + i) * relative_growth)
+        return r * relative_growth / ((r - i) * (1 - (1 + r) ** -months))
+
+
+def _scheduled_savings_rate(months_to_retire, rates: RateSchedule, increasing_savings):
+    """_savings_rate com taxas mês a mês, para horizontes em meses inteiros.
+
+    Com Q_k = I_k / R_k (inflação sobre retorno acumulados até o mês k), a
+    poupança constante precisa de Q_m / (taxa real * (1/R_1 + ... + 1/R_m)) e a
+    corrigida pela inflação de Q_m / (taxa real * (Q_0 + ... + Q_m)).
+    """
+    months = np.asarray(months_to_retire).astype(np.int64)
+    horizon = int(months.max(initial=0))
+    return_growth = rates.cumulative("investment_return", horizon)
+    relative_growth = rates.cumulative("inflation", horizon) / return_growth
+    if increasing_savings:
+        deposits = np.cumsum(relative_growth)
+    else:
+        deposits = np.empty(horizon + 1)
+        deposits[0] = 0.0
+        np.cumsum(1 / return_growth[1:], out=deposits[1:])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return relative_growth[months] / (perpetuity_rate(rates) * deposits[months])
+
+
+def simulate_savings_rate_curve(params: SavingsRateParams) -> SavingsRateCurve:
+    """Taxa de poupança necessária para cada horizonte, até a taxa passar de 100%."""
+    months = np.arange(params.max_months, 0, -1)
+    rates = _savings_rate(
+        months,
+        params.monthly_inflation_rate,
+        params.monthly_investment_return_rate,
+        params.increasing_savings,
+        params.rates,
+    )
+    above_income = np.flatnonzero(rates > 1)
+    stop = above_income[0] if above_income.size else months.size
+    return SavingsRateCurve(months[:stop], rates[:stop])
+
+
+def solve_months_to_retire(
+    savings_rate,
+    monthly_inflation_rate: float,
+    monthly_investment_return_rate: float,
+    increasing_savings: bool = False,
+    max_months: int = 200 * 12,
+    iterations: int = 60,
+    rates: RateSchedule | None = None,
+):
+    """Horizonte (em meses, fracionário) para se aposentar poupando `savings_rate` da renda.
+
+    Com retorno acima da inflação a taxa necessária cai com o horizonte, então uma
+    bisseção sobre a forma fechada resolve todos os alvos de uma vez. Retorna NaN
+    quando o alvo não é atingível em até `max_months`.
+
+    Com `rates` o horizonte é em meses inteiros: o primeiro mês em que a taxa
+    necessária fica abaixo do alvo, achado com uma busca binária sobre o mínimo
+    acumulado da curva (que com taxas variáveis não é monótona).
+    """
+    target = np.asarray(savings_rate, dtype=float)
+    if rates is not None:
+        curve = _scheduled_savings_rate(
+            np.arange(1, max_months + 1), rates, increasing_savings
+        )
+        lowest_so_far = np.fmin.accumulate(curve)
+        first = np.searchsorted(-lowest_so_far, -target)
+        months = np.where(
+            (perpetuity_rate(rates) > 0) & (target > 0) & (first < max_months),
+            first + 1.0,
+            np.nan,
+        )
+        return float(months) if months.ndim == 0 else months
+
+    def rate(months):
+        return _savings_rate(
+            months,
+            monthly_inflation_rate,
+            monthly_investment_return_rate,
+            increasing_savings,
+        )
+
+    lo = np.zeros_like(target)
+    hi = np.full_like(target, float(max_months))
+    reachable = (
+        (monthly_investment_return_rate > monthly_inflation_rate)
+        & (target > 0)
+        & (rate(hi) <= target)
+    )
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        too_short = rate(mid) > target
+        lo = np.where(too_short, mid, lo)
+        hi = np.where(too_short, hi, mid)
+
+    months = np.where(reachable, hi, np.nan)
+    return float(months) if months.ndim == 0 else months
@@ -0,0 +1,220 @@
+"""Análise de sensibilidade do simulador de negócio.
+
+Todas as perturbações são avaliadas em uma única chamada vetorizada do modelo
+ano a ano, em vez de um rerun por valor.
+"""
+
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from finances.business import BusinessParams
+
+PERCENT_FIELDS = (
+    "equity_inicio_pct",
+    "equity_fim_pct",
+    "probabilidade_sucesso",
+    "margem_lucro_pct",
+)
+
+# probabilidade_sucesso only changes multiplicador_requerido, so its bar would
+# always be empty; the sensitivity grid varies it against the valuation instead
+TORNADO_FIELDS = tuple(
+    f.name for f in fields(BusinessParams) if f.name != "probabilidade_sucesso"
+)
+
+
+@dataclass
+class BusinessBatchResult:
+    # Same shape as the broadcast overrides
+    multiplicador_real: np.ndarray
+    multiplicador_requerido: np.ndarray
+    # NaN when the business never catches up with employment
+    breakeven_year: np.ndarray
+    employee_total: np.ndarray
+    biz_success_total: np.ndarray
+    biz_failure_total: np.ndarray
+
+
+@dataclass
+class TornadoBar:
+    field: str
+    low_value: float
+    high_value: float
+    low_multiplicador: float
+    high_multiplicador: float
+    low_breakeven_year: float
+    high_breakeven_year: float
+
+    @property
+    def swing(self) -> float:
+        return abs(self.high_multiplicador - self.low_multiplicador)
+
+
+@dataclass
+class TornadoResult:
+    base_multiplicador: float
+    base_breakeven_year: float
+    # Sorted by swing, largest first
+    bars: list[TornadoBar]
+
+
+@dataclass
+class SensitivityGrid:
+    x_field: str
+    x_values: np.ndarray
+    y_field: str
+    y_values: np.ndarray
+    # Shape (len(y_values), len(x_values))
+    multiplicador_real: np.ndarray
+    multiplicador_requerido: np.ndarray
+    breakeven_year: np.ndarray
+
+
+def simulate_business_batch(params: BusinessParams, **overrides) -> BusinessBatchResult:
+    """Avalia simulate_business para vários valores de parâmetros de uma vez.
+
+    Cada argumento nomeado substitui o campo de `params` com o mesmo nome por um
+    array; os arrays são combinados por broadcasting e o resultado tem o formato
+    combinado.
+    """
+    names = [f.name for f in fields(BusinessParams)]
+    unknown = set(overrides) - set(names)
+    if unknown:
+        raise TypeError(f"Parâmetros desconhecidos: {', '.join(sorted(unknown))}")
+
+    arrays = np.broadcast_arrays(
+        *(
+            np.asarray(overrides.get(name, getattr(params, name)), dtype=float)
+            for name in names
+        )
+    )
+    p = {name: array[..., None] for name, array in zip(names, arrays)}
+    if np.any(p["ano_fim"] <= p["ano_inicio"]):
+        raise ValueError("ano_fim deve ser maior que ano_inicio")
+
+    years = np.arange(p["ano_inicio"].min(), p["ano_fim"].max() + 1)
+    in_window = (years >= p["ano_inicio"]) & (years <= p["ano_fim"])
+    t = (years - p["ano_inicio"]) / (p["ano_fim"] - p["ano_inicio"])
+    r = p["inflacao_anual_pct"] / 100.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        multiple_valuation = np.where(
+            p["receita_alvo"] > 0, p["valuation_saida"] / p["receita_alvo"], 0.0
+        )
+
+    revenue = p["receita_inicio"] + t * (p["receita_alvo"] - p["receita_inicio"])
+    equity = (
+        p["equity_inicio_pct"] + t * (p["equity_fim_pct"] - p["equity_inicio_pct"])
+    ) / 100.0
+    prolabore = p["prolabore_inicio"] + t * (p["prolabore_fim"] - p["prolabore_inicio"])
+    valuation = np.where(
+        years < p["ano_fim"], revenue * multiple_valuation, p["valuation_saida"]
+    )
+    discount = (1 + r) ** years
+
+    biz_cash = (
+        prolabore * 12.0 + revenue * (p["margem_lucro_pct"] / 100.0) * equity
+    ) / discount
+    emp_cash = p["remuneracao_mensal"] * 12.0 * (1 + r) ** years / discount
+
+    emp_acc = np.cumsum(np.where(in_window, emp_cash, 0.0), axis=-1)
+    biz_cash_acc = np.cumsum(np.where(in_window, biz_cash, 0.0), axis=-1)
+    biz_total_acc = biz_cash_acc + np.where(
+        in_window, equity * valuation / discount, 0.0
+    )
+
+    at_exit = years == p["ano_fim"]
+    employee_total = np.where(at_exit, emp_acc, 0.0).sum(axis=-1)
+    biz_success_total = np.where(at_exit, biz_total_acc, 0.0).sum(axis=-1)
+    biz_failure_total = np.where(at_exit, biz_cash_acc, 0.0).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        multiplicador_real = np.where(
+            employee_total > 0, biz_success_total / employee_total, 0.0
+        )
+
+    beats = in_window & (biz_total_acc >= emp_acc)
+    breakeven_year = np.where(
+        beats.any(axis=-1), years[np.argmax(beats, axis=-1)], np.nan
+    )
+    with np.errstate(divide="ignore"):
+        multiplicador_requerido = 100.0 / p["probabilidade_sucesso"][..., 0]
+    return BusinessBatchResult(
+        multiplicador_real,
+        multiplicador_requerido,
+        breakeven_year,
+        employee_total,
+        biz_success_total,
+        biz_failure_total,
+    )
+
+
+def _perturbed_values(params: BusinessParams, field: str, relative_step: float):
+    """Valores baixo e alto de `field` em torno do valor atual."""
+    value = float(getattr(params, field))
+    if field == "ano_inicio":
+        return max(value - 1, 0), min(value + 1, params.ano_fim - 1)
+    if field == "ano_fim":
+        return max(value - 1, params.ano_inicio + 1), value + 1
+
+    low, high = value * (1 - relative_step), value * (1 + relative_step)
+    if field in PERCENT_FIELDS:
+        low, high = min(max(low, 0.0), 100.0), min(max(high, 0.0), 100.0)
+    if field == "probabilidade_sucesso":
+        low = max(low, 1.0)
+    return low, high
+
+
+def simulate_business_tornado(
+    params: BusinessParams, relative_step: float = 0.2, fields_to_vary=None
+) -> TornadoResult:
+    """Efeito de variar cada parâmetro em ±`relative_step` (±1 ano para os anos).
+
+    A linha base e os extremos de todos os parâmetros formam um único lote.
+    """
+    if fields_to_vary is None:
+        fields_to_vary = TORNADO_FIELDS
+
+    n_rows = 1 + 2 * len(fields_to_vary)
+    overrides = {}
+    for k, field in enumerate(fields_to_vary):
+        column = np.full(n_rows, float(getattr(params, field)))
+        column[1 + 2 * k : 3 + 2 * k] = _perturbed_values(params, field, relative_step)
+        overrides[field] = column
+
+    batch = simulate_business_batch(params, **overrides)
+    bars = [
+        TornadoBar(
+            field,
+            float(overrides[field][1 + 2 * k]),
+            float(overrides[field][2 + 2 * k]),
+            float(batch.multiplicador_real[1 + 2 * k]),
+            float(batch.multiplicador_real[2 + 2 * k]),
+            float(batch.breakeven_year[1 + 2 * k]),
+            float(batch.breakeven_year[2 + 2 * k]),
+        )
+        for k, field in enumerate(fields_to_vary)
+    ]
+    bars.sort(key=lambda bar: bar.swing, reverse=True)
+    return TornadoResult(
+        float(batch.multiplicador_real[0]), float(batch.breakeven_year[0]), bars
+    )
+
+
+def simulate_business_sensitivity_grid(
+    params: BusinessParams, x_field: str, x_values, y_field: str, y_values
+) -> SensitivityGrid:
+    """Multiplicadores e break-even em toda a grade (y_field × x_field)."""
+    x_values = np.asarray(x_values, dtype=float)
+    y_values = np.asarray(y_values, dtype=float)
+    batch = simulate_business_batch(
+        params, **{x_field: x_values[None, :], y_field: y_values[:, None]}
+    )
+    return SensitivityGrid(
+        x_field,
+        x_values,
+        y_field,
+        y_values,
+        batch.multiplicador_real,
+        batch.multiplicador_requerido,
+        batch.breakeven_year,
+    )
@@ -0,0 +1,309 @@
+"""Resultados de simulação guardados em disco, compartilhados entre processos.
+
+O cache de finances.cache vive na memória de cada processo e some quando o
+contêiner reinicia. Com FINANCES_STORE apontando para um arquivo SQLite, cada
+resultado que falta na memória é procurado nesse arquivo antes de ser
+calculado, e cada resultado calculado é gravado nele. Vários processos da
+mesma máquina (réplicas, a API) podem usar o mesmo arquivo: o SQLite em modo
+WAL aceita leitores simultâneos e serializa as escritas.
+
+As gravações saem do caminho da requisição: uma thread por processo serializa
+os resultados e os grava em lote. O arquivo guarda no máximo
+FINANCES_STORE_MAX_MB (DEFAULT_MAX_MB) de resultados; passando disso, os usados
+há mais tempo são apagados, a começar pelos de versões antigas do código, que
+nunca são lidos.
+
+A chave é o hash do nome do cache, dos parâmetros normalizados e da versão do
+código de finances, então um resultado só é reaproveitado pelo mesmo código
+com os mesmos parâmetros. Os valores são pickles: o arquivo deve ser tão
+confiável quanto o próprio código.
+
+    python -m finances.store              # tamanho e versões no arquivo
+    python -m finances.store --prune      # apaga entradas de outras versões
+"""
+
+import argparse
+import atexit
+import hashlib
+import os
+import pickle
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+DEFAULT_MAX_MB = 256
+
+_COLUMNS = ("key", "name", "version", "created", "used", "size", "value")
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    created REAL NOT NULL,
+    -- Last write or read, for evicting the least recently used first
+    used REAL NOT NULL,
+    size INTEGER NOT NULL,
+    value BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+"""
+
+
+def code_version() -> str:
+    """Hash dos fontes de finances; muda a cada mudança nos kernels."""
+    package = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha1()
+    for name in sorted(os.listdir(package)):
+        if name.endswith(".py"):
+            digest.update(name.encode())
+            with open(os.path.join(package, name), "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+@dataclass
+class StoreStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    # Results larger than the whole budget, never written
+    skipped: int = 0
+    evictions: int = 0
+    # SQLite errors (locked for too long, disk full...), counted as misses
+    errors: int = 0
+
+
+class ResultStore:
+    """Resultados em um arquivo SQLite, uma conexão por thread.
+
+    Lê na thread de quem chama e grava em uma thread própria, em lotes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        version: str | None = None,
+        timeout: float = 5.0,
+        max_bytes: int = DEFAULT_MAX_MB * 2**20,
+    ):
+        self.path = path
+        self.version = version or code_version()
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._stats = StoreStats()
+        self._stats_lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as connection:
+            columns = tuple(
+                row[1] for row in connection.execute("PRAGMA table_info(results)")
+            )
+            # A file from an older layout only holds results of older code
+            if columns and columns != _COLUMNS:
+                connection.execute("DROP TABLE results")
+            connection.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _count(self, stat: str, n: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self._stats, stat, getattr(self._stats, stat) + n)
+
+    def key(self, name: str, normalized_args) -> str:
+        """Chave de `normalized_args` (já passados por keys.normalize)."""
+        text = repr((self.version, name, normalized_args))
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get(self, key: str):
+        """(True, valor) se a chave estiver no arquivo, senão (False, None)."""
+        try:
+            row = (
+                self._connection()
+                .execute("SELECT value FROM results WHERE key = ?", (key,))
+                .fetchone()
+            )
+        except sqlite3.Error:
+            self._count("errors")
+            return False, None
+        if row is None:
+            self._count("misses")
+            return False, None
+        self._count("hits")
+        self._submit(("touch", key))
+        return True, pickle.loads(row[0])
+
+    def put(self, key: str, name: str, value) -> None:
+        """Agenda a gravação de `value`, serializado depois em outra thread.
+
+        `value` não pode mais ser modificado por quem chama.
+        """
+        self._submit(("put", key, name, value))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Espera as gravações agendadas até agora; False se o tempo acabar."""
+        done = threading.Event()
+        self._submit(("flush", done))
+        return done.wait(timeout)
+
+    def _submit(self, item: tuple) -> None:
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(
+                        target=self._write_loop, name="finances-store", daemon=True
+                    )
+                    self._writer.start()
+                    # Writes queued at exit would be lost with the daemon thread
+                    atexit.register(self.flush, self.timeout)
+        self._queue.put(item)
+
+    def _write_loop(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            # Whatever was queued meanwhile goes in the same transaction
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(items)
+
+    def _write(self, items: list[tuple]) -> None:
+        now = time.time()
+        rows, touched, done = [], [], []
+        for kind, *args in items:
+            if kind == "put":
+                key, name, value = args
+                try:
+                    blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                except (pickle.PicklingError, TypeError, AttributeError):
+                    self._count("errors")
+                    continue
+                if len(blob) > self.max_bytes:
+                    self._count("skipped")
+                    continue
+                rows.append((key, name, self.version, now, now, len(blob), blob))
+            elif kind == "touch":
+                touched.append((now, args[0]))
+            else:
+                done.append(args[0])
+        try:
+            with self._connection() as connection:
+                # The same key always holds the same value, so a concurrent
+                # writer that got there first is fine
+                connection.executemany(
+                    "INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+                )
+                connection.executemany(
+                    "UPDATE results SET used = ? WHERE key = ?", touched
+                )
+                if rows:
+                    self._evict(connection)
+        except sqlite3.Error:
+            self._count("errors", len(rows))
+        else:
+            self._count("writes", len(rows))
+        for event in done:
+            event.set()
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """Apaga os resultados usados há mais tempo até caber em max_bytes."""
+        (total,) = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        evicted = []
+        for key, size in connection.execute(
+            "SELECT key, size FROM results ORDER BY used"
+        ):
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        # The freed pages are reused by the next writes, so the file stops
+        # growing without a VACUUM
+        connection.executemany("DELETE FROM results WHERE key = ?", evicted)
+        self._count("evictions", len(evicted))
+
+    def prune(self) -> int:
+        """Apaga os resultados de outras versões do código; devolve quantos."""
+        with self._connection() as connection:
+            deleted = connection.execute(
+                "DELETE FROM results WHERE version != ?", (self.version,)
+            ).rowcount
+        self._connection().execute("VACUUM")
+        return deleted
+
+    def summary(self) -> list[tuple[str, str, int, int]]:
+        """(versão, nome, entradas, bytes) de cada cache no arquivo."""
+        return (
+            self._connection()
+            .execute(
+                "SELECT version, name, COUNT(*), SUM(size) FROM results "
+                "GROUP BY version, name ORDER BY version, name"
+            )
+            .fetchall()
+        )
+
+    def stats(self) -> StoreStats:
+        with self._stats_lock:
+            return StoreStats(**vars(self._stats))
+
+
+_store: ResultStore | None = None
+_store_path: str | None = None
+_store_lock = threading.Lock()
+
+
+def default_store() -> ResultStore | None:
+    """Store em FINANCES_STORE, aberto uma vez por processo; None sem a variável."""
+    global _store, _store_path
+    path = os.environ.get("FINANCES_STORE")
+    if not path:
+        return None
+    with _store_lock:
+        if _store is None or _store_path != path:
+            max_mb = float(os.environ.get("FINANCES_STORE_MAX_MB", DEFAULT_MAX_MB))
+            _store, _store_path = ResultStore(path, max_bytes=int(max_mb * 2**20)), path
+        return _store
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m finances.store",
+        description="Mostra ou limpa o arquivo de resultados.",
+    )
+    parser.add_argument("path", nargs="?", default=os.environ.get("FINANCES_STORE"))
+    parser.add_argument(
+        "--prune", action="store_true", help="apaga entradas de outras versões"
+    )
+    args = parser.parse_args(argv)
+    if not args.path:
+        parser.error("informe o arquivo ou defina FINANCES_STORE")
+
+    store = ResultStore(args.path)
+    if args.prune:
+        print(f"{store.prune()} entradas apagadas", file=sys.stderr)
+    print(f"versão atual: {store.version}")
+    for version, name, count, size in store.summary():
+        print(f"{version}  {name:<32} {count:>6} {size / 2**20:>9.2f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Tempo de cada etapa de um rerun e exportação das métricas.
+
+Uma página marca o fim de cada etapa com `lap`; o tempo desde a marca anterior
+é somado à etapa. As etapas usadas pelas páginas são:
+
+- widgets: leitura dos widgets e montagem dos parâmetros;
+- kernel: simulação (ou busca no cache);
+- dataframe: construção de DataFrames;
+- figure: construção das figuras do Plotly;
+- chart_data: redução das séries longas (charts.prepare_figure);
+- render: serialização em st.plotly_chart / st.dataframe / st.table.
+
+O MetricsExporter grava cada rerun em JSONL e mantém um arquivo no formato
+texto do Prometheus com histogramas acumulados por página e etapa.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from finances.keys import normalize
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def params_hash(*params) -> str:
+    """Hash curto e estável dos parâmetros de um rerun."""
+    return hashlib.sha1(repr(normalize(params)).encode()).hexdigest()[:12]
+
+
+@dataclass
+class RerunTiming:
+    page: str
+    params_hash: str = ""
+    stages: dict[str, float] = field(default_factory=dict)
+    charts: list[dict] = field(default_factory=list)
+    started_at: float = field(default_factory=time.time)
+    _last: float = field(default_factory=time.perf_counter, repr=False)
+
+    def lap(self, stage: str) -> None:
+        """Soma à `stage` o tempo desde a marca anterior."""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+    def to_record(self) -> dict:
+        return {
+            "timestamp": self.started_at,
+            "page": self.page,
+            "params_hash": self.params_hash,
+            "stages": self.stages,
+            "total": self.total,
+            "charts": self.charts,
+        }
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+        self.count += 1
+        self.sum += value
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsExporter:
+    """Grava os reruns em `directory`/reruns.jsonl e `directory`/metrics.prom.
+
+    Seguro para várias threads; o arquivo do Prometheus é reescrito por inteiro
+    a cada rerun e trocado de forma atômica, para o coletor nunca ler pela metade.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.jsonl_path = os.path.join(directory, "reruns.jsonl")
+        self.prometheus_path = os.path.join(directory, "metrics.prom")
+        self._histograms: dict[tuple[str, str], _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, timing: RerunTiming) -> None:
+        line = json.dumps(timing.to_record(), ensure_ascii=False)
+        with self._lock:
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            for stage, seconds in (*timing.stages.items(), ("total", timing.total)):
+                key = (timing.page, stage)
+                self._histograms.setdefault(key, _Histogram()).observe(seconds)
+            self._write_prometheus()
+
+    def _write_prometheus(self) -> None:
+        lines = [
+            "# HELP finances_rerun_stage_seconds Tempo de cada etapa de um rerun.",
+            "# TYPE finances_rerun_stage_seconds histogram",
+        ]
+        for (page, stage), histogram in sorted(self._histograms.items()):
+            labels = f'page="{_label(page)}",stage="{_label(stage)}"'
+            for bound, count in zip(BUCKETS, histogram.buckets):
+                lines.append(
+                    f'finances_rerun_stage_seconds_bucket{{{labels},le="{bound}"}} {count}'
+                )
+            lines.append(
+                f'finances_rerun_stage_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}'
+            )
+            lines.append(
+                f"finances_rerun_stage_seconds_sum{{{labels}}} {histogram.sum}"
+            )
+            lines.append(
+                f"finances_rerun_stage_seconds_count{{{labels}}} {histogram.count}"
+            )
+
+        tmp_path = f"{self.prometheus_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.prometheus_path)
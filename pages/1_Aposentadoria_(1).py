@@ -1,9 +1,16 @@
 import streamlit as st
-import locale
-import pandas as pd
-import plotly.express as px
+import numpy as np
+import plotly.graph_objects as go
 
-locale.setlocale(locale.LC_MONETARY, "pt_BR.UTF-8")
+from charts import prepare_figure
+from debug_panel import lap, render_debug_panel, start_rerun, tag_params
+from finances import RetirementParams, cache, calculate_monthly_savings
+from finances.backtest import BacktestParams
+from finances.formatting import brl
+from finances.rates import HISTORICAL_YEARS, historical_schedule, load_rate_history
+from finances.retirement import MAX_YEARS_TO_RETIRE
+
+start_rerun("1_Aposentadoria_(1)")
 
 with st.sidebar:
     current_capital = st.number_input("Capital atual (R$)", value=0, step=1000)
@@ -17,94 +24,205 @@ with st.sidebar:
         value=1.0,
         step=0.01,
     )
+    historical_rates = st.checkbox(
+        "Repetir as taxas dos últimos 20 anos",
+        value=False,
+        help=(
+            "Usa o IPCA e o CDI anuais dos últimos 20 anos no lugar das taxas acima, "
+            "repetindo a série se o horizonte for maior. Os valores são aproximados e "
+            "ilustrativos, e a variação de cada ano é repartida igualmente entre os seus "
+            "12 meses."
+        ),
+    )
+    if historical_rates:
+        st.caption(
+            f"Taxas anuais aproximadas de {load_rate_history().period(HISTORICAL_YEARS)}."
+        )
 
 
-def calculate_monthly_savings(
-    wanted_buy_power: float,
-    time_to_retire: float,
-    current_capital: float,
-    monthly_inflation_rate: float,
-    monthly_investment_return_rate: float,
-) -> tuple[float, float]:
-    months_to_retire = time_to_retire * 12
-    salary_at_retire = (
-        wanted_buy_power * (1 + monthly_inflation_rate / 100) ** months_to_retire
-    )
+rates = historical_schedule() if historical_rates else None
+retirement_params = RetirementParams(
+    current_capital, monthly_inflation_rate, monthly_investment_return_rate, rates
+)
+tag_params(retirement_params)
+lap("widgets")
+grid = cache.simulate_retirement_grid(retirement_params)
+lap("kernel")
 
-    total_amount = salary_at_retire / (
-        monthly_investment_return_rate / 100 - monthly_inflation_rate / 100
-    )
+years_to_retire = grid.time_to_retire
+buy_power = np.round(grid.wanted_buy_power, 2)
+savings = np.round(grid.monthly_savings, 2)
+future_salary = np.round(grid.future_salary, 2)
 
-    monthly_savings = (
-        monthly_investment_return_rate
-        / 100
-        * (
-            total_amount
-            - current_capital
-            * (1 + monthly_investment_return_rate / 100) ** months_to_retire
+fig = go.Figure()
+for years in np.unique(years_to_retire):
+    selected = years_to_retire == years
+    fig.add_trace(
+        go.Scatter(
+            x=savings[selected],
+            y=buy_power[selected],
+            mode="lines",
+            name=str(years),
+            customdata=future_salary[selected],
+            hovertemplate=(
+                f"Anos para aposentar: {years}<br>"
+                "Poupança mensal necessária (R$): %{x}<br>"
+                "Poder de compra desejado (R$): %{y}<br>"
+                "Salário ao aposentar (R$): %{customdata}<extra></extra>"
+            ),
         )
-        / ((1 + monthly_investment_return_rate / 100) ** months_to_retire - 1)
     )
-    return monthly_savings, salary_at_retire
-
-
-points = [
-    (
-        wanted_buy_power,
-        time_to_retire,
-        *calculate_monthly_savings(
-            wanted_buy_power,
-            time_to_retire,
-            current_capital,
-            monthly_inflation_rate,
-            monthly_investment_return_rate,
+fig.update_layout(
+    title="Poupança mensal necessária para se aposentar com diferentes salários desejados e tempos para aposentar",
+    xaxis_title="Poupança mensal necessária (R$)",
+    yaxis_title="Poder de compra desejado (R$)",
+    legend_title_text="Anos para aposentar",
+)
+lap("figure")
+st.plotly_chart(fig)
+lap("render")
+
+st.title("Mapa da poupança necessária")
+
+surface = cache.simulate_retirement_surface(
+    retirement_params,
+    np.linspace(1000, 50000, 500),
+    np.arange(1, 50 * 12 + 1),
+)
+lap("kernel")
+required_savings = np.where(
+    np.isfinite(surface.monthly_savings), surface.monthly_savings.round(2), np.nan
+)
+
+# Very short horizons need absurd savings; cap the color scale so the rest stays readable
+fig = go.Figure(
+    go.Contour(
+        x=surface.months_to_retire / 12,
+        y=surface.wanted_buy_power,
+        z=required_savings,
+        zmin=0,
+        zmax=np.nanpercentile(required_savings, 90),
+        contours_coloring="heatmap",
+        colorbar=dict(title="Poupança mensal (R$)"),
+        hovertemplate=(
+            "Anos para aposentar: %{x:.2f}<br>"
+            "Poder de compra desejado: R$ %{y:,.2f}<br>"
+            "Poupança mensal necessária: R$ %{z:,.2f}<extra></extra>"
         ),
     )
-    for wanted_buy_power in range(1000, 50000, 1000)
-    for time_to_retire in range(5, 30, 5)
-]
-
-
-df = pd.DataFrame(
-    {
-        "wanted_buy_power": [round(p[0], 2) for p in points],
-        "time_to_retire": [p[1] for p in points],
-        "monthly_savings": [round(p[2], 2) for p in points],
-        "future_salary": [round(p[3], 2) for p in points],
-    }
 )
-
-fig = px.line(
-    df,
-    y="wanted_buy_power",
-    x="monthly_savings",
-    color="time_to_retire",
-    title="Poupança mensal necessária para se aposentar com diferentes salários desejados e tempos para aposentar",
-    labels={
-        "wanted_buy_power": "Poder de compra desejado (R$)",
-        "monthly_savings": "Poupança mensal necessária (R$)",
-        "time_to_retire": "Anos para aposentar",
-        "future_salary": "Salário ao aposentar (R$)",
-    },
-    hover_data=["future_salary"],
+fig.update_layout(
+    title="Poupança mensal necessária por poder de compra desejado e tempo para aposentar (mês a mês)",
+    xaxis_title="Anos para aposentar",
+    yaxis_title="Poder de compra desejado (R$)",
 )
+lap("figure")
+fig = prepare_figure(fig, "savings_map")
+lap("chart_data")
 st.plotly_chart(fig)
+lap("render")
 
 st.title("Cálculo com valores específicos")
 
 wanted_buy_power = st.number_input(
     "Poder de compra desejado (R$)", value=10000, step=1000
 )
-time_to_retire = st.number_input("Anos para aposentar", value=20, step=1)
+time_to_retire = st.number_input(
+    "Anos para aposentar", min_value=1, max_value=MAX_YEARS_TO_RETIRE, value=20, step=1
+)
 monthly_savings, future_salary = calculate_monthly_savings(
     wanted_buy_power,
     time_to_retire,
     current_capital,
     monthly_inflation_rate,
     monthly_investment_return_rate,
+    rates=rates,
 )
 
-st.write(
-    f"Poupança mensal necessária: {locale.currency(monthly_savings, grouping=True)}"
+st.write(f"Poupança mensal necessária: {brl(monthly_savings, markdown=True)}")
+st.write(f"Salário ao aposentar: {brl(future_salary, markdown=True)}")
+
+st.title("Poder de compra com a sua poupança")
+
+saving = st.number_input("Poupança mensal (R$)", value=3000, step=500)
+horizons = np.unique(np.append(np.arange(5, 45, 5), time_to_retire))
+lap("widgets")
+goal = cache.affordable_buy_power(retirement_params, saving, horizons)
+lap("kernel")
+
+buy_powers = goal.solutions
+if np.isnan(buy_powers).all():
+    st.warning(
+        "Com o retorno da aplicação abaixo da inflação, nenhuma poupança sustenta "
+        "uma renda na aposentadoria."
+    )
+else:
+    affordable = buy_powers[horizons == time_to_retire][0]
+    st.write(
+        f"Poupando {brl(saving, markdown=True)} por mês por {time_to_retire} anos, "
+        f"você pode se aposentar com poder de compra de {brl(affordable, markdown=True)}."
+    )
+    st.dataframe(
+        {
+            "Anos para aposentar": horizons,
+            "Poder de compra (R$)": np.round(buy_powers, 2),
+        },
+        hide_index=True,
+    )
+lap("render")
+
+st.title("Teste com o histórico")
+
+history = load_rate_history()
+st.markdown(
+    "Refaz o cálculo acima começando em cada mês da série histórica de IPCA e CDI "
+    f"({history.period()}), com as taxas que vieram depois desse mês. "
+    "A série tem uma taxa por ano, aproximada e ilustrativa, repetida nos 12 meses, "
+    "então meses de início do mesmo ano dão resultados parecidos."
+)
+wrap = st.checkbox(
+    "Continuar a série do início quando o período passar do fim",
+    value=True,
+    help="Sem isso, só entram os meses de início com a acumulação inteira dentro da série.",
 )
-st.write(f"Salário ao aposentar: {locale.currency(future_salary, grouping=True)}")
+lap("widgets")
+backtest = cache.backtest_required_savings(
+    BacktestParams(historical_schedule(None), wrap),
+    wanted_buy_power,
+    current_capital,
+    round(time_to_retire * 12),
+)
+lap("kernel")
+
+if backtest.starts.size == 0:
+    st.warning("A série histórica é mais curta que o tempo para aposentar.")
+else:
+    low, median, high = np.percentile(backtest.monthly_savings, [5, 50, 95])
+    st.write(
+        f"Poupança mensal necessária: {brl(median, markdown=True)} na mediana dos "
+        f"{backtest.starts.size} meses de início, entre {brl(low, markdown=True)} e "
+        f"{brl(high, markdown=True)} em 90% deles."
+    )
+    fig = go.Figure(
+        go.Scatter(
+            x=history.dates()[backtest.starts],
+            y=np.round(backtest.monthly_savings, 2),
+            mode="lines",
+            customdata=np.round(backtest.future_salary, 2),
+            hovertemplate=(
+                "Início: %{x|%m/%Y}<br>"
+                "Poupança mensal necessária (R$): %{y}<br>"
+                "Salário ao aposentar (R$): %{customdata}<extra></extra>"
+            ),
+        )
+    )
+    fig.update_layout(
+        title="Poupança mensal necessária por mês de início da acumulação",
+        xaxis_title="Mês de início",
+        yaxis_title="Poupança mensal necessária (R$)",
+    )
+    lap("figure")
+    st.plotly_chart(fig)
+    lap("render")
+
+render_debug_panel()
@@ -1,9 +1,17 @@
 import streamlit as st
-import locale
-import pandas as pd
-import plotly.express as px
+import math
+from datetime import date
+import numpy as np
+import plotly.graph_objects as go
 
-locale.setlocale(locale.LC_MONETARY, "pt_BR.UTF-8")
+from charts import prepare_figure
+from debug_panel import lap, render_debug_panel, start_rerun, tag_params
+from finances import SavingsRateParams, cache, solve_months_to_retire
+from finances.backtest import BacktestParams
+from finances.rates import HISTORICAL_YEARS, historical_schedule, load_rate_history
+from finances.retirement import MAX_YEARS_TO_RETIRE
+
+start_rerun("2_Aposentadoria_(2)")
 
 with st.sidebar:
     st.write("Essa simulação não considera capital inicial.")
@@ -20,49 +28,151 @@ with st.sidebar:
     consider_increasing_monthly_savings = st.checkbox(
         "Considerar aumento da poupança mensal acompanhando a inflação?", value=False
     )
+    max_years_to_retire = st.number_input(
+        "Horizonte máximo do gráfico (anos)",
+        min_value=1,
+        max_value=MAX_YEARS_TO_RETIRE,
+        value=50,
+        step=5,
+    )
+    historical_rates = st.checkbox(
+        "Repetir as taxas dos últimos 20 anos",
+        value=False,
+        help=(
+            "Usa o IPCA e o CDI anuais dos últimos 20 anos no lugar das taxas acima, "
+            "repetindo a série se o horizonte for maior. Os valores são aproximados e "
+            "ilustrativos, e a variação de cada ano é repartida igualmente entre os seus "
+            "12 meses."
+        ),
+    )
+    if historical_rates:
+        st.caption(
+            f"Taxas anuais aproximadas de {load_rate_history().period(HISTORICAL_YEARS)}."
+        )
 
 
-def calculate_monthly_savings_rate(
-    months_to_retire: int,
-    monthly_inflation_rate: float,
-    monthly_investment_return_rate: float,
-) -> float:
-    m = months_to_retire
-    r = monthly_investment_return_rate / 100
-    i = monthly_inflation_rate / 100
+rates = historical_schedule() if historical_rates else None
 
-    factor = (
-        ((1 + r) ** (m + 1) - (1 + i) ** (m + 1)) / (r - i)
-        if consider_increasing_monthly_savings
-        else ((1 + r) ** m - 1) / r
+savings_rate_params = SavingsRateParams(
+    monthly_inflation_rate,
+    monthly_investment_return_rate,
+    consider_increasing_monthly_savings,
+    max_months=max_years_to_retire * 12,
+    rates=rates,
+)
+tag_params(savings_rate_params)
+lap("widgets")
+curve = cache.simulate_savings_rate_curve(savings_rate_params)
+lap("kernel")
+
+fig = go.Figure(
+    go.Scatter(
+        x=np.round(curve.monthly_savings_rate * 100, 2),
+        y=np.round(curve.months_to_retire / 12, 2),
+        mode="lines",
+        hovertemplate=(
+            "Taxa de poupança mensal necessária para se aposentar (%): %{x}<br>"
+            "Anos para aposentar: %{y}<extra></extra>"
+        ),
     )
-    return (1 + i) ** m / (r - i) / factor
+)
+fig.update_layout(
+    title="Quantos anos para você se aposentar?",
+    xaxis_title="Taxa de poupança mensal necessária para se aposentar (%)",
+    yaxis_title="Anos para aposentar",
+)
+lap("figure")
+fig = prepare_figure(fig, "savings_rate_curve")
+lap("chart_data")
+st.plotly_chart(fig)
+lap("render")
 
+st.title("Quando posso me aposentar?")
+
+savings_rate = st.number_input(
+    "Taxa de poupança mensal (%)",
+    min_value=0.1,
+    max_value=100.0,
+    value=30.0,
+    step=1.0,
+)
+lap("widgets")
+months_to_retire = solve_months_to_retire(
+    savings_rate / 100,
+    monthly_inflation_rate,
+    monthly_investment_return_rate,
+    consider_increasing_monthly_savings,
+    rates=rates,
+)
+lap("kernel")
 
-points = []
-for months_to_retire in range(50 * 12, 0, -1):
-    rate = calculate_monthly_savings_rate(
-        months_to_retire, monthly_inflation_rate, monthly_investment_return_rate
+if math.isnan(months_to_retire):
+    st.warning(
+        "Com essa taxa de poupança não é possível se aposentar nos próximos 200 anos."
+    )
+else:
+    today = date.today()
+    retire_month_index = today.year * 12 + today.month - 1 + math.ceil(months_to_retire)
+    retire_date = date(retire_month_index // 12, retire_month_index % 12 + 1, 1)
+    st.success(
+        f"Você poderá se aposentar em {round(months_to_retire / 12, 2)} anos, "
+        f"por volta de {retire_date:%m/%Y}."
     )
-    if rate > 1:
-        break
-    points.append((months_to_retire, rate))
 
-df = pd.DataFrame(
-    {
-        "years_to_retire": [round(p[0] / 12, 2) for p in points],
-        "monthly_savings_rate": [round(p[1] * 100, 2) for p in points],
-    }
-)
+st.title("Teste com o histórico")
 
-fig = px.line(
-    df,
-    y="years_to_retire",
-    x="monthly_savings_rate",
-    title="Quantos anos para você se aposentar?",
-    labels={
-        "years_to_retire": "Anos para aposentar",
-        "monthly_savings_rate": "Taxa de poupança mensal necessária para se aposentar (%)",
-    },
+history = load_rate_history()
+st.markdown(
+    "Refaz a conta acima começando em cada mês da série histórica de IPCA e CDI "
+    f"({history.period()}), com as taxas que vieram depois desse mês. "
+    "A série tem uma taxa por ano, aproximada e ilustrativa, repetida nos 12 meses, "
+    "então meses de início do mesmo ano dão resultados parecidos."
 )
-st.plotly_chart(fig)
+wrap = st.checkbox(
+    "Continuar a série do início quando o período passar do fim",
+    value=True,
+    help="Sem isso, o horizonte de cada mês de início termina no fim da série.",
+)
+lap("widgets")
+backtest = cache.backtest_months_to_retire(
+    BacktestParams(historical_schedule(None), wrap),
+    savings_rate / 100,
+    consider_increasing_monthly_savings,
+    max_months=max_years_to_retire * 12,
+)
+lap("kernel")
+
+years_to_retire = backtest.months_to_retire / 12
+reached = np.isfinite(years_to_retire)
+if not reached.any():
+    st.warning(
+        f"Em nenhum mês de início foi possível se aposentar em até {max_years_to_retire} "
+        "anos com essa taxa de poupança."
+    )
+else:
+    low, median, high = np.percentile(years_to_retire[reached], [5, 50, 95])
+    st.write(
+        f"Começando em {reached.sum()} dos {reached.size} meses da série, você se "
+        f"aposentaria em até {max_years_to_retire} anos: em {median:.2f} anos na "
+        f"mediana, entre {low:.2f} e {high:.2f} anos em 90% deles."
+    )
+    fig = go.Figure(
+        go.Scatter(
+            x=history.dates()[backtest.starts],
+            y=np.round(years_to_retire, 2),
+            mode="lines",
+            hovertemplate=(
+                "Início: %{x|%m/%Y}<br>Anos para aposentar: %{y}<extra></extra>"
+            ),
+        )
+    )
+    fig.update_layout(
+        title="Anos para aposentar por mês de início da acumulação",
+        xaxis_title="Mês de início",
+        yaxis_title="Anos para aposentar",
+    )
+    lap("figure")
+    st.plotly_chart(fig)
+    lap("render")
+
+render_debug_panel()
@@ -1,9 +1,29 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import locale
+import numpy as np
+import plotly.graph_objects as go
+
+from charts import prepare_figure
+from debug_panel import lap, render_debug_panel, start_rerun, tag_params
+from finances.export import FORMATS, export_bytes, property_columns
+from finances.formatting import brl
+from finances.montecarlo import PropertyMonteCarloParams
+from finances.offers import (
+    OFFER_COLUMNS,
+    RANKINGS,
+    REQUIRED_COLUMNS,
+    SYSTEMS,
+    offers_from_columns,
+)
+from finances.property import MAX_INSTALLMENTS, MAX_MONTHS_TO_SIMULATE, MIN_TAX
+from finances.rates import HISTORICAL_YEARS, historical_schedule, load_rate_history
+from finances import (
+    FinancingParams,
+    PropertyParams,
+    cache,
+    simulate_monthly_savings,
+)
 
-locale.setlocale(locale.LC_MONETARY, "pt_BR.UTF-8")
+start_rerun("3_Compra_de_imóvel")
 
 st.set_page_config(
     page_title="Comparação de compra de imóvel à vista vs financiado",
@@ -67,92 +87,145 @@ with st.sidebar:
         step=0.01,
     )
 
+    historical_rates = st.checkbox(
+        "Repetir as taxas dos últimos 20 anos",
+        value=False,
+        help=(
+            "Usa o IPCA, o CDI e a valorização de imóveis anuais dos últimos 20 anos no lugar das taxas acima, "
+            "repetindo a série se o horizonte for maior. Os valores são aproximados e "
+            "ilustrativos, e a variação de cada ano é repartida igualmente entre os seus "
+            "12 meses."
+        ),
+    )
+    if historical_rates:
+        st.caption(
+            f"Taxas anuais aproximadas de {load_rate_history().period(HISTORICAL_YEARS)}."
+        )
+
+    st.header("Taxas aleatórias")
+
+    monte_carlo = st.checkbox(
+        "Simular taxas aleatórias (Monte Carlo)",
+        value=False,
+        help=(
+            "Sorteia milhares de trajetórias para a inflação, o retorno da aplicação e a "
+            "valorização do imóvel em torno das taxas acima."
+        ),
+    )
+
+    if monte_carlo:
+        mc_paths = st.select_slider(
+            "Número de trajetórias", options=[1_000, 5_000, 10_000], value=10_000
+        )
+        mc_inflation_volatility = st.number_input(
+            "Volatilidade da inflação mensal (p.p.)",
+            min_value=0.0,
+            value=0.2,
+            step=0.05,
+        )
+        mc_return_volatility = st.number_input(
+            "Volatilidade do retorno mensal (p.p.)",
+            min_value=0.0,
+            value=0.3,
+            step=0.05,
+        )
+        mc_property_volatility = st.number_input(
+            "Volatilidade da valorização mensal (p.p.)",
+            min_value=0.0,
+            value=0.3,
+            step=0.05,
+        )
+        mc_persistence = st.slider(
+            "Persistência das taxas",
+            min_value=0.0,
+            max_value=0.99,
+            value=0.9,
+            step=0.01,
+            help="Quanto a taxa de um mês se parece com a do mês anterior.",
+        )
+        mc_seed = st.number_input("Semente aleatória", min_value=0, value=0, step=1)
+
 
 months_to_simulate = st.number_input(
-    "Quantidade de meses a simular", min_value=1, value=150, step=1
+    "Quantidade de meses a simular",
+    min_value=1,
+    max_value=MAX_MONTHS_TO_SIMULATE,
+    value=150,
+    step=1,
 )
 
-monthly_savings = [float(initial_monthly_saving)]
-months = [1]
+params = PropertyParams(
+    property_value=property_value,
+    available_cash=available_cash,
+    initial_monthly_saving=initial_monthly_saving,
+    monthly_inflation_rate=monthly_inflation_rate,
+    monthly_investment_return_rate=monthly_investment_return_rate,
+    monthly_property_value_increase=monthly_property_value_increase,
+    monthly_property_value_increase_when_bought=monthly_property_value_increase_when_bought,
+    months_to_simulate=months_to_simulate,
+    rates=historical_schedule() if historical_rates else None,
+)
+tag_params(params)
+lap("widgets")
 
-for _ in range(months_to_simulate - 1):
-    monthly_savings.append(monthly_savings[-1] * (1 + monthly_inflation_rate / 100))
-    months.append(months[-1] + 1)
+monthly_savings = simulate_monthly_savings(params)
+months = list(range(1, months_to_simulate + 1))
+lap("kernel")
 
-df = pd.DataFrame(
-    {
-        "mês": months,
-        "economia mensal": monthly_savings,
-    }
-)
 
-fig = px.line(
-    df,
-    x="mês",
-    y="economia mensal",
-    title="Quantidade de dinheiro que você deve guardar por mês",
+def line_chart(title, series, yaxis_title=None):
+    """Gráfico de linhas com uma linha por item de `series` ao longo dos meses."""
+    fig = go.Figure()
+    for name, values in series.items():
+        fig.add_trace(go.Scatter(x=months, y=values, mode="lines", name=name))
+    fig.update_layout(title=title, xaxis_title="mês", yaxis_title=yaxis_title)
+    return fig
+
+
+def months_around(month):
+    """Meses, no eixo dos gráficos, antes e depois de um evento (compra, quitação)."""
+    return () if month is None else (month, month + 1)
+
+
+fig = line_chart(
+    "Quantidade de dinheiro que você deve guardar por mês",
+    {"economia mensal": monthly_savings},
+    yaxis_title="economia mensal",
 )
+lap("figure")
+fig = prepare_figure(fig, "monthly_savings")
+lap("chart_data")
 st.plotly_chart(fig)
+lap("render")
 
 
-def simulate_property_purchase():
+def render_property_purchase():
     st.markdown("## A vista")
 
-    savings = [float(available_cash)]
-    property_values = [float(property_value)]
-    total_capital = [float(available_cash)]
-    months_to_buy = None
-    bought_property = False
-
-    for i in range(months_to_simulate - 1):
-        last_saving = savings[-1]
-        new_saving = (
-            last_saving * (1 + monthly_investment_return_rate / 100)
-            + monthly_savings[i]
-        )
-        last_property_value = property_values[-1]
-        if bought_property:
-            new_property_value = last_property_value * (
-                1 + monthly_property_value_increase_when_bought / 100
-            )
-        else:
-            new_property_value = last_property_value * (
-                1 + monthly_property_value_increase / 100
-            )
-        if new_saving > new_property_value and not bought_property:
-            new_saving -= new_property_value
-            bought_property = True
-            months_to_buy = i
-        savings.append(new_saving)
-        property_values.append(new_property_value)
-        total_capital.append(
-            new_saving + (new_property_value if bought_property else 0)
-        )
-    df = pd.DataFrame(
-        {
-            "mês": months,
-            "saldo": savings,
-            "valor da propriedade": property_values,
-            "capital total": total_capital,
-        }
-    )
+    result = cache.simulate_property_purchase(params)
+    lap("kernel")
 
-    fig = px.line(
-        df,
-        x="mês",
-        y=["saldo", "valor da propriedade", "capital total"],
-        title="Saldo, valor da propriedade e capital total ao longo do tempo",
+    fig = line_chart(
+        "Saldo, valor da propriedade e capital total ao longo do tempo",
+        {
+            "saldo": result.savings,
+            "valor da propriedade": result.property_values,
+            "capital total": result.total_capital,
+        },
     )
+    lap("figure")
+    fig = prepare_figure(fig, "cash", events=months_around(result.purchase_month))
+    lap("chart_data")
     st.plotly_chart(fig)
+    lap("render")
 
+    months_to_buy = result.months_to_buy
     if months_to_buy is not None:
         st.success(
             f"Você terá dinheiro suficiente para comprar a propriedade à vista no mês {months_to_buy + 1} ({round((months_to_buy + 1) / 12, 2)} anos)."
         )
         st.write(
-            f"Nesse momento, você terá {locale.currency(savings[months_to_buy], grouping=True)} e a propriedade valerá {locale.currency(property_values[months_to_buy], grouping=True)}.".replace(
-                "R$", "R\\$"
-            )
+            f"Nesse momento, você terá {brl(result.savings[months_to_buy], markdown=True)} e a propriedade valerá {brl(result.property_values[months_to_buy], markdown=True)}."
         )
         return months_to_buy + 1
     else:
@@ -162,7 +235,7 @@ def simulate_property_purchase():
         return None
 
 
-def simulate_property_purchase_financed():
+def render_property_purchase_financed():
     st.markdown("## Financiado")
 
     st.markdown(
@@ -173,11 +246,24 @@ def simulate_property_purchase_financed():
     )
 
     number_of_installments = st.number_input(
-        "Quantidade de parcelas", min_value=1, value=270, step=1
+        "Quantidade de parcelas",
+        min_value=1,
+        max_value=MAX_INSTALLMENTS,
+        value=270,
+        step=1,
     )
 
     tax = st.number_input(
-        "Taxa de juros mensal (%)", min_value=0.0, value=0.91, step=0.01
+        "Taxa de juros mensal (%)", min_value=MIN_TAX, value=0.91, step=0.01
+    )
+
+    down_payment_pct = st.number_input(
+        "Parte do dinheiro disponível usada como entrada (%)",
+        min_value=0.0,
+        max_value=100.0,
+        value=100.0,
+        step=5.0,
+        help="O que não for usado na entrada continua aplicado e é usado para adiantar parcelas.",
     )
 
     will_live_in_property = st.checkbox(
@@ -199,131 +285,56 @@ def simulate_property_purchase_financed():
         current_rent = 0
         months_to_stop_paying_rent = 0
 
-    first_installment_value = (
-        (property_value - available_cash)
-        * (tax / 100)
-        * (1 + tax / 100) ** number_of_installments
-        / ((1 + tax / 100) ** number_of_installments - 1)
+    financing = FinancingParams(
+        number_of_installments,
+        tax,
+        current_rent,
+        months_to_stop_paying_rent,
+        down_payment_pct / 100,
     )
+    tag_params(params, financing)
+    lap("widgets")
+    result = cache.simulate_property_purchase_financed(params, financing)
+    lap("kernel")
 
-    st.write(
-        f"Primeira parcela: {locale.currency(first_installment_value, grouping=True).replace('R$', 'R\\$')}"
-    )
+    st.write(f"Primeira parcela: {brl(result.first_installment_value, markdown=True)}")
 
-    if first_installment_value > monthly_savings[0]:
+    if not result.affordable:
         st.warning(
             f"Você não tem dinheiro suficiente para pagar a primeira parcela. Tente aumentar a "
             "quantidade de parcelas ou a quantidade de dinheiro que você consegue guardar por mês."
         )
-        return
-
-    installment_values = [
-        first_installment_value / ((1 + tax / 100) ** i)
-        for i in range(1, number_of_installments + 1)
-    ]
-
-    need_to_pay = [sum(installment_values)]
-    rent = [current_rent]
-    property_values = [float(property_value)]
-    liquid_capital = [0.0]
-    total_capital = [float(property_value) - sum(installment_values)]
-    what_left_from_last_installment = 0
-    end_month = None
-
-    for month in range(1, months_to_simulate):
-        # Update future installment values
-        for k in range(month - 1, len(installment_values)):
-            installment_values[k] *= 1 + tax / 100
-
-        if month < months_to_stop_paying_rent:
-            corrected_monthly_savings = (
-                monthly_savings[month - 1] + what_left_from_last_installment
-            )
-        else:
-            corrected_monthly_savings = (
-                monthly_savings[month - 1]
-                + rent[month - 1]
-                + what_left_from_last_installment
-            )
-
-        corrected_monthly_savings -= installment_values[month - 1]
-        installment_values[month - 1] = 0
-
-        for j in range(len(installment_values) - 1, month - 2, -1):
-            if corrected_monthly_savings >= installment_values[j]:
-                corrected_monthly_savings -= installment_values[j]
-                installment_values[j] = 0
-
-        what_left_from_last_installment = corrected_monthly_savings
-
-        new_need_to_pay = sum(installment_values)
-        need_to_pay.append(new_need_to_pay)
-
-        new_property_value = property_values[month - 1] * (
-            1 + monthly_property_value_increase_when_bought / 100
-        )
-        property_values.append(new_property_value)
-        rent.append(rent[month - 1] * (1 + monthly_inflation_rate / 100))
-        liquid_capital.append(what_left_from_last_installment)
-        if new_need_to_pay == 0:
-            end_month = month
-            total_capital.append(what_left_from_last_installment + new_property_value)
-            break
-        else:
-            total_capital.append(
-                what_left_from_last_installment + new_property_value - new_need_to_pay
-            )
-
-    if end_month is not None:
-        for month in range(end_month + 1, months_to_simulate):
-            corrected_monthly_savings = monthly_savings[month - 1] + rent[month - 1]
-            new_liquid_capital = (
-                corrected_monthly_savings + liquid_capital[month - 1]
-            ) * (1 + monthly_investment_return_rate / 100)
-            new_property_value = property_values[month - 1] * (
-                1 + monthly_property_value_increase_when_bought / 100
-            )
-            need_to_pay.append(0)
-            property_values.append(new_property_value)
-            rent.append(rent[month - 1] * (1 + monthly_inflation_rate / 100))
-            liquid_capital.append(new_liquid_capital)
-            total_capital.append(new_liquid_capital + new_property_value)
+        return None, financing
 
-    df = pd.DataFrame(
+    fig = line_chart(
+        "Quantidade de dinheiro que vai faltar pagar, valor da propriedade e capital total ao longo do tempo",
         {
-            "mês": months,
-            "quantidade de dinheiro que vai faltar pagar": need_to_pay,
-            "valor da propriedade": property_values,
-            "capital total": total_capital,
-        }
-    )
-
-    fig = px.line(
-        df,
-        x="mês",
-        y=[
-            "quantidade de dinheiro que vai faltar pagar",
-            "valor da propriedade",
-            "capital total",
-        ],
-        title="Quantidade de dinheiro que vai faltar pagar, valor da propriedade e capital total ao longo do tempo",
+            "quantidade de dinheiro que vai faltar pagar": result.need_to_pay,
+            "valor da propriedade": result.property_values,
+            "capital total": result.total_capital,
+        },
     )
+    lap("figure")
+    fig = prepare_figure(fig, "financed", events=months_around(result.end_month))
+    lap("chart_data")
     st.plotly_chart(fig)
+    lap("render")
 
+    end_month = result.end_month
     if end_month is not None:
         st.success(
             f"Você terminará de pagar a dívida no mês {end_month} ({round(end_month / 12, 2)} anos)."
         )
-        return end_month
+        return end_month, financing
     else:
         st.warning(
             "Você não conseguirá terminar de pagar a dívida dentro do período simulado."
         )
-        return None
+        return None, financing
 
 
-end_month_to_buy_property_cash = simulate_property_purchase()
-end_month_to_buy_property_financed = simulate_property_purchase_financed()
+end_month_to_buy_property_cash = render_property_purchase()
+end_month_to_buy_property_financed, financing = render_property_purchase_financed()
 
 st.markdown("## Conclusão")
 
@@ -360,3 +371,350 @@ else:
             f"Já se comprar à vista, você conseguirá comprar a propriedade no mês "
             f"{end_month_to_buy_property_cash} ({round(end_month_to_buy_property_cash / 12, 2)} anos)."
         )
+
+
+def render_export():
+    columns = st.columns([1, 3])
+    fmt = columns[0].radio(
+        "Formato", list(FORMATS), horizontal=True, format_func=str.upper
+    )
+
+    # Built only while the toggle is on, from the cached results, with the raw
+    # numbers; download_button needs the bytes up front
+    if not columns[1].toggle("Preparar o arquivo das séries mensais"):
+        return
+    cash = cache.simulate_property_purchase(params)
+    financed = cache.simulate_property_purchase_financed(params, financing)
+    columns[1].download_button(
+        "Baixar as séries mensais",
+        data=export_bytes(property_columns(cash, financed), fmt),
+        file_name=f"compra_de_imovel.{fmt}",
+        mime=FORMATS[fmt],
+    )
+
+
+render_export()
+
+
+def render_minimum_saving():
+    st.markdown("## Poupança mínima para comprar à vista")
+    years = st.number_input(
+        "Comprar à vista em até (anos)",
+        min_value=1,
+        max_value=MAX_MONTHS_TO_SIMULATE // 12,
+        value=10,
+        step=1,
+    )
+    horizons = np.unique(np.append(np.arange(5, 35, 5), years))
+    lap("widgets")
+    goal = cache.minimum_monthly_saving(params, horizons * 12)
+    lap("kernel")
+
+    saving = goal.solutions[horizons == years][0]
+    if np.isnan(saving):
+        st.warning(f"Nenhuma poupança mensal compra o imóvel à vista em {years} anos.")
+    else:
+        st.write(
+            f"Para comprar à vista em até {years} anos, você precisa começar "
+            f"guardando {brl(saving, markdown=True)} por mês."
+        )
+    st.dataframe(
+        {
+            "Anos": horizons,
+            "Poupança mensal inicial (R$)": np.round(goal.solutions, 2),
+        },
+        hide_index=True,
+    )
+    lap("render")
+
+
+if st.checkbox("Calcular a poupança mínima para comprar à vista", value=False):
+    render_minimum_saving()
+
+
+def render_financing_optimization():
+    # Only this opt-in section needs pandas, so it is not paid on every cold render
+    import pandas as pd
+
+    st.markdown("## Melhor contrato")
+    st.markdown(
+        "Procura a quantidade de parcelas, a parte do dinheiro disponível usada como entrada "
+        "e o mês em que você para de pagar aluguel que melhor atendem ao objetivo, mantendo "
+        "a taxa de juros informada."
+    )
+
+    objective = st.radio(
+        "Objetivo",
+        ["payoff", "capital"],
+        format_func={
+            "payoff": "Quitar o quanto antes",
+            "capital": "Maior capital total no fim do período",
+        }.get,
+        horizontal=True,
+    )
+    lap("widgets")
+    optimization = cache.optimize_financing(params, financing, objective)
+    lap("kernel")
+    best = optimization.best
+    if best is None:
+        st.warning(
+            "Nenhum contrato tem a primeira parcela dentro do que você consegue guardar por mês."
+        )
+        return
+
+    st.caption(
+        f"{optimization.evaluated} contratos simulados e {optimization.pruned} descartados "
+        "sem simular por terem a primeira parcela alta demais."
+    )
+    ranking = pd.DataFrame(
+        {
+            "parcelas": [
+                c.financing.number_of_installments for c in optimization.ranking
+            ],
+            "entrada (% do dinheiro disponível)": [
+                round(c.financing.down_payment_fraction * 100, 1)
+                for c in optimization.ranking
+            ],
+            "meses até parar de pagar aluguel": [
+                c.financing.months_to_stop_paying_rent for c in optimization.ranking
+            ],
+            "primeira parcela": [
+                round(c.first_installment_value, 2) for c in optimization.ranking
+            ],
+            "mês da quitação": [c.end_month for c in optimization.ranking],
+            "capital total no fim": [
+                round(c.final_total_capital, 2) for c in optimization.ranking
+            ],
+        }
+    )
+    lap("dataframe")
+    st.dataframe(ranking, hide_index=True)
+    lap("render")
+
+    heatmap = cache.simulate_payoff_heatmap(
+        params,
+        best.financing,
+        np.arange(12, 421, 12),
+        np.round(np.arange(0.3, 1.51, 0.05), 2),
+    )
+    lap("kernel")
+    fig = go.Figure(
+        go.Heatmap(
+            x=heatmap.number_of_installments,
+            y=heatmap.tax,
+            z=heatmap.end_month,
+            colorbar=dict(title="mês da quitação"),
+            hovertemplate=(
+                "Parcelas: %{x}<br>"
+                "Taxa de juros mensal: %{y:.2f}%<br>"
+                "Mês da quitação: %{z}<extra></extra>"
+            ),
+        )
+    )
+    fig.update_layout(
+        title="Mês da quitação por quantidade de parcelas e taxa de juros (entrada do melhor contrato)",
+        xaxis_title="Quantidade de parcelas",
+        yaxis_title="Taxa de juros mensal (%)",
+    )
+    lap("figure")
+    st.plotly_chart(fig)
+    lap("render")
+    st.caption(
+        "Células vazias: a primeira parcela não cabe na poupança ou a dívida não é quitada no período simulado."
+    )
+
+
+if st.checkbox("Buscar o melhor contrato de financiamento", value=False):
+    render_financing_optimization()
+
+
+def render_offer_comparison():
+    # Only this opt-in section needs pandas, so it is not paid on every cold render
+    import pandas as pd
+
+    st.markdown("## Comparar ofertas de bancos")
+    st.markdown(
+        "Compara ofertas com taxas, prazos, sistemas de amortização (Price ou SAC), "
+        "seguro e tarifas diferentes, usando a sua poupança, o aluguel e a entrada "
+        "escolhidos acima. O custo total soma parcelas, seguro e tarifas do contrato "
+        "inteiro, sem amortizações extraordinárias; a quitação e o capital no fim "
+        "consideram que tudo o que sobra de cada mês adianta parcelas."
+    )
+    uploaded = st.file_uploader(
+        "Planilha de ofertas (CSV)",
+        type="csv",
+        help=(
+            "Colunas: " + ", ".join(OFFER_COLUMNS) + ". Só banco, taxa_mensal e "
+            "parcelas são obrigatórias; o seguro é em % do saldo devedor ao mês."
+        ),
+    )
+    if uploaded is not None:
+        table = pd.read_csv(uploaded)
+    else:
+        table = pd.DataFrame(
+            {
+                "banco": ["Contrato acima", "Exemplo A", "Exemplo B", "Exemplo C"],
+                "taxa_mensal": [financing.tax, 0.85, 0.95, 0.8],
+                "parcelas": [financing.number_of_installments, 360, 300, 420],
+                "sistema": ["price", "sac", "price", "sac"],
+                "seguro_mensal_pct": [0.0, 0.03, 0.025, 0.035],
+                "tarifa_mensal": [0.0, 25.0, 0.0, 25.0],
+                "custos_iniciais": [0.0, 3000.0, 2500.0, 4000.0],
+            }
+        )
+    table = st.data_editor(
+        table,
+        num_rows="dynamic",
+        hide_index=True,
+        column_config={
+            "sistema": st.column_config.SelectboxColumn(options=list(SYSTEMS)),
+        },
+    )
+    criterion = st.radio(
+        "Ordenar por",
+        RANKINGS,
+        format_func={
+            "total_cost": "Menor custo total",
+            "payoff": "Quitação mais cedo",
+            "capital": "Maior capital total no fim do período",
+        }.get,
+        horizontal=True,
+    )
+    lap("widgets")
+    try:
+        offers = offers_from_columns(table.dropna(subset=list(REQUIRED_COLUMNS)))
+        comparison = cache.compare_offers(params, financing, offers)
+    except ValueError as error:
+        st.error(str(error))
+        return
+    lap("kernel")
+
+    order = comparison.ranking(criterion)
+    ranking = pd.DataFrame(
+        {
+            "banco": [offers[i].name for i in order],
+            "sistema": [offers[i].system.upper() for i in order],
+            "taxa mensal (%)": [offers[i].tax for i in order],
+            "parcelas": [offers[i].number_of_installments for i in order],
+            "primeira parcela com seguro e tarifa": np.round(
+                comparison.first_payment[order], 2
+            ),
+            "custo total": np.round(comparison.total_cost[order], 2),
+            "juros": np.round(comparison.total_interest[order], 2),
+            "mês da quitação": comparison.end_month[order],
+            "capital total no fim": np.round(comparison.final_total_capital[order], 2),
+        }
+    )
+    lap("dataframe")
+    st.dataframe(ranking, hide_index=True)
+    lap("render")
+    unaffordable = int((~comparison.affordable).sum())
+    if unaffordable:
+        st.caption(
+            f"{unaffordable} oferta(s) com a primeira parcela acima do que você consegue "
+            "guardar por mês ficam no fim, sem quitação nem capital."
+        )
+
+
+if st.checkbox("Comparar ofertas de bancos", value=False):
+    render_offer_comparison()
+
+
+def render_property_monte_carlo():
+    st.markdown("## Simulação com taxas aleatórias")
+    st.markdown(
+        "As faixas mostram os percentis 5–95 e 25–75 do capital total entre as trajetórias "
+        "sorteadas, e a linha a mediana."
+    )
+
+    result = cache.simulate_property_monte_carlo(
+        params,
+        financing,
+        PropertyMonteCarloParams(
+            n_paths=mc_paths,
+            seed=mc_seed,
+            inflation_volatility=mc_inflation_volatility,
+            investment_return_volatility=mc_return_volatility,
+            property_value_volatility=mc_property_volatility,
+            persistence=mc_persistence,
+        ),
+    )
+    lap("kernel")
+    p5, p25, p50, p75, p95 = range(len(result.percentiles))
+
+    fig = go.Figure()
+    scenarios = [("À vista", result.cash_total_capital_bands, "33, 150, 243")]
+    if result.affordable:
+        scenarios.append(
+            ("Financiado", result.financed_total_capital_bands, "255, 152, 0")
+        )
+    for name, bands, rgb in scenarios:
+        for low, high, opacity in ((p5, p95, 0.15), (p25, p75, 0.3)):
+            fig.add_trace(
+                go.Scatter(
+                    x=result.months,
+                    y=bands[low],
+                    mode="lines",
+                    line=dict(width=0),
+                    showlegend=False,
+                    hoverinfo="skip",
+                )
+            )
+            fig.add_trace(
+                go.Scatter(
+                    x=result.months,
+                    y=bands[high],
+                    mode="lines",
+                    line=dict(width=0),
+                    fill="tonexty",
+                    fillcolor=f"rgba({rgb}, {opacity})",
+                    name=f"{name} — P{result.percentiles[low]} a P{result.percentiles[high]}",
+                )
+            )
+        fig.add_trace(
+            go.Scatter(
+                x=result.months,
+                y=bands[p50],
+                mode="lines",
+                line=dict(color=f"rgb({rgb})", width=2),
+                name=f"{name} — mediana",
+            )
+        )
+    fig.update_layout(
+        title="Capital total ao longo do tempo com taxas aleatórias",
+        xaxis_title="mês",
+        yaxis_title="capital total",
+    )
+    lap("figure")
+    fig = prepare_figure(fig, "monte_carlo")
+    lap("chart_data")
+    st.plotly_chart(fig)
+    lap("render")
+
+    events = [("mês da compra à vista", result.purchase_months)]
+    if result.affordable:
+        events.append(("mês da quitação do financiamento", result.payoff_months))
+    columns = st.columns(len(events))
+    for column, (label, event_months) in zip(columns, events):
+        happened = ~np.isnan(event_months)
+        with column:
+            st.metric(
+                f"Trajetórias com {label} no período",
+                f"{happened.mean() * 100:.1f}%",
+            )
+            if happened.any():
+                fig = go.Figure(go.Histogram(x=event_months[happened], nbinsx=60))
+                fig.update_layout(
+                    title=f"Distribuição do {label}",
+                    xaxis_title=label,
+                    yaxis_title="trajetórias",
+                )
+                lap("figure")
+                st.plotly_chart(fig)
+                lap("render")
+
+
+if monte_carlo:
+    render_property_monte_carlo()
+
+render_debug_panel()
@@ -1,9 +1,17 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import locale
+import math
+import numpy as np
 
-locale.setlocale(locale.LC_MONETARY, "pt_BR.UTF-8")
+from debug_panel import lap, render_debug_panel, start_rerun, tag_params
+from finances import BusinessParams, cache
+from finances.business import MAX_ANO_FIM, MAX_ANO_INICIO
+from finances.export import FORMATS, export_bytes
+from finances.formatting import brl, brl_array
+from finances.montecarlo import BusinessMonteCarloParams
+
+start_rerun("4_Negócio_ou_emprego")
 
 st.set_page_config(
     page_title="Negócio ou emprego?",
@@ -32,7 +40,7 @@ with st.sidebar:
     ano_inicio = st.number_input(
         "Ano de início (a partir de hoje)",
         min_value=0,
-        max_value=20,
+        max_value=MAX_ANO_INICIO,
         value=_get("ano_inicio", 2, int),
         step=1,
         help="Ano em que a simulação começa, contado a partir de hoje.",
@@ -40,7 +48,7 @@ with st.sidebar:
     ano_fim = st.number_input(
         "Ano do evento de liquidez",
         min_value=1,
-        max_value=30,
+        max_value=MAX_ANO_FIM,
         value=_get("ano_fim", 6, int),
         step=1,
         help="Ano do evento de liquidez (venda, IPO, buyout), contado a partir de hoje.",
@@ -136,6 +144,66 @@ with st.sidebar:
         step=0.1,
     )
 
+    st.subheader("Monte Carlo")
+    monte_carlo = st.checkbox(
+        "Simular incerteza com Monte Carlo",
+        value=False,
+        help=(
+            "Sorteia o crescimento da receita, a diluição, o múltiplo de valuation "
+            "na saída e o atraso do evento de liquidez."
+        ),
+    )
+    if monte_carlo:
+        mc_paths = st.select_slider(
+            "Número de cenários",
+            options=[10_000, 100_000, 1_000_000],
+            value=100_000,
+        )
+        mc_revenue_volatility = st.number_input(
+            "Volatilidade da receita no evento de liquidez",
+            min_value=0.0,
+            value=0.5,
+            step=0.05,
+            help="Desvio padrão do logaritmo do fator que multiplica a receita alvo.",
+        )
+        mc_dilution_volatility = st.number_input(
+            "Volatilidade da participação final",
+            min_value=0.0,
+            value=0.3,
+            step=0.05,
+        )
+        mc_multiple_volatility = st.number_input(
+            "Volatilidade do múltiplo de valuation",
+            min_value=0.0,
+            value=0.5,
+            step=0.05,
+        )
+        mc_mean_delay = st.number_input(
+            "Atraso médio do evento de liquidez (anos)",
+            min_value=0.0,
+            value=1.0,
+            step=0.5,
+        )
+        mc_seed = st.number_input("Semente aleatória", min_value=0, value=0, step=1)
+
+    st.subheader("Sensibilidade")
+    sensitivity = st.checkbox(
+        "Mostrar análise de sensibilidade",
+        value=False,
+        help=(
+            "Mostra como o multiplicador real e o break-even mudam quando cada "
+            "parâmetro varia, sem precisar mexer nos controles um a um."
+        ),
+    )
+    if sensitivity:
+        sensitivity_step_pct = st.slider(
+            "Variação dos parâmetros (%)",
+            min_value=5,
+            max_value=50,
+            value=20,
+            step=5,
+        )
+
     st.divider()
     if st.button("Gerar link para compartilhar", use_container_width=True):
         st.query_params.update({
@@ -161,137 +229,54 @@ if ano_fim <= ano_inicio:
     st.error("O ano do evento de liquidez deve ser maior que o ano de início.")
     st.stop()
 
-# ── Derived constants ─────────────────────────────────────────────────────────
-multiplicador_requerido = 100.0 / probabilidade_sucesso
-window_length = ano_fim - ano_inicio
-r = inflacao_anual_pct / 100.0
-multiple_valuation = valuation_saida / receita_alvo if receita_alvo > 0 else 0.0
-
-
-def lerp(a, b, t):
-    return a + t * (b - a)
-
-
-def hoje(value, ano):
-    """Converte valor nominal do ano `ano` para R$ de hoje."""
-    return value / (1 + r) ** ano
-
-
-# ── Year-by-year simulation ───────────────────────────────────────────────────
-sim_years = list(range(ano_inicio, ano_fim + 1))
-labels = [f"Ano {y}" for y in sim_years]
-
-emp_cash_yr = []
-biz_cash_yr = []
-biz_equity_yr = []
-detail_rows = []
-
-# Nominal values for contextual charts (no inflation discount)
-revenue_yr_nom = []
-valuation_yr_nom = []
-equity_value_yr_nom = []
-prolabore_anual_yr_nom = []
-dividendos_yr_nom = []
-
-for i, ano in enumerate(sim_years):
-    t = i / window_length
-
-    revenue_t = lerp(receita_inicio, receita_alvo, t)
-    equity_t = lerp(equity_inicio_pct, equity_fim_pct, t) / 100.0
-    prolabore_t = lerp(prolabore_inicio, prolabore_fim, t)
-
-    # Derived valuation: revenue × constant multiple (fixed at exit ratio)
-    valuation_t = revenue_t * multiple_valuation if ano < ano_fim else valuation_saida
-
-    prolabore_anual = prolabore_t * 12.0
-    dividendos_t = revenue_t * (margem_lucro_pct / 100.0) * equity_t
-    biz_cash_anual = prolabore_anual + dividendos_t
-
-    # Employee: nominal salary grows with inflation so that real value = remuneracao_mensal
-    emp_anual_nominal = remuneracao_mensal * 12.0 * (1 + r) ** ano
-    emp_cash_yr.append(hoje(emp_anual_nominal, ano))   # = remuneracao_mensal * 12
-
-    biz_cash_yr.append(hoje(biz_cash_anual, ano))
-    biz_equity_yr.append(hoje(equity_t * valuation_t, ano))
-
-    revenue_yr_nom.append(revenue_t)
-    valuation_yr_nom.append(valuation_t)
-    equity_value_yr_nom.append(equity_t * valuation_t)
-    prolabore_anual_yr_nom.append(prolabore_anual)
-    dividendos_yr_nom.append(dividendos_t)
-
-    detail_rows.append(
-        {
-            "Ano": ano,
-            "Receita anual": revenue_t,
-            "Pró-labore mensal": prolabore_t,
-            "Dividendos anuais": dividendos_t,
-            "Equity (%)": equity_t * 100.0,
-            "Valuation": valuation_t,
-            "Valor do equity": equity_t * valuation_t,
-            "Fluxo negócio (anual)": biz_cash_anual,
-            "Fluxo empregado (anual)": emp_anual_nominal,
-        }
-    )
-
-# ── Accumulated capital (in today's R$) ──────────────────────────────────────
-emp_acc = []
-biz_cash_acc = []
-biz_total_acc = []
-
-running_emp = 0.0
-running_biz = 0.0
-
-for i in range(len(sim_years)):
-    running_emp += emp_cash_yr[i]
-    running_biz += biz_cash_yr[i]
-    emp_acc.append(running_emp)
-    biz_cash_acc.append(running_biz)
-    biz_total_acc.append(running_biz + biz_equity_yr[i])
-
-# ── Summary metrics ───────────────────────────────────────────────────────────
-employee_total = emp_acc[-1]
-biz_success_total = biz_total_acc[-1]
-biz_failure_total = biz_cash_acc[-1]   # no equity in failure scenario
-
-multiplicador_real = biz_success_total / employee_total if employee_total > 0 else 0.0
-
-breakeven_year = None
-for i, ano in enumerate(sim_years):
-    if biz_total_acc[i] >= emp_acc[i]:
-        breakeven_year = ano
-        break
-
-
-def fmt(v):
-    """Formata valor para uso em st.metric() (texto simples, sem markdown)."""
-    return locale.currency(v, grouping=True)
-
+# ── Simulation ────────────────────────────────────────────────────────────────
+params = BusinessParams(
+    ano_inicio=ano_inicio,
+    ano_fim=ano_fim,
+    equity_inicio_pct=equity_inicio_pct,
+    equity_fim_pct=equity_fim_pct,
+    remuneracao_mensal=remuneracao_mensal,
+    probabilidade_sucesso=probabilidade_sucesso,
+    receita_inicio=receita_inicio,
+    receita_alvo=receita_alvo,
+    margem_lucro_pct=margem_lucro_pct,
+    valuation_saida=valuation_saida,
+    prolabore_inicio=prolabore_inicio,
+    prolabore_fim=prolabore_fim,
+    inflacao_anual_pct=inflacao_anual_pct,
+)
+tag_params(params)
+lap("widgets")
+result = cache.simulate_business(params)
+lap("kernel")
+labels = [f"Ano {y}" for y in result.sim_years]
 
 # ── Metrics display ───────────────────────────────────────────────────────────
 st.subheader("Resumo no evento de liquidez (valores em R\\$ de hoje)")
 
 c1, c2, c3 = st.columns(3)
-c1.metric("Capital acumulado — Empregado", fmt(employee_total))
-c2.metric("Capital acumulado — Negócio (sucesso)", fmt(biz_success_total))
-c3.metric("Capital acumulado — Negócio (fracasso)", fmt(biz_failure_total))
+c1.metric("Capital acumulado — Empregado", brl(result.employee_total))
+c2.metric("Capital acumulado — Negócio (sucesso)", brl(result.biz_success_total))
+c3.metric("Capital acumulado — Negócio (fracasso)", brl(result.biz_failure_total))
 
 c4, c5, c6 = st.columns(3)
 c4.metric(
     "Multiplicador real (sucesso ÷ empregado)",
-    f"{multiplicador_real:.2f}x",
-    delta=f"{multiplicador_real - multiplicador_requerido:+.2f}x vs requerido",
+    f"{result.multiplicador_real:.2f}x",
+    delta=f"{result.multiplicador_real - result.multiplicador_requerido:+.2f}x vs requerido",
 )
 c5.metric(
     "Multiplicador mínimo requerido (1 ÷ prob. sucesso)",
-    f"{multiplicador_requerido:.2f}x",
+    f"{result.multiplicador_requerido:.2f}x",
 )
 c6.metric(
     "Break-even",
-    f"Ano {breakeven_year}" if breakeven_year else "Não atingido",
+    f"Ano {result.breakeven_year}" if result.breakeven_year else "Não atingido",
     help="Primeiro ano em que o capital total do negócio supera o do empregado.",
 )
 
+lap("render")
+
 # ── Chart 1: company & equity growth ─────────────────────────────────────────
 st.subheader("A empresa e o seu equity")
 st.caption("Evolução nominal da receita, do valuation e do valor do seu equity ao longo do tempo.")
@@ -301,21 +286,21 @@ fig_empresa = go.Figure()
 fig_empresa.add_trace(go.Scatter(
     name="Receita anual",
     x=labels,
-    y=revenue_yr_nom,
+    y=result.revenue_yr_nom,
     mode="lines+markers",
     line=dict(color="#2196F3", width=2),
 ))
 fig_empresa.add_trace(go.Scatter(
     name="Valuation da empresa",
     x=labels,
-    y=valuation_yr_nom,
+    y=result.valuation_yr_nom,
     mode="lines+markers",
     line=dict(color="#4CAF50", width=2),
 ))
 fig_empresa.add_trace(go.Scatter(
     name="Valor do seu equity",
     x=labels,
-    y=equity_value_yr_nom,
+    y=result.equity_value_yr_nom,
     mode="lines+markers",
     line=dict(color="#FF9800", width=2),
     fill="tozeroy",
@@ -329,7 +314,9 @@ fig_empresa.update_layout(
     height=400,
 )
 
+lap("figure")
 st.plotly_chart(fig_empresa, use_container_width=True)
+lap("render")
 
 # ── Chart 2: annual cash flows ────────────────────────────────────────────────
 st.subheader("Fluxo de caixa anual")
@@ -345,13 +332,13 @@ fig_fluxo = go.Figure()
 fig_fluxo.add_trace(go.Bar(
     name="Pró-labore",
     x=labels,
-    y=prolabore_anual_yr_nom,
+    y=result.prolabore_anual_yr_nom,
     marker_color="#4CAF50",
 ))
 fig_fluxo.add_trace(go.Bar(
     name="Dividendos",
     x=labels,
-    y=dividendos_yr_nom,
+    y=result.dividendos_yr_nom,
     marker_color="#8BC34A",
 ))
 fig_fluxo.add_trace(go.Scatter(
@@ -370,7 +357,9 @@ fig_fluxo.update_layout(
     height=400,
 )
 
+lap("figure")
 st.plotly_chart(fig_fluxo, use_container_width=True)
+lap("render")
 
 # ── Capital chart ─────────────────────────────────────────────────────────────
 st.subheader("Capital acumulado por ano")
@@ -385,7 +374,7 @@ fig.add_trace(
     go.Bar(
         name="Empregado",
         x=labels,
-        y=emp_acc,
+        y=result.emp_acc,
         marker_color="#2196F3",
         offsetgroup=0,
     )
@@ -395,7 +384,7 @@ fig.add_trace(
     go.Bar(
         name="Negócio — Caixa (pró-labore + dividendos)",
         x=labels,
-        y=biz_cash_acc,
+        y=result.biz_cash_acc,
         marker_color="#4CAF50",
         offsetgroup=1,
     )
@@ -405,8 +394,8 @@ fig.add_trace(
     go.Bar(
         name="Negócio — Equity (papel)",
         x=labels,
-        y=biz_equity_yr,
-        base=biz_cash_acc,
+        y=result.biz_equity_yr,
+        base=result.biz_cash_acc,
         marker_color="#FF9800",
         marker_opacity=0.75,
         offsetgroup=1,
@@ -421,19 +410,22 @@ fig.update_layout(
     height=480,
 )
 
+lap("figure")
 st.plotly_chart(fig, use_container_width=True)
+lap("render")
 
 # ── Valuation multiple info ───────────────────────────────────────────────────
 if receita_alvo > 0:
     st.info(
-        f"Múltiplo de valuation implícito: **{multiple_valuation:.1f}x receita** — "
+        f"Múltiplo de valuation implícito: **{result.multiple_valuation:.1f}x receita** — "
         "o valuation dos anos intermediários é derivado da receita multiplicada por esse valor."
     )
 
 # ── Intermediate calculations table ──────────────────────────────────────────
 st.subheader("Detalhamento anual (valores nominais)")
 
-df = pd.DataFrame(detail_rows).set_index("Ano")
+# The result is shared through the cache: columns are replaced below, never written in place
+df = pd.DataFrame(result.detail_columns(), copy=False).set_index("Ano")
 
 currency_cols = [
     "Receita anual",
@@ -445,32 +437,269 @@ currency_cols = [
     "Fluxo empregado (anual)",
 ]
 for col in currency_cols:
-    df[col] = df[col].apply(lambda v: locale.currency(v, grouping=True))
+    df[col] = brl_array(df[col].to_numpy())
 
-df["Equity (%)"] = df["Equity (%)"].apply(lambda v: f"{v:.2f}%")
+df["Equity (%)"] = np.char.mod("%.2f%%", df["Equity (%)"].to_numpy())
+lap("dataframe")
 
 st.dataframe(df, use_container_width=True)
 
+# The download gets the raw nominal values, not the R$ strings of the table above.
+# download_button needs the bytes up front, so they are built only while the toggle is on
+col_formato, col_baixar = st.columns([1, 3])
+formato = col_formato.radio("Formato", list(FORMATS), horizontal=True, format_func=str.upper)
+if col_baixar.toggle("Preparar o arquivo do detalhamento anual"):
+    col_baixar.download_button(
+        "Baixar o detalhamento anual",
+        data=export_bytes(result.detail_columns(), formato),
+        file_name=f"negocio_ou_emprego.{formato}",
+        mime=FORMATS[formato],
+    )
+lap("render")
+
 # ── Verdict ───────────────────────────────────────────────────────────────────
 st.subheader("Veredicto")
 
-if multiplicador_real >= multiplicador_requerido:
+if result.multiplicador_real >= result.multiplicador_requerido:
     st.success(
         f"Vale a pena ficar no negócio. "
-        f"No cenário de sucesso o negócio gera **{multiplicador_real:.2f}x** o capital do emprego, "
-        f"superior ao mínimo requerido de {multiplicador_requerido:.2f}x "
+        f"No cenário de sucesso o negócio gera **{result.multiplicador_real:.2f}x** o capital do emprego, "
+        f"superior ao mínimo requerido de {result.multiplicador_requerido:.2f}x "
         f"(dado {probabilidade_sucesso}% de probabilidade de sucesso)."
         + (
-            f" O negócio supera o emprego já no **ano {breakeven_year}**."
-            if breakeven_year and breakeven_year < ano_fim
+            f" O negócio supera o emprego já no **ano {result.breakeven_year}**."
+            if result.breakeven_year and result.breakeven_year < ano_fim
             else ""
         )
     )
 else:
     st.warning(
         f"O negócio pode não compensar. "
-        f"No cenário de sucesso o negócio gera apenas **{multiplicador_real:.2f}x** o capital do emprego, "
-        f"abaixo do mínimo requerido de {multiplicador_requerido:.2f}x "
+        f"No cenário de sucesso o negócio gera apenas **{result.multiplicador_real:.2f}x** o capital do emprego, "
+        f"abaixo do mínimo requerido de {result.multiplicador_requerido:.2f}x "
         f"(dado {probabilidade_sucesso}% de probabilidade de sucesso). "
         f"Para mudar o veredicto, revise o valuation de saída, a receita alvo, o pró-labore ou a probabilidade de sucesso."
     )
+
+lap("render")
+goal = cache.exit_valuation_for_multiple(params, (1.0, result.multiplicador_requerido))
+lap("kernel")
+breakeven_valuation, required_valuation = goal.solutions
+if np.isnan(required_valuation):
+    st.caption("Nenhum valuation de saída leva o multiplicador real ao requerido com a participação final escolhida.")
+else:
+    st.caption(
+        f"Valuation de saída para empatar com o emprego: {brl(breakeven_valuation, markdown=True)}. "
+        f"Para atingir o multiplicador requerido de {result.multiplicador_requerido:.2f}x: "
+        f"{brl(required_valuation, markdown=True)} (hoje: {brl(valuation_saida, markdown=True)})."
+    )
+
+# ── Monte Carlo ───────────────────────────────────────────────────────────────
+if monte_carlo:
+    st.subheader("Simulação de Monte Carlo (valores em R\\$ de hoje)")
+    st.caption(
+        "Cada cenário sorteia a receita, a participação e o valuation na saída, o ano do "
+        "evento de liquidez e se ele acontece. Depois do evento de liquidez o capital "
+        "acumulado do cenário fica congelado."
+    )
+
+    mc_result = cache.simulate_business_monte_carlo(
+        params,
+        BusinessMonteCarloParams(
+            n_paths=mc_paths,
+            seed=mc_seed,
+            revenue_volatility=mc_revenue_volatility,
+            dilution_volatility=mc_dilution_volatility,
+            multiple_volatility=mc_multiple_volatility,
+            mean_liquidity_delay=mc_mean_delay,
+        ),
+    )
+    lap("kernel")
+    p5, p25, p50, p75, p95 = range(len(mc_result.percentiles))
+
+    c7, c8, c9 = st.columns(3)
+    c7.metric(
+        "Probabilidade do negócio superar o emprego",
+        f"{mc_result.prob_business_wins * 100:.1f}%",
+    )
+    c8.metric(
+        "Multiplicador mediano", f"{mc_result.multiplier_percentiles[p50]:.2f}x"
+    )
+    c9.metric(
+        "Multiplicador (P5 – P95)",
+        f"{mc_result.multiplier_percentiles[p5]:.2f}x – "
+        f"{mc_result.multiplier_percentiles[p95]:.2f}x",
+    )
+
+    mc_labels = [f"Ano {y}" for y in mc_result.years]
+    fig_mc = go.Figure()
+
+    for low, high, opacity, name in (
+        (p5, p95, 0.15, "Negócio — P5 a P95"),
+        (p25, p75, 0.3, "Negócio — P25 a P75"),
+    ):
+        fig_mc.add_trace(go.Scatter(
+            x=mc_labels,
+            y=mc_result.biz_total_bands[low],
+            mode="lines",
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo="skip",
+        ))
+        fig_mc.add_trace(go.Scatter(
+            name=name,
+            x=mc_labels,
+            y=mc_result.biz_total_bands[high],
+            mode="lines",
+            line=dict(width=0),
+            fill="tonexty",
+            fillcolor=f"rgba(255, 152, 0, {opacity})",
+        ))
+
+    fig_mc.add_trace(go.Scatter(
+        name="Negócio — mediana",
+        x=mc_labels,
+        y=mc_result.biz_total_bands[p50],
+        mode="lines+markers",
+        line=dict(color="#FF9800", width=2),
+    ))
+    fig_mc.add_trace(go.Scatter(
+        name="Empregado — mediana",
+        x=mc_labels,
+        y=mc_result.emp_bands[p50],
+        mode="lines+markers",
+        line=dict(color="#2196F3", width=2, dash="dash"),
+    ))
+
+    fig_mc.update_layout(
+        xaxis_title="Ano (a partir de hoje)",
+        yaxis_title="Capital acumulado (R$ de hoje)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        height=480,
+    )
+
+    lap("figure")
+    st.plotly_chart(fig_mc, use_container_width=True)
+    lap("render")
+
+# ── Sensitivity ───────────────────────────────────────────────────────────────
+PARAM_LABELS = {
+    "ano_inicio": "Ano de início",
+    "ano_fim": "Ano do evento de liquidez",
+    "equity_inicio_pct": "Participação no início",
+    "equity_fim_pct": "Participação no evento de liquidez",
+    "remuneracao_mensal": "Remuneração como funcionário",
+    "probabilidade_sucesso": "Probabilidade de sucesso",
+    "receita_inicio": "Receita no início",
+    "receita_alvo": "Receita no evento de liquidez",
+    "margem_lucro_pct": "Margem de lucro",
+    "valuation_saida": "Valuation no evento de liquidez",
+    "prolabore_inicio": "Pró-labore no início",
+    "prolabore_fim": "Pró-labore no evento de liquidez",
+    "inflacao_anual_pct": "Inflação anual",
+}
+
+
+def fmt_year(year):
+    return "Não atingido" if math.isnan(year) else f"Ano {int(year)}"
+
+
+if sensitivity:
+    st.subheader("Análise de sensibilidade")
+    st.caption(
+        f"Cada parâmetro varia ±{sensitivity_step_pct}% (os anos variam ±1) com os "
+        "demais fixos. Todas as variações são calculadas de uma só vez. A "
+        "probabilidade de sucesso só muda o multiplicador requerido e aparece na "
+        "grade abaixo."
+    )
+
+    tornado = cache.simulate_business_tornado(params, sensitivity_step_pct / 100)
+    lap("kernel")
+    bars = tornado.bars[::-1]  # Plotly draws the first bar at the bottom
+    bar_names = [PARAM_LABELS[bar.field] for bar in bars]
+
+    fig_tornado = go.Figure()
+    for side, color, name in (
+        ("low", "#F44336", "Parâmetro menor"),
+        ("high", "#4CAF50", "Parâmetro maior"),
+    ):
+        fig_tornado.add_trace(go.Bar(
+            name=name,
+            y=bar_names,
+            x=[getattr(bar, f"{side}_multiplicador") - tornado.base_multiplicador for bar in bars],
+            base=tornado.base_multiplicador,
+            orientation="h",
+            marker_color=color,
+            customdata=[getattr(bar, f"{side}_value") for bar in bars],
+            hovertemplate="%{y} = %{customdata:,.2f}<br>Multiplicador: %{x:.2f}x<extra></extra>",
+        ))
+    fig_tornado.add_vline(
+        x=result.multiplicador_requerido,
+        line=dict(color="#9E9E9E", dash="dash"),
+        annotation_text="Requerido",
+    )
+    fig_tornado.update_layout(
+        barmode="overlay",
+        xaxis_title="Multiplicador real (sucesso ÷ empregado)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        height=520,
+    )
+    lap("figure")
+    st.plotly_chart(fig_tornado, use_container_width=True)
+    lap("render")
+
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "Parâmetro": [PARAM_LABELS[bar.field] for bar in tornado.bars],
+                "Valor menor": [bar.low_value for bar in tornado.bars],
+                "Valor maior": [bar.high_value for bar in tornado.bars],
+                "Multiplicador (menor)": [bar.low_multiplicador for bar in tornado.bars],
+                "Multiplicador (maior)": [bar.high_multiplicador for bar in tornado.bars],
+                "Break-even (menor)": [fmt_year(bar.low_breakeven_year) for bar in tornado.bars],
+                "Break-even (maior)": [fmt_year(bar.high_breakeven_year) for bar in tornado.bars],
+            }
+        ).set_index("Parâmetro"),
+        use_container_width=True,
+    )
+    lap("render")
+
+    valuation_max = 2 * (valuation_saida or 20_000_000)
+    grid = cache.simulate_business_sensitivity_grid(
+        params,
+        "valuation_saida",
+        np.linspace(valuation_max / 50, valuation_max, 50),
+        "probabilidade_sucesso",
+        np.arange(1, 101),
+    )
+    lap("kernel")
+    fig_grid = go.Figure(go.Heatmap(
+        x=grid.x_values,
+        y=grid.y_values,
+        z=grid.multiplicador_real - grid.multiplicador_requerido,
+        zmid=0,
+        colorscale="RdBu",
+        colorbar=dict(title="Real − requerido"),
+        hovertemplate=(
+            "Valuation: R$ %{x:,.0f}<br>Probabilidade: %{y}%<br>"
+            "Multiplicador real − requerido: %{z:.2f}x<extra></extra>"
+        ),
+    ))
+    fig_grid.add_trace(go.Scatter(
+        x=[valuation_saida],
+        y=[probabilidade_sucesso],
+        mode="markers",
+        marker=dict(color="#000000", size=10, symbol="x"),
+        name="Cenário atual",
+    ))
+    fig_grid.update_layout(
+        title="Quanto o multiplicador real supera o requerido",
+        xaxis_title="Valuation no evento de liquidez (R$)",
+        yaxis_title="Probabilidade de atingir o evento de liquidez (%)",
+        height=480,
+    )
+    lap("figure")
+    st.plotly_chart(fig_grid, use_container_width=True)
+    lap("render")
+
+render_debug_panel()
@@ -0,0 +1,139 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from finances.amortization import InstallmentSchedule, first_installment_value
+from finances.property import (
+    FinancingParams,
+    PropertyParams,
+    simulate_property_purchase_financed,
+)
+
+
+def reference_financed(params: PropertyParams, financing: FinancingParams):
+    """O laço mês a mês original, O(meses x parcelas), antes do InstallmentSchedule."""
+    tax = financing.tax
+    months_to_simulate = params.months_to_simulate
+    monthly_savings = [float(params.initial_monthly_saving)]
+    for _ in range(1, months_to_simulate):
+        monthly_savings.append(
+            monthly_savings[-1] * (1 + params.monthly_inflation_rate / 100)
+        )
+    first = first_installment_value(
+        params.property_value - params.available_cash,
+        financing.number_of_installments,
+        tax,
+    )
+    installment_values = [
+        first / ((1 + tax / 100) ** i)
+        for i in range(1, financing.number_of_installments + 1)
+    ]
+
+    need_to_pay = [sum(installment_values)]
+    rent = [financing.current_rent]
+    property_values = [float(params.property_value)]
+    liquid_capital = [0.0]
+    total_capital = [float(params.property_value) - sum(installment_values)]
+    what_left_from_last_installment = 0
+    end_month = None
+
+    for month in range(1, months_to_simulate):
+        for k in range(month - 1, len(installment_values)):
+            installment_values[k] *= 1 + tax / 100
+
+        if month < financing.months_to_stop_paying_rent:
+            corrected_monthly_savings = (
+                monthly_savings[month - 1] + what_left_from_last_installment
+            )
+        else:
+            corrected_monthly_savings = (
+                monthly_savings[month - 1]
+                + rent[month - 1]
+                + what_left_from_last_installment
+            )
+
+        corrected_monthly_savings -= installment_values[month - 1]
+        installment_values[month - 1] = 0
+
+        for j in range(len(installment_values) - 1, month - 2, -1):
+            if corrected_monthly_savings >= installment_values[j]:
+                corrected_monthly_savings -= installment_values[j]
+                installment_values[j] = 0
+
+        what_left_from_last_installment = corrected_monthly_savings
+
+        new_need_to_pay = sum(installment_values)
+        need_to_pay.append(new_need_to_pay)
+
+        new_property_value = property_values[month - 1] * (
+            1 + params.monthly_property_value_increase_when_bought / 100
+        )
+        property_values.append(new_property_value)
+        rent.append(rent[month - 1] * (1 + params.monthly_inflation_rate / 100))
+        liquid_capital.append(what_left_from_last_installment)
+        if new_need_to_pay == 0:
+            end_month = month
+            total_capital.append(what_left_from_last_installment + new_property_value)
+            break
+        else:
+            total_capital.append(
+                what_left_from_last_installment + new_property_value - new_need_to_pay
+            )
+
+    if end_month is not None:
+        for month in range(end_month + 1, months_to_simulate):
+            corrected_monthly_savings = monthly_savings[month - 1] + rent[month - 1]
+            new_liquid_capital = (
+                corrected_monthly_savings + liquid_capital[month - 1]
+            ) * (1 + params.monthly_investment_return_rate / 100)
+            new_property_value = property_values[month - 1] * (
+                1 + params.monthly_property_value_increase_when_bought / 100
+            )
+            need_to_pay.append(0)
+            property_values.append(new_property_value)
+            rent.append(rent[month - 1] * (1 + params.monthly_inflation_rate / 100))
+            liquid_capital.append(new_liquid_capital)
+            total_capital.append(new_liquid_capital + new_property_value)
+
+    return np.array(need_to_pay), np.array(total_capital), end_month
+
+
+@pytest.mark.parametrize(
+    "tax, installments, months, rent",
+    list(
+        itertools.product([0.5, 0.91, 1.5], [60, 270, 420], [1, 2, 150, 600], [0, 1000])
+    ),
+)
+def test_schedule_matches_reference_loop(tax, installments, months, rent):
+    params = PropertyParams(
+        property_value=500_000,
+        available_cash=100_000,
+        # Above the largest first installment of the grid (about 10_157)
+        initial_monthly_saving=10_500,
+        monthly_inflation_rate=0.4,
+        monthly_investment_return_rate=0.8,
+        monthly_property_value_increase=0.5,
+        monthly_property_value_increase_when_bought=0.4,
+        months_to_simulate=months,
+    )
+    financing = FinancingParams(installments, tax, rent, 12 if rent else 0)
+
+    result = simulate_property_purchase_financed(params, financing)
+    assert result.affordable
+    need_to_pay, total_capital, end_month = reference_financed(params, financing)
+
+    assert result.end_month == end_month
+    np.testing.assert_allclose(result.need_to_pay, need_to_pay, rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(result.total_capital, total_capital, rtol=1e-9)
+
+
+def test_prepay_pays_whole_installments_from_the_end():
+    schedule = InstallmentSchedule(100.0, 4, 0.0)
+    assert schedule.outstanding() == pytest.approx(400)
+    assert schedule.pay_due() == pytest.approx(100)
+    # 250 pays the last two installments and leaves 50
+    assert schedule.prepay(250.0) == pytest.approx(50)
+    assert schedule.outstanding() == pytest.approx(100)
+    schedule.correct()
+    assert schedule.outstanding() == pytest.approx(100)
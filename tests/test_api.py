@@ -0,0 +1,199 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+
+from finances import cache
+from finances.api import RequestError, SimulationServer, params_from
+from finances.business import BusinessParams, simulate_business
+from finances.property import (
+    MAX_INSTALLMENTS,
+    MAX_MONTHS_TO_SIMULATE,
+    FinancingParams,
+    PropertyParams,
+)
+from finances.retirement import MAX_YEARS_TO_RETIRE, SavingsRateParams
+
+PROPERTY = {
+    "property_value": 500_000,
+    "available_cash": 50_000,
+    "initial_monthly_saving": 3_000,
+    "monthly_inflation_rate": 0.4,
+    "monthly_investment_return_rate": 0.8,
+    "monthly_property_value_increase": 0.5,
+    "monthly_property_value_increase_when_bought": 0.4,
+    "months_to_simulate": 120,
+}
+FINANCING = {"number_of_installments": 270, "tax": 0.91}
+RETIREMENT = {
+    "current_capital": 0,
+    "monthly_inflation_rate": 0.41,
+    "monthly_investment_return_rate": 1.0,
+    "wanted_buy_power": 10_000,
+    "time_to_retire": 20,
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_caches(monkeypatch):
+    monkeypatch.delenv("FINANCES_STORE", raising=False)
+    cache.clear_caches()
+    yield
+    cache.clear_caches()
+
+
+@pytest.fixture
+def server():
+    with ThreadPoolExecutor(2) as executor:
+        yield SimulationServer(executor, max_pending=2)
+
+
+def request(server, path, payload=None, method="POST"):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    return asyncio.run(server.respond(method, path, body))
+
+
+def test_params_from_coerces_and_keeps_extra_keys():
+    params, extra = params_from(
+        PropertyParams,
+        {**PROPERTY, "months_to_simulate": 60.0, "financing": FINANCING},
+        extra=("financing",),
+    )
+    assert params.months_to_simulate == 60
+    assert isinstance(params.months_to_simulate, int)
+    assert params.rates is None
+    assert extra == {"financing": FINANCING}
+
+
+@pytest.mark.parametrize(
+    "payload, message",
+    [
+        ({**PROPERTY, "foo": 1}, "desconhecidos"),
+        ({**PROPERTY, "months_to_simulate": 1.5}, "inteiro"),
+        ({**PROPERTY, "property_value": "muito"}, "número"),
+        ({**PROPERTY, "property_value": True}, "número"),
+        ({**PROPERTY, "property_value": float("inf")}, "finito"),
+        ({**PROPERTY, "historical_rates": 1}, "true ou false"),
+        ({"property_value": 1}, "obrigatórios"),
+    ],
+)
+def test_params_from_rejects_invalid_fields(payload, message):
+    with pytest.raises(RequestError, match=message):
+        params_from(PropertyParams, payload)
+
+
+@pytest.mark.parametrize(
+    "cls, payload",
+    [
+        (PropertyParams, {**PROPERTY, "months_to_simulate": 0}),
+        (
+            PropertyParams,
+            {**PROPERTY, "months_to_simulate": MAX_MONTHS_TO_SIMULATE + 1},
+        ),
+        (FinancingParams, {**FINANCING, "number_of_installments": 0}),
+        (
+            FinancingParams,
+            {**FINANCING, "number_of_installments": MAX_INSTALLMENTS + 1},
+        ),
+        (FinancingParams, {**FINANCING, "tax": 0}),
+        (FinancingParams, {**FINANCING, "down_payment_fraction": 1.5}),
+        (BusinessParams, {"ano_fim": 10**6}),
+        (BusinessParams, {"probabilidade_sucesso": 0}),
+        (
+            SavingsRateParams,
+            {
+                "monthly_inflation_rate": 0.41,
+                "monthly_investment_return_rate": 1.0,
+                "max_months": MAX_YEARS_TO_RETIRE * 12 + 1,
+            },
+        ),
+    ],
+)
+def test_params_from_enforces_the_page_limits(cls, payload):
+    with pytest.raises(RequestError) as error:
+        params_from(cls, payload)
+    assert error.value.status == HTTPStatus.BAD_REQUEST
+
+
+def test_params_from_accepts_the_limits():
+    params, _ = params_from(
+        PropertyParams, {**PROPERTY, "months_to_simulate": MAX_MONTHS_TO_SIMULATE}
+    )
+    assert params.months_to_simulate == MAX_MONTHS_TO_SIMULATE
+
+
+def test_business_get_matches_the_kernel(server):
+    response = request(server, "/business?valuation=30000000&prob=25", method="GET")
+    expected = simulate_business(
+        BusinessParams(valuation_saida=30_000_000, probabilidade_sucesso=25)
+    )
+    assert response["multiplicador_real"] == expected.multiplicador_real
+    assert response["employee_total"] == expected.employee_total
+    assert (
+        request(server, "/business", {"valuation_saida": 30_000_000}, "POST")["detail"]
+        == request(server, "/business?valuation=30000000", method="GET")["detail"]
+    )
+
+
+def test_property_with_financing(server):
+    response = request(server, "/property", {**PROPERTY, "financing": FINANCING})
+    assert len(response["cash"]["series"]["total_capital"]) == 120
+    assert response["financed"]["affordable"] in (True, False)
+
+
+@pytest.mark.parametrize(
+    "path, payload",
+    [
+        ("/property", {**PROPERTY, "financing": {**FINANCING, "tax": 0}}),
+        ("/property", {**PROPERTY, "months_to_simulate": 10**9}),
+        ("/property", {**PROPERTY, "financing": [1]}),
+        ("/retirement", {**RETIREMENT, "time_to_retire": 0}),
+        ("/retirement", {**RETIREMENT, "time_to_retire": 10**6}),
+        ("/retirement", {"current_capital": 0}),
+        ("/business", {"ano_inicio": 5, "ano_fim": 3}),
+    ],
+)
+def test_invalid_requests_are_bad_requests(server, path, payload):
+    with pytest.raises(RequestError) as error:
+        request(server, path, payload)
+    assert error.value.status == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.parametrize(
+    "path, method, status",
+    [
+        ("/nope", "POST", HTTPStatus.NOT_FOUND),
+        ("/business", "PUT", HTTPStatus.METHOD_NOT_ALLOWED),
+        ("/business?foo=1", "GET", HTTPStatus.BAD_REQUEST),
+    ],
+)
+def test_routing_errors(server, path, method, status):
+    with pytest.raises(RequestError) as error:
+        request(server, path, method=method)
+    assert error.value.status == status
+
+
+def test_identical_requests_share_one_simulation(server):
+    release = threading.Event()
+
+    def slow(value):
+        release.wait(10)
+        return {"value": value}
+
+    async def scenario():
+        waiting = [asyncio.ensure_future(server.simulate(slow, (1,))) for _ in range(4)]
+        waiting.append(asyncio.ensure_future(server.simulate(slow, (2,))))
+        await asyncio.sleep(0.05)
+        # max_pending different simulations are running
+        with pytest.raises(RequestError) as busy:
+            await server.simulate(slow, (3,))
+        release.set()
+        return await asyncio.gather(*waiting), busy.value
+
+    results, busy = asyncio.run(scenario())
+    assert results == [{"value": 1}] * 4 + [{"value": 2}]
+    assert busy.status == HTTPStatus.SERVICE_UNAVAILABLE
+    assert server.stats.coalesced == 3
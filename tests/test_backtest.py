@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from finances import backtest
+from finances.backtest import (
+    BacktestParams,
+    backtest_months_to_retire,
+    backtest_required_savings,
+)
+from finances.rates import RateSchedule
+from finances.retirement import (
+    MAX_YEARS_TO_RETIRE,
+    RetirementParams,
+    simulate_retirement_surface,
+    solve_months_to_retire,
+)
+
+N = 240
+rng = np.random.default_rng(4)
+INFLATION = rng.uniform(0.2, 0.7, N)
+INVESTMENT_RETURN = rng.uniform(0.8, 2.0, N)
+SCHEDULE = RateSchedule.from_rates(INFLATION, INVESTMENT_RETURN, np.zeros(N))
+
+
+def rotated(start: int) -> RateSchedule:
+    """A schedule whose first month is month `start` of SCHEDULE."""
+    return RateSchedule.from_rates(
+        np.roll(INFLATION, -start), np.roll(INVESTMENT_RETURN, -start), np.zeros(N)
+    )
+
+
+@pytest.mark.parametrize("wrap", [True, False])
+@pytest.mark.parametrize("months", [1, 30, N, 500])
+def test_required_savings_match_the_rotated_schedules(wrap, months):
+    result = backtest_required_savings(
+        BacktestParams(SCHEDULE, wrap), 8_000, 20_000, months
+    )
+    expected_starts = N if wrap else max(N - months + 1, 0)
+    np.testing.assert_array_equal(result.starts, np.arange(expected_starts))
+    for start, saving, salary in zip(
+        result.starts, result.monthly_savings, result.future_salary
+    ):
+        surface = simulate_retirement_surface(
+            RetirementParams(20_000, 0, 0, rotated(start)), [8_000], [months]
+        )
+        np.testing.assert_allclose(saving, surface.monthly_savings[0, 0], rtol=1e-9)
+        np.testing.assert_allclose(salary, surface.future_salary[0, 0], rtol=1e-9)
+
+
+@pytest.mark.parametrize("wrap", [True, False])
+@pytest.mark.parametrize("increasing_savings", [False, True])
+@pytest.mark.parametrize("savings_rate", [0.2, 0.5, 0.9])
+def test_months_to_retire_match_the_rotated_schedules(
+    wrap, increasing_savings, savings_rate, monkeypatch
+):
+    # Several blocks of starts, the last one partial
+    monkeypatch.setattr(backtest, "_BLOCK_CELLS", 7 * 400)
+    result = backtest_months_to_retire(
+        BacktestParams(SCHEDULE, wrap), savings_rate, increasing_savings, 400
+    )
+    np.testing.assert_array_equal(result.starts, np.arange(N))
+    for start, months in zip(result.starts, result.months_to_retire):
+        expected = solve_months_to_retire(
+            savings_rate,
+            0,
+            0,
+            increasing_savings,
+            # Without wrap the window ends with the series
+            max_months=400 if wrap else N - start,
+            rates=rotated(start),
+        )
+        np.testing.assert_array_equal(months, expected)
+    assert np.isfinite(result.months_to_retire).any()
+
+
+@pytest.mark.parametrize("max_months", [0, MAX_YEARS_TO_RETIRE * 12 + 1])
+def test_horizon_outside_the_limits(max_months):
+    with pytest.raises(ValueError, match="max_months"):
+        backtest_months_to_retire(BacktestParams(SCHEDULE), 0.3, max_months=max_months)
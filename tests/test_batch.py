@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from finances.batch import RESULT_COLUMNS, run_batch
+from finances.business import BusinessParams, simulate_business
+
+
+@pytest.fixture
+def scenarios(tmp_path):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(
+        {
+            "valuation": rng.uniform(1e6, 5e7, 250),
+            "prob": rng.uniform(5, 60, 250),
+            "ano_fim": rng.integers(1, 10, 250),
+        }
+    )
+    path = tmp_path / "cenarios.csv"
+    frame.to_csv(path, index=False)
+    return frame, path
+
+
+@pytest.mark.parametrize("extension", ["csv", "parquet"])
+def test_workers_write_the_same_rows_in_order(scenarios, tmp_path, extension):
+    frame, path = scenarios
+    outputs = []
+    for workers in (1, 2):
+        output = tmp_path / f"resultados_{workers}.{extension}"
+        assert run_batch(str(path), str(output), chunk_size=64, workers=workers) == 250
+        read = pd.read_csv if extension == "csv" else pd.read_parquet
+        outputs.append(read(output))
+
+    pd.testing.assert_frame_equal(outputs[0], outputs[1])
+    assert list(outputs[0].columns) == list(frame.columns) + RESULT_COLUMNS
+    np.testing.assert_allclose(outputs[0]["valuation"], frame["valuation"], rtol=1e-15)
+    # ano_fim <= ano_inicio (default 2) gives NaN instead of failing the batch
+    invalid = frame["ano_fim"] <= 2
+    assert outputs[0].loc[invalid, RESULT_COLUMNS].isna().all().all()
+    # breakeven_year is NaN when the business never pays back
+    totals = [name for name in RESULT_COLUMNS if name != "breakeven_year"]
+    assert outputs[0].loc[~invalid, totals].notna().all().all()
+
+
+def test_rows_match_simulate_business(scenarios, tmp_path):
+    frame, path = scenarios
+    output = tmp_path / "resultados.csv"
+    run_batch(str(path), str(output), chunk_size=64, workers=1)
+    results = pd.read_csv(output, float_precision="round_trip")
+    # Valid rows from the first, second, third and last chunks
+    for row in (3, 64, 130, 249):
+        scenario = frame.iloc[row]
+        expected = simulate_business(
+            BusinessParams(
+                ano_fim=int(scenario["ano_fim"]),
+                valuation_saida=scenario["valuation"],
+                probabilidade_sucesso=scenario["prob"],
+            )
+        )
+        for name in RESULT_COLUMNS:
+            value = getattr(expected, name)
+            if name == "breakeven_year" and value is None:
+                value = np.nan
+            np.testing.assert_allclose(
+                results.loc[row, name], value, rtol=1e-12, err_msg=f"{row} {name}"
+            )
@@ -0,0 +1,56 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from finances import cache
+from finances.property import PropertyParams
+from finances.retirement import RetirementParams
+
+PARAMS = PropertyParams(
+    property_value=500_000,
+    available_cash=50_000,
+    initial_monthly_saving=3_000,
+    monthly_inflation_rate=0.4,
+    monthly_investment_return_rate=0.8,
+    monthly_property_value_increase=0.5,
+    monthly_property_value_increase_when_bought=0.4,
+    months_to_simulate=120,
+)
+RETIREMENT = RetirementParams(0, 0.41, 0.8)
+
+
+@pytest.fixture(autouse=True)
+def empty_caches(monkeypatch):
+    monkeypatch.delenv("FINANCES_STORE", raising=False)
+    cache.clear_caches()
+    yield
+    cache.clear_caches()
+
+
+def test_cached_results_are_read_only():
+    result = cache.simulate_retirement_grid(RETIREMENT, [5_000, 10_000], [10, 20])
+    assert (
+        cache.simulate_retirement_grid(RETIREMENT, [5_000, 10_000], [10, 20]) is result
+    )
+    arrays = [
+        getattr(result, f.name)
+        for f in dataclasses.fields(result)
+        if isinstance(getattr(result, f.name), np.ndarray)
+    ]
+    assert arrays
+    for array in arrays:
+        with pytest.raises(ValueError):
+            array.flat[0] = 0
+
+
+def test_horizon_views_are_read_only_and_the_checkpoint_still_grows():
+    short = cache.simulate_property_purchase(PARAMS)
+    with pytest.raises(ValueError):
+        short.total_capital[0] = 0
+    longer = cache.simulate_property_purchase(
+        dataclasses.replace(PARAMS, months_to_simulate=240)
+    )
+    assert longer.months == 240
+    # Views handed out before the extension still hold the same values
+    np.testing.assert_array_equal(short.total_capital, longer.total_capital[:120])
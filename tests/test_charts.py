@@ -0,0 +1,25 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from charts import GRID_CELL_BUDGET, prepare_figure
+
+
+def test_contour_grid_is_decimated_to_the_budget():
+    x = np.arange(1, 601) / 12
+    y = np.linspace(1000, 50000, 500)
+    fig = go.Figure(go.Contour(x=x, y=y, z=np.add.outer(y, x)))
+
+    trace = prepare_figure(fig, "grid").data[0]
+    z = np.asarray(trace.z)
+
+    assert z.size <= GRID_CELL_BUDGET
+    assert z.shape == (len(trace.y), len(trace.x))
+    # The kept cells are the original values at the kept coordinates
+    np.testing.assert_array_equal(z, np.add.outer(trace.y, trace.x))
+    assert trace.x[0] == x[0] and trace.x[-1] == x[-1]
+    assert trace.y[0] == y[0] and trace.y[-1] == y[-1]
+
+
+def test_small_grid_is_untouched():
+    fig = go.Figure(go.Heatmap(z=np.ones((10, 10))))
+    assert prepare_figure(fig, "grid") is fig
@@ -0,0 +1,89 @@
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+from charts import WEBGL_THRESHOLD, prepare_figure
+from finances.downsample import downsample_indices, lttb_indices
+
+
+def reference_lttb(x, y, n_out):
+    """LTTB ponto a ponto, com os mesmos baldes de lttb_indices."""
+    n = len(x)
+    edges = [int(e) for e in np.linspace(1, n - 1, n_out - 1)]
+    selected, a = [0], 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 1 < n_out - 2:
+            following = range(edges[bucket + 1], edges[bucket + 2])
+            avg_x = sum(x[i] for i in following) / len(following)
+            avg_y = sum(y[i] for i in following) / len(following)
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        best, best_area = start, -1.0
+        for i in range(start, end):
+            area = abs((x[a] - avg_x) * (y[i] - y[a]) - (x[a] - x[i]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = i, area
+        selected.append(best)
+        a = best
+    return selected + [n - 1]
+
+
+@pytest.mark.parametrize("n, n_out", [(10, 3), (1000, 50), (1237, 101), (5000, 999)])
+def test_matches_the_pointwise_algorithm(n, n_out):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0, 100, n))
+    y = np.cumsum(rng.normal(size=n))
+    assert lttb_indices(x, y, n_out).tolist() == reference_lttb(x, y, n_out)
+
+
+def test_keeps_the_endpoints_and_the_spike():
+    y = np.zeros(10_000)
+    y[4321] = 1.0
+    indices = lttb_indices(np.arange(10_000), y, 100)
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 9_999
+    assert np.all(np.diff(indices) > 0)
+    assert 4321 in indices
+
+
+def test_short_series_are_kept_whole():
+    np.testing.assert_array_equal(lttb_indices([0, 1, 2], [1, 2, 3], 10), [0, 1, 2])
+
+
+def test_nan_does_not_win_the_buckets():
+    y = np.sin(np.linspace(0, 10, 2000))
+    y[500:900] = np.nan
+    indices = lttb_indices(np.arange(2000), y, 200)
+    assert len(indices) == 200
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_shared_series_keep_extremes_and_events():
+    x = np.arange(20_000)
+    rising = np.linspace(0, 1, 20_000)
+    wave = np.sin(x / 700)
+    indices = downsample_indices(x, [rising, wave], 500, keep=[12_345])
+    assert len(indices) <= 500 + 5
+    assert {0, 19_999, 12_345, int(np.argmin(wave)), int(np.argmax(wave))} <= set(
+        indices.tolist()
+    )
+    np.testing.assert_array_equal(
+        downsample_indices(x[:400], [wave[:400]], 500), np.arange(400)
+    )
+
+
+def test_lines_with_the_same_x_stay_aligned():
+    x = np.arange(1, 50_001)
+    fig = go.Figure(
+        [
+            go.Scatter(x=x, y=np.log(x)),
+            go.Scatter(x=x, y=np.sqrt(x), fill="tonexty"),
+        ]
+    )
+    prepared = prepare_figure(fig, "lines", events=[30_000], budget=800)
+    first, second = prepared.data
+    np.testing.assert_array_equal(first.x, second.x)
+    assert 30_000 in first.x
+    assert len(first.x) < WEBGL_THRESHOLD
+    np.testing.assert_array_equal(first.y, np.log(first.x))
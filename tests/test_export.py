@@ -0,0 +1,130 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from finances import cache
+from finances.business import BusinessParams, simulate_business
+from finances.export import export_bytes, iter_chunks, iter_rows, main, property_columns
+from finances.property import (
+    FinancingParams,
+    PropertyParams,
+    simulate_property_purchase,
+    simulate_property_purchase_financed,
+)
+
+PARAMS = PropertyParams(
+    property_value=500_000,
+    available_cash=50_000,
+    initial_monthly_saving=6_000,
+    monthly_inflation_rate=0.4,
+    monthly_investment_return_rate=0.8,
+    monthly_property_value_increase=0.5,
+    monthly_property_value_increase_when_bought=0.4,
+    months_to_simulate=120,
+)
+FINANCING = FinancingParams(270, 0.91)
+
+
+@pytest.fixture(autouse=True)
+def empty_caches(monkeypatch):
+    monkeypatch.delenv("FINANCES_STORE", raising=False)
+    cache.clear_caches()
+    yield
+    cache.clear_caches()
+
+
+def read(data: bytes, fmt: str) -> pd.DataFrame:
+    if fmt == "csv":
+        return pd.read_csv(io.BytesIO(data), float_precision="round_trip")
+    return pd.read_parquet(io.BytesIO(data))
+
+
+def test_property_columns_are_views_of_the_results():
+    cash = simulate_property_purchase(PARAMS)
+    financed = simulate_property_purchase_financed(PARAMS, FINANCING)
+    columns = property_columns(cash, financed)
+    assert list(columns) == [
+        "month",
+        "cash_savings",
+        "cash_property_values",
+        "cash_total_capital",
+        "financed_need_to_pay",
+        "financed_property_values",
+        "financed_total_capital",
+    ]
+    assert columns["cash_savings"] is cash.savings
+    np.testing.assert_array_equal(columns["month"], np.arange(1, 121))
+
+
+def test_unaffordable_financing_is_left_out():
+    poor = PropertyParams(10_000_000, 0, 100, 0.4, 0.8, 0.5, 0.4, 12)
+    financed = simulate_property_purchase_financed(poor, FINANCING)
+    assert not financed.affordable
+    columns = property_columns(simulate_property_purchase(poor), financed)
+    assert not any(name.startswith("financed_") for name in columns)
+
+
+def test_chunks_cover_every_row_in_order():
+    columns = {"a": np.arange(10), "b": np.arange(10) * 2.0}
+    chunks = list(iter_chunks(columns, chunk_rows=4))
+    assert [len(chunk["a"]) for chunk in chunks] == [4, 4, 2]
+    assert list(iter_rows(columns, chunk_rows=4)) == [(i, i * 2.0) for i in range(10)]
+
+
+def test_nan_becomes_none():
+    rows = list(iter_rows({"a": np.array([1.0, np.nan])}))
+    assert rows == [(1.0,), (None,)]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_export_keeps_the_raw_values(fmt):
+    columns = simulate_business(BusinessParams()).detail_columns()
+    frame = read(export_bytes(columns, fmt), fmt)
+    assert list(frame.columns) == list(columns)
+    for name, series in columns.items():
+        np.testing.assert_array_equal(frame[name].to_numpy(), series)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_missing_values_round_trip(fmt):
+    columns = {"month": np.arange(1, 4), "value": np.array([1.5, np.nan, 3.0])}
+    frame = read(export_bytes(columns, fmt), fmt)
+    assert frame["value"].isna().tolist() == [False, True, False]
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError, match="Formato"):
+        export_bytes({"a": np.arange(3)}, "xlsx")
+
+
+def test_cli_writes_the_property_series(tmp_path):
+    payload = tmp_path / "params.json"
+    payload.write_text(
+        json.dumps(
+            {
+                **{
+                    name: getattr(PARAMS, name)
+                    for name in PARAMS.__dataclass_fields__
+                    if name != "rates"
+                },
+                "financing": {"number_of_installments": 270, "tax": 0.91},
+            }
+        )
+    )
+    output = tmp_path / "imovel.parquet"
+    assert main(["property", str(payload), "-o", str(output), "--chunk-rows", "7"]) == 0
+    frame = pd.read_parquet(output)
+    assert len(frame) == 120
+    np.testing.assert_array_equal(
+        frame["cash_total_capital"], simulate_property_purchase(PARAMS).total_capital
+    )
+
+
+def test_cli_rejects_parameters_outside_the_limits(tmp_path, capsys):
+    payload = tmp_path / "params.json"
+    payload.write_text(json.dumps({"ano_fim": 100}))
+    assert main(["business", str(payload), "-o", str(tmp_path / "anos.csv")]) == 1
+    assert "ano_fim" in capsys.readouterr().err
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from finances.formatting import brl, brl_array
+
+
+@pytest.mark.parametrize(
+    "value, text",
+    [
+        (0, "R$ 0,00"),
+        (1234.56, "R$ 1.234,56"),
+        (-1234.5, "-R$ 1.234,50"),
+        (999.999, "R$ 1.000,00"),
+        (-0.001, "R$ 0,00"),
+        (1e15, "R$ 1.000.000.000.000.000,00"),
+    ],
+)
+def test_brl(value, text):
+    assert brl(value) == text
+
+
+def test_values_beyond_int64_cents_are_formatted_exactly():
+    values = np.array([1.0, 1e17, -2.5e20, np.nan, np.inf])
+    assert brl_array(values).tolist() == [
+        "R$ 1,00",
+        "R$ 100.000.000.000.000.000,00",
+        "-R$ 250.000.000.000.000.000.000,00",
+        "—",
+        "—",
+    ]
+
+
+def test_array_formatting():
+    values = np.array(
+        [
+            [0.125, 0.375, 2.675, 1.005],
+            [-2.625, -0.005, -1_234_567.891, -0.0],
+            [9.5e13, -4.5e15, 1e17 + 16, 12_345.675],
+        ]
+    )
+    # Half cents round to even on the stored binary value, as "%.2f" does
+    assert brl_array(values).tolist() == [
+        ["R$ 0,12", "R$ 0,38", "R$ 2,67", "R$ 1,00"],
+        ["-R$ 2,62", "-R$ 0,01", "-R$ 1.234.567,89", "R$ 0,00"],
+        [
+            "R$ 95.000.000.000.000,00",
+            "-R$ 4.500.000.000.000.000,00",
+            "R$ 100.000.000.000.000.016,00",
+            "R$ 12.345,67",
+        ],
+    ]
+
+
+def test_markdown_escapes_the_dollar_sign():
+    assert brl(10, markdown=True) == "R\\$ 10,00"
@@ -0,0 +1,105 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from finances.business import BusinessParams, simulate_business
+from finances.goalseek import (
+    METHODS,
+    affordable_buy_power,
+    exit_valuation_for_multiple,
+    find_roots,
+    minimum_monthly_saving,
+)
+from finances.property import PropertyParams, simulate_property_purchase
+from finances.rates import historical_schedule
+from finances.retirement import RetirementParams, calculate_monthly_savings
+
+PROPERTY = PropertyParams(300_000, 100_000, 4_000, 0.41, 1.0, 0.8, 0.5, 150)
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_roots_of_a_monotone_function(method):
+    targets = np.array([[0.5, 8.0], [27.0, 1e6]])
+    result = find_roots(lambda x, rows: x**3, targets, 0.0, 1.0, method=method)
+    np.testing.assert_allclose(result.solutions, np.cbrt(targets), atol=1e-5)
+    assert result.converged.all()
+    assert result.solutions.shape == targets.shape
+
+
+def test_illinois_needs_fewer_evaluations_than_bisection():
+    targets = np.linspace(1, 100, 50)
+    evaluations = {
+        method: find_roots(
+            lambda x, rows: np.exp(x / 10), targets, 0.0, 100.0, method=method
+        ).evaluations
+        for method in METHODS
+    }
+    assert evaluations["illinois"] < evaluations["bisect"]
+
+
+def test_decreasing_functions_and_targets_reached_at_low():
+    result = find_roots(
+        lambda x, rows: 10 - x, [10.0, 12.0, 4.0], 0.0, 1.0, increasing=False
+    )
+    np.testing.assert_allclose(result.solutions, [0.0, 0.0, 6.0], atol=1e-5)
+
+
+def test_unreachable_targets_are_nan():
+    result = find_roots(
+        lambda x, rows: np.minimum(x, 5.0), [3.0, 7.0], 0.0, 1.0, max_expansions=10
+    )
+    assert result.converged.tolist() == [True, False]
+    assert np.isnan(result.solutions[1])
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError, match="Método"):
+        find_roots(lambda x, rows: x, [1.0], 0.0, 1.0, method="newton")
+
+
+@pytest.mark.parametrize("rates", [None, "historical"])
+def test_affordable_buy_power_inverts_the_monthly_savings(rates):
+    params = RetirementParams(
+        20_000, 0.41, 1.0, historical_schedule() if rates else None
+    )
+    savings, years = np.array([1_000.0, 3_000.0, 8_000.0]), np.array([10, 20, 35])
+    result = affordable_buy_power(params, savings, years)
+    assert result.converged.all()
+    required = [
+        calculate_monthly_savings(
+            power, year, 20_000, 0.41, 1.0, rates=params.rates
+        ).monthly_savings
+        for power, year in zip(result.solutions, years)
+    ]
+    np.testing.assert_allclose(required, savings, rtol=1e-4)
+
+
+def test_no_buy_power_when_returns_do_not_beat_inflation():
+    result = affordable_buy_power(RetirementParams(0, 1.0, 0.5), [3_000.0], [20])
+    assert np.isnan(result.solutions).all()
+
+
+def test_minimum_monthly_saving_is_the_smallest_that_buys_in_time():
+    months = np.array([60, 120, 240])
+    result = minimum_monthly_saving(PROPERTY, months)
+    for saving, horizon in zip(result.solutions, months):
+        in_time = dataclasses.replace(
+            PROPERTY, initial_monthly_saving=saving, months_to_simulate=horizon + 1
+        )
+        assert simulate_property_purchase(in_time).purchase_month <= horizon
+        late = dataclasses.replace(in_time, initial_monthly_saving=saving - 0.01)
+        month = simulate_property_purchase(late).purchase_month
+        assert month is None or month > horizon
+
+
+def test_exit_valuation_reaches_the_required_multiple():
+    params = BusinessParams()
+    result = exit_valuation_for_multiple(params)
+    assert result.converged.all()
+    reached = simulate_business(
+        dataclasses.replace(params, valuation_saida=float(result.solutions))
+    )
+    np.testing.assert_allclose(
+        reached.multiplicador_real, reached.multiplicador_requerido, rtol=1e-6
+    )
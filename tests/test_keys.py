@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+import numpy as np
+
+from finances.keys import normalize
+from finances.rates import historical_schedule
+from finances.retirement import RetirementParams
+from finances.timing import params_hash
+
+
+def test_equal_numbers_give_the_same_key():
+    assert normalize((1, [2, 3])) == normalize((1.0, np.array([2.0, 3.0])))
+    assert normalize({"b": 1, "a": 2}) == normalize({"a": 2.0, "b": 1.0})
+
+
+def test_dataclass_fields_without_compare_stay_out_of_the_key():
+    params = RetirementParams(0, 0.41, 0.8, rates=historical_schedule())
+    key = normalize(params)
+    hash(key)
+    # The schedule series are compare=False, so they are not in the key
+    assert "ndarray" not in repr(key)
+    assert params_hash(params) == params_hash(
+        RetirementParams(0.0, 0.41, 0.8, rates=historical_schedule())
+    )
+
+
+def test_timing_does_not_import_the_kernels_through_the_cache():
+    code = "import sys, finances.timing; print('finances.cache' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert output.stdout.strip() == "False"
@@ -0,0 +1,175 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from finances.business import BusinessParams, simulate_business
+from finances.montecarlo import (
+    BusinessMonteCarloParams,
+    LogHistogram,
+    PropertyMonteCarloParams,
+    _installment_bisect_left,
+    simulate_business_monte_carlo,
+    simulate_property_monte_carlo,
+)
+from finances.property import (
+    FinancingParams,
+    PropertyParams,
+    simulate_property_purchase,
+    simulate_property_purchase_financed,
+)
+from finances.rates import historical_schedule
+
+# Relative width of a LogHistogram bin with the default edges
+BIN_RTOL = 10 ** (13 / 2600) - 1
+
+STILL_BUSINESS = BusinessMonteCarloParams(
+    n_paths=1_000,
+    chunk_size=300,
+    revenue_volatility=0,
+    dilution_volatility=0,
+    multiple_volatility=0,
+    mean_liquidity_delay=0,
+    max_liquidity_delay=0,
+)
+
+PROPERTY = PropertyParams(300_000, 100_000, 4_000, 0.41, 1.0, 0.8, 0.5, 400)
+FINANCING = FinancingParams(
+    270, 0.91, current_rent=1_500, months_to_stop_paying_rent=12
+)
+STILL_PROPERTY = PropertyMonteCarloParams(
+    n_paths=4,
+    inflation_volatility=0,
+    investment_return_volatility=0,
+    property_value_volatility=0,
+)
+
+
+def month_or_nan(month: int | None) -> float:
+    return np.nan if month is None else month
+
+
+def test_histogram_percentiles_are_within_a_bin():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(12, 2, size=(50_000, 3))
+    histogram = LogHistogram(3)
+    for chunk in np.array_split(values, 7):
+        histogram.add(chunk)
+    percentiles = (1, 5, 50, 95, 99)
+    np.testing.assert_allclose(
+        histogram.quantiles(percentiles),
+        np.percentile(values, percentiles, axis=0),
+        rtol=BIN_RTOL,
+    )
+
+
+def test_histograms_merge_like_one():
+    rng = np.random.default_rng(1)
+    a, b = rng.lognormal(5, 1, 1_000), rng.lognormal(8, 1, 1_000)
+    whole, left, right = LogHistogram(1), LogHistogram(1), LogHistogram(1)
+    whole.add(np.concatenate([a, b]))
+    left.add(a)
+    right.add(b)
+    left.merge(right)
+    np.testing.assert_array_equal(left.counts, whole.counts)
+
+
+def test_business_runs_are_reproducible():
+    mc = BusinessMonteCarloParams(n_paths=5_000, chunk_size=1_000, seed=7)
+    first = simulate_business_monte_carlo(BusinessParams(), mc)
+    second = simulate_business_monte_carlo(BusinessParams(), mc)
+    np.testing.assert_array_equal(first.biz_total_bands, second.biz_total_bands)
+    assert first.prob_business_wins == second.prob_business_wins
+    other = simulate_business_monte_carlo(
+        BusinessParams(), dataclasses.replace(mc, seed=8)
+    )
+    assert not np.array_equal(first.biz_total_bands, other.biz_total_bands)
+
+
+def test_business_bands_are_ordered():
+    mc = BusinessMonteCarloParams(n_paths=20_000, chunk_size=6_000)
+    result = simulate_business_monte_carlo(BusinessParams(), mc)
+    assert result.biz_total_bands.shape == (5, len(result.years))
+    assert np.all(np.diff(result.biz_total_bands, axis=0) >= 0)
+    assert np.all(np.diff(result.multiplier_percentiles) >= 0)
+    assert 0 < result.prob_business_wins < 1
+
+
+def test_business_without_uncertainty_matches_the_deterministic_run():
+    params = BusinessParams(probabilidade_sucesso=100)
+    result = simulate_business_monte_carlo(params, STILL_BUSINESS)
+    expected = simulate_business(params)
+    np.testing.assert_allclose(
+        result.biz_total_bands[:, -1], expected.biz_success_total, rtol=BIN_RTOL
+    )
+    np.testing.assert_allclose(
+        result.emp_bands[:, -1], expected.employee_total, rtol=BIN_RTOL
+    )
+    np.testing.assert_allclose(
+        result.multiplier_percentiles, expected.multiplicador_real, rtol=BIN_RTOL
+    )
+    assert result.prob_business_wins == 1.0
+
+
+def test_business_rejects_an_empty_window():
+    with pytest.raises(ValueError):
+        simulate_business_monte_carlo(
+            BusinessParams(ano_inicio=5, ano_fim=5), STILL_BUSINESS
+        )
+
+
+@pytest.mark.parametrize("growth", [1.0091, 1.02])
+def test_installment_bisect_matches_searchsorted(growth):
+    first_value = 2_500.0
+    base = first_value / growth ** np.arange(1, 271)
+    prefix = np.concatenate(([0.0], np.cumsum(base)))
+    rng = np.random.default_rng(2)
+    # Exact prefix sums are the ties a closed form gets wrong by rounding
+    target = np.concatenate(
+        [rng.uniform(-10, prefix[-1] + 10, 5_000), prefix, prefix + 1e-9]
+    )
+    np.testing.assert_array_equal(
+        _installment_bisect_left(prefix, target, first_value, growth),
+        np.searchsorted(prefix, target),
+    )
+
+
+@pytest.mark.parametrize("rates", [None, "historical"])
+def test_property_without_uncertainty_matches_the_deterministic_runs(rates):
+    params = dataclasses.replace(
+        PROPERTY, rates=historical_schedule() if rates else None
+    )
+    result = simulate_property_monte_carlo(params, FINANCING, STILL_PROPERTY)
+    cash = simulate_property_purchase(params)
+    financed = simulate_property_purchase_financed(params, FINANCING)
+    for band in result.cash_total_capital_bands:
+        np.testing.assert_allclose(band, cash.total_capital, rtol=1e-12)
+    for band in result.financed_total_capital_bands:
+        np.testing.assert_allclose(band, financed.total_capital, rtol=1e-12)
+    np.testing.assert_array_equal(
+        result.purchase_months, month_or_nan(cash.purchase_month)
+    )
+    np.testing.assert_array_equal(
+        result.payoff_months, month_or_nan(financed.end_month)
+    )
+
+
+def test_property_bands_spread_with_uncertainty():
+    mc = PropertyMonteCarloParams(n_paths=2_000, seed=3)
+    result = simulate_property_monte_carlo(PROPERTY, FINANCING, mc)
+    for bands in (result.cash_total_capital_bands, result.financed_total_capital_bands):
+        assert bands.shape == (5, PROPERTY.months_to_simulate)
+        assert np.all(np.diff(bands, axis=0) >= 0)
+        assert bands[-1, -1] > bands[0, -1]
+    again = simulate_property_monte_carlo(PROPERTY, FINANCING, mc)
+    np.testing.assert_array_equal(
+        result.cash_total_capital_bands, again.cash_total_capital_bands
+    )
+
+
+def test_unaffordable_financing_has_no_bands():
+    poor = dataclasses.replace(PROPERTY, initial_monthly_saving=100)
+    result = simulate_property_monte_carlo(poor, FINANCING, STILL_PROPERTY)
+    assert not result.affordable
+    assert result.financed_total_capital_bands is None
+    assert result.payoff_months is None
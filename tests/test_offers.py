@@ -0,0 +1,190 @@
+import dataclasses
+import itertools
+
+import numpy as np
+import pytest
+
+from finances.offers import (
+    FinancingOffer,
+    amortization_schedules,
+    compare_offers,
+    offers_from_columns,
+)
+from finances.property import (
+    MAX_INSTALLMENTS,
+    FinancingParams,
+    PropertyParams,
+    down_payment_split,
+    monthly_growth,
+    simulate_property_purchase_financed,
+)
+from finances.rates import historical_schedule
+
+PARAMS = PropertyParams(300_000, 100_000, 4_000, 0.41, 1.0, 0.8, 0.5, 400)
+FINANCING = FinancingParams(
+    270, 0.91, current_rent=1_500, months_to_stop_paying_rent=12
+)
+TAXES = (0.0, 0.6, 0.91, 1.3)
+TERMS = (60, 180, 270, 420)
+
+
+def reference_offer(params, financing, offer, installments, cash):
+    """Uma oferta por vez, mês a mês, com as parcelas em aberto numa lista."""
+    growth = 1 + offer.tax / 100
+    values = [value / growth**k for k, value in enumerate(installments, start=1)]
+    first, end = 0, len(values)
+    factor = 1.0
+    insurance = offer.insurance_rate / 100
+    leftover = cash
+    need_to_pay = sum(values)
+    end_month = None
+    saving, rent = float(params.initial_monthly_saving), float(financing.current_rent)
+    property_value = float(params.property_value)
+    investment, inflation, _, appreciation = monthly_growth(
+        params, 0, params.months_to_simulate - 1
+    )
+    for month, investment_growth, inflation_growth, property_growth in zip(
+        range(1, params.months_to_simulate), investment, inflation, appreciation
+    ):
+        property_value *= property_growth
+        if end_month is None:
+            charges = insurance * need_to_pay + offer.monthly_fee
+            factor *= growth
+            available = saving + leftover
+            if month >= financing.months_to_stop_paying_rent:
+                available += rent
+            if first < end:
+                available -= values[first] * factor
+                first += 1
+            available -= charges
+            # Prepays from the last installment while the next one fits
+            while first < end and 0 < values[end - 1] * factor <= available:
+                available -= values[end - 1] * factor
+                end -= 1
+            leftover = available
+            need_to_pay = sum(values[first:end]) * factor
+            if first >= end:
+                end_month = month
+        else:
+            leftover = (saving + rent + leftover) * investment_growth
+        rent *= inflation_growth
+        saving *= inflation_growth
+    return end_month, leftover + property_value - need_to_pay
+
+
+def month_or_nan(month: int | None) -> float:
+    return np.nan if month is None else month
+
+
+@pytest.mark.parametrize("rates", [None, "historical"])
+@pytest.mark.parametrize("down_payment_fraction", [1.0, 0.5])
+@pytest.mark.parametrize("saving", [2_500, 6_000])
+def test_price_offers_match_the_financed_purchase(rates, down_payment_fraction, saving):
+    params = dataclasses.replace(
+        PARAMS,
+        initial_monthly_saving=saving,
+        rates=historical_schedule() if rates else None,
+    )
+    financing = dataclasses.replace(
+        FINANCING, down_payment_fraction=down_payment_fraction
+    )
+    offers = tuple(
+        FinancingOffer(f"{tax}/{n}", tax, n)
+        for tax, n in itertools.product(TAXES[1:], TERMS)
+    )
+    comparison = compare_offers(params, financing, offers)
+    for i, offer in enumerate(offers):
+        expected = simulate_property_purchase_financed(
+            params,
+            dataclasses.replace(
+                financing,
+                number_of_installments=offer.number_of_installments,
+                tax=offer.tax,
+            ),
+        )
+        assert comparison.affordable[i] == expected.affordable, offer.name
+        np.testing.assert_allclose(
+            comparison.first_payment[i], expected.first_installment_value, rtol=1e-12
+        )
+        if not expected.affordable:
+            assert np.isnan(comparison.end_month[i])
+            continue
+        np.testing.assert_array_equal(
+            comparison.end_month[i], month_or_nan(expected.end_month), offer.name
+        )
+        np.testing.assert_allclose(
+            comparison.final_total_capital[i],
+            expected.total_capital[-1],
+            rtol=1e-9,
+            err_msg=offer.name,
+        )
+    assert comparison.affordable.any()
+
+
+@pytest.mark.parametrize("system", ["price", "sac"])
+def test_offers_with_charges_match_one_at_a_time(system):
+    offers = tuple(
+        FinancingOffer(
+            f"{tax}/{n}",
+            tax,
+            n,
+            system,
+            insurance_rate=0.03,
+            monthly_fee=25.0,
+            upfront_fees=2_000.0,
+        )
+        for tax, n in itertools.product(TAXES, TERMS)
+    )
+    financing = dataclasses.replace(FINANCING, down_payment_fraction=0.8)
+    params = dataclasses.replace(PARAMS, initial_monthly_saving=6_000)
+    comparison = compare_offers(params, financing, offers)
+    financed_value, remaining_cash = down_payment_split(params, financing)
+    assert comparison.affordable.any()
+    for i, offer in enumerate(offers):
+        schedule = amortization_schedules(
+            financed_value,
+            [offer.tax],
+            [offer.number_of_installments],
+            [system == "sac"],
+        )
+        installments = schedule.installments[0]
+        np.testing.assert_allclose(
+            comparison.total_interest[i],
+            installments.sum() - financed_value,
+            atol=1e-6,
+        )
+        if not comparison.affordable[i]:
+            continue
+        end_month, capital = reference_offer(
+            params, financing, offer, installments, remaining_cash - offer.upfront_fees
+        )
+        np.testing.assert_array_equal(
+            comparison.end_month[i], month_or_nan(end_month), offer.name
+        )
+        np.testing.assert_allclose(
+            comparison.final_total_capital[i], capital, rtol=1e-9, err_msg=offer.name
+        )
+
+
+def test_sac_amortizes_equal_parts():
+    schedule = amortization_schedules(120_000, [1.0], [120], [True])
+    balances = schedule.balances[0]
+    np.testing.assert_allclose(np.diff(balances), -1_000)
+    np.testing.assert_allclose(
+        schedule.installments[0], 1_000 + 0.01 * balances, rtol=1e-12
+    )
+
+
+@pytest.mark.parametrize(
+    "parcelas, message",
+    [(360.7, "inteiro"), (0, "entre 1"), (MAX_INSTALLMENTS + 1, "entre 1")],
+)
+def test_installments_must_be_whole_and_within_the_limits(parcelas, message):
+    columns = {"banco": ["A"], "taxa_mensal": [0.9], "parcelas": [parcelas]}
+    with pytest.raises(ValueError, match=message):
+        compare_offers(PARAMS, FINANCING, offers_from_columns(columns))
+
+
+def test_negative_tax_is_rejected():
+    with pytest.raises(ValueError, match="taxa"):
+        compare_offers(PARAMS, FINANCING, (FinancingOffer("A", -0.1, 120),))
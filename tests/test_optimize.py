@@ -0,0 +1,102 @@
+import dataclasses
+import itertools
+
+import numpy as np
+import pytest
+
+from finances.amortization import first_installment_value
+from finances.optimize import (
+    DOWN_PAYMENT_UNITS,
+    FinancingSearchSpace,
+    _score,
+    _simulate,
+    optimize_financing,
+    simulate_payoff_heatmap,
+)
+from finances.property import (
+    FinancingParams,
+    PropertyParams,
+    down_payment_split,
+    simulate_property_purchase_financed,
+)
+
+PARAMS = PropertyParams(300_000, 100_000, 4_500, 0.41, 1.0, 0.8, 0.5, 240)
+SPACE = FinancingSearchSpace(
+    min_installments=60,
+    max_installments=96,
+    installments_step=12,
+    down_payment_step=8,
+    min_down_payment_fraction=0.5,
+)
+
+
+def exhaustive_scores(objective, financing):
+    """Score de cada contrato que cabe na poupança, do melhor para o pior."""
+    rent_months = financing.months_to_stop_paying_rent if financing.current_rent else 0
+    scores = []
+    for installments, units, months in itertools.product(
+        range(SPACE.min_installments, SPACE.max_installments + 1),
+        range(DOWN_PAYMENT_UNITS // 2, DOWN_PAYMENT_UNITS + 1),
+        range(rent_months + 1),
+    ):
+        candidate = dataclasses.replace(
+            financing,
+            number_of_installments=installments,
+            down_payment_fraction=units / DOWN_PAYMENT_UNITS,
+            months_to_stop_paying_rent=months,
+        )
+        financed_value, _ = down_payment_split(PARAMS, candidate)
+        first = first_installment_value(financed_value, installments, candidate.tax)
+        if first <= PARAMS.initial_monthly_saving:
+            scores.append(_score(objective, *_simulate((PARAMS, candidate))))
+    return sorted(scores)
+
+
+@pytest.mark.parametrize("objective", ["payoff", "capital"])
+@pytest.mark.parametrize("rent", [0, 1_500])
+def test_optimizer_finds_the_exhaustive_optimum(objective, rent):
+    financing = FinancingParams(
+        100, 0.91, current_rent=rent, months_to_stop_paying_rent=4 if rent else 0
+    )
+    optimization = optimize_financing(
+        PARAMS, financing, objective, SPACE, top_k=3, parallel=False
+    )
+    # Contracts that tie (e.g. stopping the rent at month 0 or 1) score the same,
+    # so the scores are compared rather than the contracts
+    found = [
+        _score(objective, *_simulate((PARAMS, candidate.financing)))
+        for candidate in optimization.ranking
+    ]
+    exhaustive = exhaustive_scores(objective, financing)
+    assert found == exhaustive[: len(found)]
+    assert len(found) == 3
+    assert optimization.evaluated < len(exhaustive)
+
+
+def test_nothing_affordable_gives_an_empty_ranking():
+    poor = dataclasses.replace(PARAMS, initial_monthly_saving=100)
+    optimization = optimize_financing(
+        poor, FinancingParams(100, 0.91), space=SPACE, parallel=False
+    )
+    assert optimization.best is None
+    assert optimization.evaluated == 0
+
+
+def test_payoff_heatmap_matches_each_contract():
+    installments, taxes = [60, 120, 240, 360], [0.5, 0.91, 1.4]
+    financing = FinancingParams(100, 0.91, down_payment_fraction=0.7)
+    heatmap = simulate_payoff_heatmap(
+        PARAMS, financing, installments, taxes, parallel=False
+    )
+    assert heatmap.end_month.shape == (len(taxes), len(installments))
+    for (row, tax), (column, n) in itertools.product(
+        enumerate(taxes), enumerate(installments)
+    ):
+        expected = simulate_property_purchase_financed(
+            PARAMS, dataclasses.replace(financing, number_of_installments=n, tax=tax)
+        )
+        payoff = expected.end_month if expected.affordable else None
+        np.testing.assert_array_equal(
+            heatmap.end_month[row, column], np.nan if payoff is None else payoff
+        )
+    assert np.isnan(heatmap.end_month).any() and np.isfinite(heatmap.end_month).any()
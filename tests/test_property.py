@@ -0,0 +1,124 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from finances import cache
+from finances.property import (
+    FinancingParams,
+    PropertyParams,
+    extend_property_purchase,
+    extend_property_purchase_financed,
+    simulate_monthly_savings,
+    simulate_property_purchase,
+    simulate_property_purchase_financed,
+)
+from finances.rates import historical_schedule
+
+PARAMS = PropertyParams(
+    property_value=300_000,
+    available_cash=100_000,
+    initial_monthly_saving=4_000,
+    monthly_inflation_rate=0.41,
+    monthly_investment_return_rate=1.0,
+    monthly_property_value_increase=0.8,
+    monthly_property_value_increase_when_bought=0.5,
+    months_to_simulate=150,
+)
+FINANCING = FinancingParams(
+    270, 0.91, current_rent=1_500, months_to_stop_paying_rent=12
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_caches(monkeypatch):
+    monkeypatch.delenv("FINANCES_STORE", raising=False)
+    cache.clear_caches()
+    yield
+    cache.clear_caches()
+
+
+def with_months(params: PropertyParams, months: int) -> PropertyParams:
+    return dataclasses.replace(params, months_to_simulate=months)
+
+
+def assert_same_result(result, expected):
+    for f in dataclasses.fields(expected):
+        if not f.compare:
+            continue
+        value, wanted = getattr(result, f.name), getattr(expected, f.name)
+        if isinstance(wanted, np.ndarray):
+            np.testing.assert_array_equal(value, wanted, err_msg=f.name)
+        else:
+            assert value == wanted, f.name
+
+
+@pytest.mark.parametrize("rates", [None, "historical"])
+def test_extending_the_cash_purchase_matches_a_full_run(rates):
+    params = dataclasses.replace(PARAMS, rates=historical_schedule() if rates else None)
+    result = simulate_property_purchase(with_months(params, 10))
+    for months in (11, 57, 400, 1200):
+        extend_property_purchase(with_months(params, months), result)
+        assert_same_result(
+            result, simulate_property_purchase(with_months(params, months))
+        )
+
+
+@pytest.mark.parametrize("down_payment_fraction", [1.0, 0.5])
+def test_extending_the_financed_purchase_matches_a_full_run(down_payment_fraction):
+    financing = dataclasses.replace(
+        FINANCING, down_payment_fraction=down_payment_fraction
+    )
+    result = simulate_property_purchase_financed(with_months(PARAMS, 5), financing)
+    for months in (6, 13, 200, 600):
+        extend_property_purchase_financed(
+            with_months(PARAMS, months), financing, result
+        )
+        assert_same_result(
+            result,
+            simulate_property_purchase_financed(with_months(PARAMS, months), financing),
+        )
+
+
+def test_head_is_the_shorter_horizon():
+    full = simulate_property_purchase(with_months(PARAMS, 400))
+    assert full.purchase_month is not None
+    for months in (full.purchase_month - 1, full.purchase_month + 1, 400):
+        assert_same_result(
+            full.head(months), simulate_property_purchase(with_months(PARAMS, months))
+        )
+
+    financed = simulate_property_purchase_financed(with_months(PARAMS, 600), FINANCING)
+    assert financed.end_month is not None
+    for months in (financed.end_month, financed.end_month + 1):
+        assert_same_result(
+            financed.head(months),
+            simulate_property_purchase_financed(with_months(PARAMS, months), FINANCING),
+        )
+
+
+def test_results_from_custom_savings_cannot_be_extended():
+    savings = simulate_monthly_savings(PARAMS)
+    result = simulate_property_purchase_financed(PARAMS, FINANCING, savings)
+    with pytest.raises(ValueError):
+        extend_property_purchase_financed(with_months(PARAMS, 300), FINANCING, result)
+    with pytest.raises(ValueError):
+        extend_property_purchase(
+            with_months(PARAMS, 300), simulate_property_purchase(PARAMS).head(100)
+        )
+
+
+def test_cache_slices_and_extends_one_checkpoint():
+    stats = cache.simulate_property_purchase.cache.stats
+    # clear_caches keeps the counters
+    before = stats()
+    longer = cache.simulate_property_purchase(with_months(PARAMS, 300))
+    shorter = cache.simulate_property_purchase(with_months(PARAMS, 100))
+    longest = cache.simulate_property_purchase(with_months(PARAMS, 900))
+    after = stats()
+    assert (after.misses - before.misses, after.hits - before.hits) == (1, 2)
+    assert after.size == 1
+    assert_same_result(shorter, simulate_property_purchase(with_months(PARAMS, 100)))
+    assert_same_result(longest, simulate_property_purchase(with_months(PARAMS, 900)))
+    # Views handed out before the checkpoint grew are still valid
+    np.testing.assert_array_equal(longer.total_capital, longest.total_capital[:300])
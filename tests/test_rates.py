@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from finances.rates import RateSchedule
+from finances.retirement import (
+    RetirementParams,
+    _savings_rate,
+    calculate_monthly_savings,
+    simulate_retirement_surface,
+)
+
+INFLATION = np.array([0.3, 0.5, 0.2])
+INVESTMENT_RETURN = np.array([1.1, 0.7, 0.9])
+SCHEDULE = RateSchedule.from_rates(INFLATION, INVESTMENT_RETURN, np.zeros(3))
+CONSTANT = RateSchedule.from_rates(np.full(12, 0.41), np.full(12, 1.0), np.zeros(12))
+
+
+def test_rates_wrap_around_past_the_end():
+    np.testing.assert_array_equal(SCHEDULE.rates("inflation", 2), [0.3, 0.5])
+    np.testing.assert_array_equal(
+        SCHEDULE.rates("inflation", 7), [0.3, 0.5, 0.2, 0.3, 0.5, 0.2, 0.3]
+    )
+
+
+def test_cumulative_is_the_running_product_of_the_growth():
+    cumulative = SCHEDULE.cumulative("investment_return", 7)
+    expected = [1.0]
+    for rate in np.resize(INVESTMENT_RETURN, 7):
+        expected.append(expected[-1] * (1 + rate / 100))
+    np.testing.assert_allclose(cumulative, expected, rtol=1e-15)
+    np.testing.assert_array_equal(SCHEDULE.cumulative("inflation", 0), [1.0])
+
+
+def test_mean_rate_has_the_same_total_growth():
+    mean = SCHEDULE.mean_rate("investment_return")
+    np.testing.assert_allclose(
+        (1 + mean / 100) ** 3, np.prod(1 + INVESTMENT_RETURN / 100), rtol=1e-14
+    )
+    np.testing.assert_allclose(CONSTANT.mean_rate("inflation"), 0.41, rtol=1e-12)
+
+
+def test_schedules_are_identified_by_their_rates():
+    same = RateSchedule.from_rates(INFLATION.copy(), INVESTMENT_RETURN, np.zeros(3))
+    assert same == SCHEDULE and hash(same) == hash(SCHEDULE)
+    assert (
+        RateSchedule.from_rates(INVESTMENT_RETURN, INFLATION, np.zeros(3)) != SCHEDULE
+    )
+    with pytest.raises(ValueError):
+        RateSchedule.from_rates([1.0], [1.0, 2.0], [0.0])
+
+
+@pytest.mark.parametrize("current_capital", [0, 80_000])
+def test_constant_schedule_matches_the_closed_form(current_capital):
+    years = np.array([1, 10, 35])
+    surface = simulate_retirement_surface(
+        RetirementParams(current_capital, 0, 0, CONSTANT), [5_000], years * 12
+    )
+    for column, year in enumerate(years):
+        expected = calculate_monthly_savings(5_000, year, current_capital, 0.41, 1.0)
+        np.testing.assert_allclose(
+            surface.monthly_savings[0, column], expected.monthly_savings, rtol=1e-9
+        )
+        np.testing.assert_allclose(
+            surface.future_salary[0, column], expected.salary_at_retire, rtol=1e-12
+        )
+
+
+@pytest.mark.parametrize("increasing_savings", [False, True])
+def test_constant_schedule_matches_the_closed_form_savings_rate(increasing_savings):
+    months = np.arange(1, 601)
+    np.testing.assert_allclose(
+        _savings_rate(months, 0, 0, increasing_savings, CONSTANT),
+        _savings_rate(months, 0.41, 1.0, increasing_savings),
+        rtol=1e-9,
+    )
@@ -0,0 +1,155 @@
+import numpy as np
+import pytest
+
+from finances.rates import historical_schedule
+from finances.retirement import (
+    RetirementParams,
+    _savings_rate,
+    calculate_monthly_savings,
+    calculate_monthly_savings_rate,
+    perpetuity_rate,
+    simulate_retirement_grid,
+    simulate_retirement_surface,
+    solve_months_to_retire,
+)
+
+BUY_POWERS = (1_000, 7_500, 20_000)
+YEARS = (1, 5, 17, 40)
+
+
+def reference_monthly_savings(buy_power, months, current_capital, rates):
+    """Poupança mensal com as taxas da schedule, acumulando mês a mês."""
+    capital, deposits, salary = float(current_capital), 0.0, float(buy_power)
+    for investment_growth, inflation_growth in zip(
+        rates.growth("investment_return", months), rates.growth("inflation", months)
+    ):
+        capital *= investment_growth
+        deposits = deposits * investment_growth + 1
+        salary *= inflation_growth
+    return (salary / perpetuity_rate(rates) - capital) / deposits, salary
+
+
+@pytest.mark.parametrize("current_capital", [0, 150_000])
+def test_surface_matches_the_closed_form_cell_by_cell(current_capital):
+    params = RetirementParams(current_capital, 0.41, 1.0)
+    surface = simulate_retirement_surface(
+        params, BUY_POWERS, [year * 12 for year in YEARS]
+    )
+    for row, buy_power in enumerate(BUY_POWERS):
+        for column, years in enumerate(YEARS):
+            expected = calculate_monthly_savings(
+                buy_power, years, current_capital, 0.41, 1.0
+            )
+            np.testing.assert_allclose(
+                surface.monthly_savings[row, column],
+                expected.monthly_savings,
+                rtol=1e-12,
+            )
+            np.testing.assert_allclose(
+                surface.future_salary[row, column],
+                expected.salary_at_retire,
+                rtol=1e-12,
+            )
+
+
+@pytest.mark.parametrize("current_capital", [0, 150_000])
+def test_surface_with_a_schedule_matches_a_monthly_loop(current_capital):
+    rates = historical_schedule()
+    params = RetirementParams(current_capital, 0.41, 1.0, rates)
+    months = [year * 12 for year in YEARS] + [len(rates) + 7]
+    surface = simulate_retirement_surface(params, BUY_POWERS, months)
+    for row, buy_power in enumerate(BUY_POWERS):
+        for column, horizon in enumerate(months):
+            saving, salary = reference_monthly_savings(
+                buy_power, horizon, current_capital, rates
+            )
+            np.testing.assert_allclose(
+                surface.monthly_savings[row, column], saving, rtol=1e-10
+            )
+            np.testing.assert_allclose(
+                surface.future_salary[row, column], salary, rtol=1e-10
+            )
+
+
+def test_grid_lists_the_surface_by_buy_power_then_years():
+    params = RetirementParams(0, 0.41, 1.0)
+    grid = simulate_retirement_grid(params, BUY_POWERS, YEARS)
+    assert grid.wanted_buy_power.tolist() == [p for p in BUY_POWERS for _ in YEARS]
+    assert grid.time_to_retire.tolist() == list(YEARS) * len(BUY_POWERS)
+    for buy_power, years, saving in zip(
+        grid.wanted_buy_power, grid.time_to_retire, grid.monthly_savings
+    ):
+        np.testing.assert_allclose(
+            saving,
+            calculate_monthly_savings(buy_power, years, 0, 0.41, 1.0).monthly_savings,
+            rtol=1e-12,
+        )
+
+
+@pytest.mark.parametrize("increasing_savings", [False, True])
+def test_savings_rate_matches_the_scalar_formula(increasing_savings):
+    months = np.array([1, 12, 100, 600])
+    np.testing.assert_allclose(
+        _savings_rate(months, 0.41, 1.0, increasing_savings),
+        [
+            calculate_monthly_savings_rate(m, 0.41, 1.0, increasing_savings)
+            for m in months
+        ],
+        rtol=1e-12,
+    )
+
+
+@pytest.mark.parametrize("increasing_savings", [False, True])
+def test_solved_horizon_gives_back_the_savings_rate(increasing_savings):
+    targets = np.array([0.05, 0.2, 0.5, 0.9])
+    months = solve_months_to_retire(targets, 0.41, 1.0, increasing_savings)
+    assert np.isfinite(months).all()
+    np.testing.assert_allclose(
+        [
+            calculate_monthly_savings_rate(m, 0.41, 1.0, increasing_savings)
+            for m in months
+        ],
+        targets,
+        rtol=1e-9,
+    )
+    assert solve_months_to_retire(0.2, 0.41, 1.0, increasing_savings) == months[1]
+
+
+def test_solved_horizon_with_a_schedule_is_the_first_month_within_the_target():
+    rates = historical_schedule()
+    targets = np.array([0.1, 0.3, 0.7])
+    months = solve_months_to_retire(targets, 0, 0, rates=rates)
+    curve = _savings_rate(np.arange(1, 200 * 12 + 1), 0, 0, False, rates)
+    for target, month in zip(targets, months):
+        assert month.is_integer()
+        assert curve[int(month) - 1] <= target
+        assert (curve[: int(month) - 1] > target).all()
+
+
+@pytest.mark.parametrize(
+    "target, inflation, investment_return, max_months",
+    [
+        (0.3, 1.0, 1.0, 2400),
+        (0.3, 1.0, 0.5, 2400),
+        (0.0, 0.41, 1.0, 2400),
+        (-0.1, 0.41, 1.0, 2400),
+        (0.05, 0.41, 1.0, 240),
+    ],
+)
+def test_unreachable_horizons_are_nan(target, inflation, investment_return, max_months):
+    for increasing_savings in (False, True):
+        months = solve_months_to_retire(
+            [target, 0.9],
+            inflation,
+            investment_return,
+            increasing_savings,
+            max_months=max_months,
+        )
+        assert np.isnan(months[0])
+        assert np.isnan(months[1]) == (investment_return <= inflation)
+
+
+def test_unreachable_horizons_with_a_schedule_are_nan():
+    rates = historical_schedule()
+    assert np.isnan(solve_months_to_retire(0.0, 0, 0, rates=rates))
+    assert np.isnan(solve_months_to_retire(0.05, 0, 0, max_months=24, rates=rates))
@@ -0,0 +1,104 @@
+import dataclasses
+import itertools
+
+import numpy as np
+import pytest
+
+from finances.business import BusinessParams, simulate_business
+from finances.sensitivity import (
+    TORNADO_FIELDS,
+    simulate_business_batch,
+    simulate_business_sensitivity_grid,
+    simulate_business_tornado,
+)
+
+PARAMS = BusinessParams()
+
+
+def assert_matches_simulate_business(batch, index, params):
+    expected = simulate_business(params)
+    for name in (
+        "multiplicador_real",
+        "multiplicador_requerido",
+        "employee_total",
+        "biz_success_total",
+        "biz_failure_total",
+    ):
+        np.testing.assert_allclose(
+            getattr(batch, name)[index],
+            getattr(expected, name),
+            rtol=1e-12,
+            err_msg=name,
+        )
+    breakeven = np.nan if expected.breakeven_year is None else expected.breakeven_year
+    np.testing.assert_array_equal(batch.breakeven_year[index], breakeven)
+
+
+def test_batch_matches_simulate_business_everywhere():
+    years = [(0, 3), (2, 6), (5, 20)]
+    valuations = [0, 8_000_000, 60_000_000]
+    margins = [0.0, 15.0, 40.0]
+    ano_inicio, ano_fim = np.array(years).T
+    batch = simulate_business_batch(
+        PARAMS,
+        ano_inicio=ano_inicio[:, None, None],
+        ano_fim=ano_fim[:, None, None],
+        valuation_saida=np.array(valuations)[None, :, None],
+        margem_lucro_pct=np.array(margins)[None, None, :],
+    )
+    assert batch.multiplicador_real.shape == (3, 3, 3)
+    for (i, window), (j, valuation), (k, margin) in itertools.product(
+        enumerate(years), enumerate(valuations), enumerate(margins)
+    ):
+        params = dataclasses.replace(
+            PARAMS,
+            ano_inicio=window[0],
+            ano_fim=window[1],
+            valuation_saida=valuation,
+            margem_lucro_pct=margin,
+        )
+        assert_matches_simulate_business(batch, (i, j, k), params)
+
+
+def test_batch_rejects_unknown_fields_and_empty_windows():
+    with pytest.raises(TypeError):
+        simulate_business_batch(PARAMS, foo=[1.0])
+    with pytest.raises(ValueError):
+        simulate_business_batch(PARAMS, ano_fim=[6, 2])
+
+
+def test_tornado_bars_are_the_perturbed_runs():
+    tornado = simulate_business_tornado(PARAMS, 0.2)
+    assert {bar.field for bar in tornado.bars} == set(TORNADO_FIELDS)
+    assert "probabilidade_sucesso" not in TORNADO_FIELDS
+    swings = [bar.swing for bar in tornado.bars]
+    assert swings == sorted(swings, reverse=True)
+    assert all(swing > 0 for swing in swings)
+    np.testing.assert_allclose(
+        tornado.base_multiplicador, simulate_business(PARAMS).multiplicador_real
+    )
+    for bar in tornado.bars:
+        for value, multiplicador in (
+            (bar.low_value, bar.low_multiplicador),
+            (bar.high_value, bar.high_multiplicador),
+        ):
+            # The years are integer fields
+            value = type(getattr(PARAMS, bar.field))(value)
+            expected = simulate_business(
+                dataclasses.replace(PARAMS, **{bar.field: value})
+            )
+            np.testing.assert_allclose(
+                multiplicador,
+                expected.multiplicador_real,
+                rtol=1e-12,
+                err_msg=bar.field,
+            )
+
+
+def test_grid_varies_the_required_multiple_with_the_probability():
+    grid = simulate_business_sensitivity_grid(
+        PARAMS, "valuation_saida", [1e7, 3e7], "probabilidade_sucesso", [10, 50]
+    )
+    assert grid.multiplicador_real.shape == (2, 2)
+    np.testing.assert_allclose(grid.multiplicador_requerido, [[10, 10], [2, 2]])
+    assert grid.multiplicador_real[0, 1] > grid.multiplicador_real[0, 0]
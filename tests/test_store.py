@@ -0,0 +1,126 @@
+import dataclasses
+import sqlite3
+
+import numpy as np
+import pytest
+
+from finances import cache
+from finances.property import PropertyParams
+from finances.retirement import RetirementParams
+from finances.store import ResultStore, default_store
+
+PARAMS = PropertyParams(
+    property_value=500_000,
+    available_cash=50_000,
+    initial_monthly_saving=3_000,
+    monthly_inflation_rate=0.4,
+    monthly_investment_return_rate=0.8,
+    monthly_property_value_increase=0.5,
+    monthly_property_value_increase_when_bought=0.4,
+    months_to_simulate=120,
+)
+RETIREMENT = RetirementParams(0, 0.41, 0.8)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "results.sqlite")
+
+
+@pytest.fixture
+def store_env(monkeypatch, path):
+    monkeypatch.setenv("FINANCES_STORE", path)
+    cache.clear_caches()
+    yield default_store()
+    cache.clear_caches()
+
+
+def names(store):
+    return {name: count for _, name, count, _ in store.summary()}
+
+
+def test_put_is_written_in_the_background(path):
+    store = ResultStore(path, version="a")
+    key = store.key("x", (1,))
+    assert store.get(key) == (False, None)
+    store.put(key, "x", np.arange(3))
+    assert store.flush(5)
+    found, value = ResultStore(path, version="a").get(key)
+    assert found
+    np.testing.assert_array_equal(value, np.arange(3))
+    stats = store.stats()
+    assert (stats.misses, stats.writes) == (1, 1)
+
+
+def test_keys_depend_on_the_code_version(path):
+    old, new = ResultStore(path, version="old"), ResultStore(path, version="new")
+    assert old.key("x", (1,)) != new.key("x", (1,))
+    old.put(old.key("x", (1,)), "x", 1)
+    old.flush(5)
+    assert new.prune() == 1
+    assert new.summary() == []
+
+
+def test_least_recently_used_are_evicted_first(path):
+    blob = np.zeros(10_000)
+    store = ResultStore(path, version="a", max_bytes=int(2.5 * blob.nbytes))
+    keys = [store.key("x", (i,)) for i in range(3)]
+    for key in keys[:2]:
+        store.put(key, "x", blob)
+        store.flush(5)
+    # Reading the first one makes the second the least recently used
+    assert store.get(keys[0])[0]
+    store.put(keys[2], "x", blob)
+    store.flush(5)
+    assert [store.get(key)[0] for key in keys] == [True, False, True]
+    assert store.stats().evictions == 1
+
+
+def test_results_larger_than_the_budget_are_skipped(path):
+    store = ResultStore(path, version="a", max_bytes=1000)
+    store.put(store.key("x", (1,)), "x", np.zeros(1000))
+    store.flush(5)
+    assert store.stats().skipped == 1
+    assert store.summary() == []
+
+
+def test_unpicklable_results_do_not_stop_the_writer(path):
+    store = ResultStore(path, version="a")
+    store.put(store.key("x", (1,)), "x", lambda: None)
+    store.put(store.key("x", (2,)), "x", 2)
+    assert store.flush(5)
+    assert store.stats().errors == 1
+    assert store.get(store.key("x", (2,))) == (True, 2)
+
+
+def test_files_of_an_older_layout_are_recreated(path):
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE results (key TEXT PRIMARY KEY, value BLOB)")
+    store = ResultStore(path, version="a")
+    store.put(store.key("x", (1,)), "x", 1)
+    store.flush(5)
+    assert store.get(store.key("x", (1,))) == (True, 1)
+
+
+def test_memoize_skips_caches_that_do_not_persist(store_env):
+    cache.simulate_retirement_grid(RETIREMENT, [5_000], [10])
+    cache.simulate_retirement_surface(RETIREMENT, [5_000], [120])
+    store_env.flush(5)
+    assert names(store_env) == {"retirement_grid": 1}
+
+
+def test_memoize_horizon_stores_the_first_simulation(store_env):
+    short = dataclasses.replace(PARAMS, months_to_simulate=60)
+    cache.simulate_property_purchase(short)
+    # Grows the checkpoint before the writer gets to pickle it
+    longer = cache.simulate_property_purchase(PARAMS)
+    store_env.flush(5)
+
+    cache.clear_caches()
+    stored = cache.simulate_property_purchase(short)
+    assert store_env.stats().hits == 1
+    assert stored.months == 60
+    # Still extendable after the round trip
+    np.testing.assert_array_equal(
+        cache.simulate_property_purchase(PARAMS).total_capital, longer.total_capital
+    )
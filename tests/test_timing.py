@@ -0,0 +1,93 @@
+import json
+import re
+
+import pytest
+
+from finances.timing import BUCKETS, MetricsExporter, RerunTiming
+
+SAMPLE = re.compile(r"^(\w+)\{(.*)\} (\S+)$")
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def read_samples(path):
+    """{(nome, rótulos): valor} das amostras do arquivo do Prometheus."""
+    samples = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            name, labels, value = SAMPLE.match(line.rstrip("\n")).groups()
+            samples[name, tuple(LABEL.findall(labels))] = float(value)
+    return samples
+
+
+def timing(page: str, **stages) -> RerunTiming:
+    return RerunTiming(page, "abc", stages=dict(stages), started_at=1.5)
+
+
+def test_histograms_are_cumulative(tmp_path):
+    exporter = MetricsExporter(str(tmp_path))
+    for seconds in (0.0005, 0.003, 0.003, 0.2, 30.0):
+        exporter.record(timing("1_Aposentadoria", kernel=seconds))
+    samples = read_samples(exporter.prometheus_path)
+
+    labels = (("page", "1_Aposentadoria"), ("stage", "kernel"))
+    buckets = [
+        samples["finances_rerun_stage_seconds_bucket", (*labels, ("le", str(bound)))]
+        for bound in BUCKETS
+    ]
+    assert buckets == [
+        sum(value <= bound for value in (0.0005, 0.003, 0.003, 0.2, 30.0))
+        for bound in BUCKETS
+    ]
+    assert buckets == sorted(buckets)
+    count = samples["finances_rerun_stage_seconds_count", labels]
+    assert count == 5
+    assert (
+        samples["finances_rerun_stage_seconds_bucket", (*labels, ("le", "+Inf"))]
+        == count
+    )
+    assert samples["finances_rerun_stage_seconds_sum", labels] == pytest.approx(30.2065)
+    # The total of each rerun has its own histogram
+    assert (
+        samples["finances_rerun_stage_seconds_count", (labels[0], ("stage", "total"))]
+        == 5
+    )
+
+
+def test_labels_are_escaped(tmp_path):
+    page = 'dir\\pá"gina\nnova'
+    exporter = MetricsExporter(str(tmp_path))
+    exporter.record(timing(page, render=0.01))
+    with open(exporter.prometheus_path, encoding="utf-8") as f:
+        text = f.read()
+    assert 'page="dir\\\\pá\\"gina\\nnova"' in text
+    # One line per sample: the newline in the page name is escaped
+    assert all(SAMPLE.match(line) for line in text.splitlines() if line[0] != "#")
+
+
+def test_jsonl_has_one_record_per_rerun(tmp_path):
+    exporter = MetricsExporter(str(tmp_path))
+    exporter.record(timing("3_Compra", widgets=0.002, kernel=0.04))
+    exporter.record(timing("4_Negócio", figure=0.01))
+    with open(exporter.jsonl_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [record["page"] for record in records] == ["3_Compra", "4_Negócio"]
+    assert records[0] == {
+        "timestamp": 1.5,
+        "page": "3_Compra",
+        "params_hash": "abc",
+        "stages": {"widgets": 0.002, "kernel": 0.04},
+        "total": pytest.approx(0.042),
+        "charts": [],
+    }
+
+
+def test_lap_adds_to_the_stage():
+    rerun = RerunTiming("p")
+    rerun.lap("kernel")
+    rerun.lap("render")
+    rerun.lap("kernel")
+    assert set(rerun.stages) == {"kernel", "render"}
+    assert rerun.total == pytest.approx(sum(rerun.stages.values()))
+    assert all(seconds >= 0 for seconds in rerun.stages.values())
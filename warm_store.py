@@ -0,0 +1,110 @@
+"""Preenche o arquivo de resultados (FINANCES_STORE) antes de servir a app.
+
+Renderiza cada página uma vez com os valores padrão da barra lateral e, com
+--links, cada link compartilhado do arquivo (um por linha, como
+`.../Negócio_ou_emprego?valuation=30000000&prob=25`). As páginas rodam de
+verdade, com streamlit.testing.AppTest, então os resultados gravados têm
+exatamente as chaves que uma sessão nova vai procurar.
+
+    FINANCES_STORE=store/results.sqlite python warm_store.py
+    python warm_store.py --store store/results.sqlite --links links.txt
+
+Entradas de versões antigas do código são apagadas antes. Sai com código 1 se
+alguma página der erro.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import warnings
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def page_files() -> dict[str, str]:
+    """Caminho de cada página pelo nome que aparece na URL."""
+    pages = {"": os.path.join(ROOT, "Bem_vindo.py")}
+    for path in sorted(glob.glob(os.path.join(ROOT, "pages", "*.py"))):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        # Streamlit drops the ordering prefix from the URL path
+        pages[stem.split("_", 1)[1] if stem[0].isdigit() else stem] = path
+    return pages
+
+
+def read_links(path: str, pages: dict[str, str]) -> list[tuple[str, dict]]:
+    """(página, query params) de cada linha não vazia de `path`."""
+    links = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            url = urlsplit(line)
+            name = unquote(url.path.rstrip("/").rsplit("/", 1)[-1])
+            name = name.split("_", 1)[1] if name[:1].isdigit() else name
+            if name not in pages:
+                raise ValueError(f"página desconhecida no link: {line}")
+            links.append((pages[name], dict(parse_qsl(url.query))))
+    return links
+
+
+def render(path: str, query: dict) -> list[str]:
+    """Renderiza a página e devolve as mensagens de erro."""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(path, default_timeout=600)
+    app.query_params.update(query)
+    app.run()
+    return [e.message for e in app.exception]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--store", help="arquivo de resultados (FINANCES_STORE)")
+    parser.add_argument("--links", help="arquivo com links compartilhados")
+    args = parser.parse_args(argv)
+    if args.store:
+        os.environ["FINANCES_STORE"] = args.store
+    if not os.environ.get("FINANCES_STORE"):
+        parser.error("informe --store ou defina FINANCES_STORE")
+
+    sys.path.insert(0, ROOT)
+    from streamlit import logger as streamlit_logger
+
+    from finances.store import default_store
+
+    streamlit_logger.set_log_level("error")
+    # Page 4 has "\$" in a regular string
+    warnings.filterwarnings("ignore", category=SyntaxWarning)
+
+    store = default_store()
+    pruned = store.prune()
+    if pruned:
+        print(f"{pruned} entradas de versões antigas apagadas")
+
+    pages = page_files()
+    runs = [(path, {}) for path in pages.values()]
+    if args.links:
+        runs += read_links(args.links, pages)
+
+    failed = False
+    for path, query in runs:
+        start = time.perf_counter()
+        errors = render(path, query)
+        label = os.path.relpath(path, ROOT) + (f" {query}" if query else "")
+        print(f"{label:<48} {(time.perf_counter() - start) * 1e3:>8.0f} ms")
+        for message in errors:
+            print(f"  erro: {message}", file=sys.stderr)
+        failed |= bool(errors)
+
+    store.flush()
+    stats = store.stats()
+    print(f"{stats.writes} resultados gravados, {stats.hits} já estavam no arquivo")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())